@@ -13,7 +13,20 @@ __version__ = "1.2.2"
 StartTime = datetime.now()
 
 
-from TgMusic.core import call, tg, db, config
+from TgMusic.core import (
+    call,
+    tg,
+    db,
+    config,
+    media_cache,
+    http_pool,
+    progressive,
+    ytdlp_pool,
+    offload,
+    queue_store,
+    invalidator,
+    assistants,
+)
 
 
 class Bot(Client):
@@ -73,13 +86,21 @@ class Bot(Client):
     async def _initialize_components(self) -> None:
         from TgMusic.core import save_all_cookies
 
+        # Fork CPU workers before TDLib, ntgcalls and DNS lookups start threads
+        await offload.start()
         await save_all_cookies(config.COOKIES_URL)
         await self.db.ping()
         await self.start_clients()
         await self.call.add_bot(self)
         await self.call.register_decorators()
+        assistants.start(self.call.calls)
         await super().start()
+        await self.db.load_bot_flags(self.me.id)
+        self.db.watch_bot_flags(self.me.id, config.BOT_FLAGS_REFRESH)
+        invalidator.start(self.me.id)
         await self.call_manager.start()
+        queue_store.start()
+        self.loop.create_task(queue_store.restore())
 
         self.logger.info("Bot started successfully")
         self.loop.create_task(self.watch_dog())
@@ -87,10 +108,19 @@ class Bot(Client):
     async def stop(self, graceful: bool = True) -> None:
         self.logger.info("Stopping bot...")
         try:
+            # Snapshot queues while the calls can still report positions
+            await queue_store.close()
+            await invalidator.close()
+            await assistants.close()
             shutdown_tasks = [
                 self.db.close(),
                 self.call_manager.stop(),
                 self.call.stop_all_clients(),
+                media_cache.save(),
+                http_pool.close(),
+                progressive.server.close(),
+                ytdlp_pool.close(),
+                offload.close(),
             ]
 
             if graceful:
@@ -6,7 +6,7 @@
 from .admins import is_admin, is_owner
 from ._database import db
 from ._downloader import DownloaderWrapper
-from ._tgcalls import call
+from ._tgcalls import call, download_flight
 from ._telegram import tg
 from ._youtube import YouTubeData
 from ._config import config
@@ -17,10 +17,30 @@ from ._cacher import (
     chat_cache,
     ChatMemberStatusResult,
 )
-from ._dataclass import CachedTrack, MusicTrack, PlatformTracks, TrackInfo
+from ._dataclass import (
+    CachedTrack,
+    CachedTrackModel,
+    ChatSettings,
+    MusicTrack,
+    PlatformTracks,
+    TrackInfo,
+)
 from ._filters import Filter
 from .buttons import SupportButton, control_buttons
 from ._save_cookies import save_all_cookies
+from ._media_cache import media_cache
+from ._prefetch import prefetcher
+from ._httpx import http_pool
+from ._progressive import progressive
+from ._metadata_cache import metadata_cache
+from ._search_cache import search_cache
+from ._ytdlp_pool import ytdlp_pool
+from ._offload import offload
+from ._file_ids import file_ids
+from ._probe import media_probe
+from ._queue_store import queue_store
+from ._invalidation import invalidator
+from ._assistants import assistants
 
 __all__ = [
     "is_admin",
@@ -39,9 +59,25 @@ __all__ = [
     "ChatMemberStatus",
     "ChatMemberStatusResult",
     "CachedTrack",
+    "CachedTrackModel",
+    "ChatSettings",
     "TrackInfo",
     "MusicTrack",
     "PlatformTracks",
     "SupportButton",
     "Filter",
+    "media_cache",
+    "download_flight",
+    "prefetcher",
+    "http_pool",
+    "progressive",
+    "metadata_cache",
+    "search_cache",
+    "ytdlp_pool",
+    "offload",
+    "file_ids",
+    "media_probe",
+    "queue_store",
+    "invalidator",
+    "assistants",
 ]
@@ -12,6 +12,9 @@ from TgMusic.logger import LOGGER
 from ._config import config
 from ._downloader import MusicService
 from ._httpx import HttpxClient
+from ._media_cache import media_cache
+from ._metadata_cache import metadata_cache
+from ._search_cache import search_cache
 from ._spotify_dl_helper import SpotifyDownload
 from ._dataclass import PlatformTracks, MusicTrack, TrackInfo
 
@@ -57,6 +60,12 @@ class ApiData(MusicService):
         self.api_key = config.API_KEY
         self.client = HttpxClient()
 
+    def _platform_of(self, url: str) -> str:
+        return next(
+            (name for name, pattern in self.URL_PATTERNS.items() if pattern.match(url)),
+            "api",
+        )
+
     @staticmethod
     def _sanitize_query(query: str) -> str:
         """Clean and standardize input queries.
@@ -95,7 +104,14 @@ class ApiData(MusicService):
         if not self.query or not self.is_valid():
             return types.Error(400, "Invalid or unsupported URL provided")
 
-        response = await self._make_api_request("get_url", {"url": self.query})
+        platform = self._platform_of(self.query)
+        cache_key = f"url:{metadata_cache.url_key(self.query)}"
+        response = await metadata_cache.get(platform, cache_key)
+        if response is None:
+            response = await self._make_api_request("get_url", {"url": self.query})
+            if response and response.get("results"):
+                await metadata_cache.set(platform, cache_key, response)
+
         return self._parse_tracks_response(response) or types.Error(
             404, "No track information found"
         )
@@ -114,6 +130,9 @@ class ApiData(MusicService):
         if self.is_valid():
             return await self.get_info()
 
+        return await search_cache.fetch("api", self.query, self._search)
+
+    async def _search(self) -> Union[PlatformTracks, types.Error]:
         response = await self._make_api_request("search_track", {"q": self.query})
         return self._parse_tracks_response(response) or types.Error(
             404, "No results found for search query"
@@ -129,7 +148,17 @@ class ApiData(MusicService):
         if not self.query:
             return types.Error(400, "No track identifier provided")
 
-        response = await self._make_api_request("get_track", {"id": self.query})
+        # Track responses carry signed cdnurl/key values that expire quickly
+        cache_key = f"track:{self.query}"
+        response = await metadata_cache.get("api", cache_key, links=True)
+        if response is None:
+            response = await self._make_api_request("get_track", {"id": self.query})
+            if response:
+                # The link TTL depends on the platform the track resolved to
+                await metadata_cache.set(
+                    "api", cache_key, response, link_platform=response.get("platform")
+                )
+
         return (
             TrackInfo(**response) if response else types.Error(404, "Track not found")
         )
@@ -166,7 +195,11 @@ class ApiData(MusicService):
             return types.Error(400, error_msg)
 
         # Standard download handling
-        download_path = config.DOWNLOADS_DIR / f"{track.tc}.mp3"
+        cache_key = media_cache.make_key(track.platform, track.tc, video)
+        if cached := media_cache.get(cache_key):
+            return cached
+
+        download_path = media_cache.path_for(cache_key, "mp3")
         download_result = await self.client.download_file(track.cdnurl, download_path)
 
         if not download_result.success:
@@ -177,7 +210,7 @@ class ApiData(MusicService):
                 500, f"Download failed: {download_result.error or track.tc}"
             )
 
-        return download_result.file_path
+        return await media_cache.put(cache_key, download_result.file_path)
 
     @staticmethod
     def _parse_tracks_response(
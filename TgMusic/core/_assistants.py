@@ -0,0 +1,207 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import random
+import time
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from cachetools import LRUCache
+
+from TgMusic.logger import LOGGER
+
+from ._cacher import chat_cache
+from ._config import config
+
+
+@dataclass(slots=True)
+class AssistantLoad:
+    name: str
+    calls: int = 0
+    cpu: float = 0.0
+    ping: float = 0.0
+    errors: float = 0.0
+    score: float = 0.0
+    healthy: bool = True
+
+
+class AssistantScheduler:
+    """Pick the least loaded assistant for chats that need one.
+
+    An assistant's load is a weighted sum of the calls it is serving, its
+    last sampled CPU usage and ping, and its recent FloodWait/RPC errors,
+    which decay with a half-life of ``ERROR_HALF_LIFE`` seconds. CPU and
+    ping are sampled in the background, so ``pick`` never waits on I/O.
+
+    Assistants are also tracked for health. One that is deauthorized, hits
+    a long FloodWait or fails ``FAILURE_THRESHOLD`` times in a row is taken
+    out of rotation for ``cooldown`` seconds (or the FloodWait, if longer)
+    and down listeners are told so its chats can be moved. A successful
+    health check puts it back straight away.
+    """
+
+    CALL_WEIGHT = 1.0
+    CPU_WEIGHT = 0.05  # per percent
+    PING_WEIGHT = 0.005  # per millisecond
+    FLOOD_WEIGHT = 3.0
+    RPC_WEIGHT = 1.0
+    ERROR_HALF_LIFE = 300
+    SAMPLE_INTERVAL = 30
+    # Extra load a chat's assistant must carry before the chat is moved
+    REBALANCE_MARGIN = 1.0
+    FAILURE_THRESHOLD = 3
+    # Shorter FloodWaits are waited out instead of failing over
+    FLOOD_DOWN_AFTER = 60
+
+    def __init__(self, cooldown: int) -> None:
+        self.cooldown = max(cooldown, 1)
+        self._assigned: LRUCache[int, str] = LRUCache(maxsize=10000)
+        self._errors: dict[str, tuple[float, float]] = {}
+        self._samples: dict[str, tuple[float, float]] = {}
+        self._failures: dict[str, int] = {}
+        self._down_until: dict[str, float] = {}
+        self._down_listeners: list[Callable[[str], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.picks = 0
+        self.rebalanced = 0
+        self.migrated = 0
+
+    def add_down_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener`` with an assistant's name when it becomes unhealthy."""
+        self._down_listeners.append(listener)
+
+    def assign(self, chat_id: int, name: str) -> None:
+        self._assigned[chat_id] = name
+
+    def assistant_of(self, chat_id: int) -> Optional[str]:
+        return self._assigned.get(chat_id)
+
+    def record_error(self, name: str, flood: bool = False) -> None:
+        """Count a FloodWait or RPC error against an assistant's load."""
+        now = time.monotonic()
+        weight = self.FLOOD_WEIGHT if flood else self.RPC_WEIGHT
+        self._errors[name] = (self._error_score(name, now) + weight, now)
+
+    def record_failure(
+        self, name: str, retry_after: int = 0, fatal: bool = False
+    ) -> None:
+        """Count a failed playback or health check against an assistant.
+
+        Args:
+            name: Assistant that failed.
+            retry_after: Seconds a FloodWait asked to wait, if any.
+            fatal: The session cannot be used at all, e.g. it was revoked.
+        """
+        now = time.monotonic()
+        failures = self._failures.get(name, 0) + 1
+        self._failures[name] = failures
+        if (
+            fatal
+            or retry_after >= self.FLOOD_DOWN_AFTER
+            or failures >= self.FAILURE_THRESHOLD
+        ):
+            self._mark_down(name, max(self.cooldown, retry_after), now)
+
+    def record_ok(self, name: str) -> None:
+        """Reset an assistant's failures after it worked."""
+        self._failures.pop(name, None)
+        if self._down_until.pop(name, None) is not None:
+            LOGGER.info("Assistant %s is healthy again", name)
+
+    def _mark_down(self, name: str, duration: float, now: float) -> None:
+        was_healthy = self.is_healthy(name)
+        self._down_until[name] = max(self._down_until.get(name, 0.0), now + duration)
+        if not was_healthy:
+            return
+        LOGGER.warning("Assistant %s is unhealthy, skipping it for %ds", name, duration)
+        for listener in self._down_listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                LOGGER.error("Assistant down listener failed: %s", e)
+
+    def is_healthy(self, name: str) -> bool:
+        return self._down_until.get(name, 0.0) <= time.monotonic()
+
+    def healthy(self, names: Iterable[str]) -> list[str]:
+        """Return the healthy assistants in ``names``, or all if none are."""
+        names = list(names)
+        return [name for name in names if self.is_healthy(name)] or names
+
+    def _error_score(self, name: str, now: float) -> float:
+        score, at = self._errors.get(name, (0.0, now))
+        return score * 0.5 ** ((now - at) / self.ERROR_HALF_LIFE)
+
+    def loads(self, names: Iterable[str]) -> list[AssistantLoad]:
+        """Return the current load of each assistant in ``names``."""
+        now = time.monotonic()
+        calls = Counter(
+            self._assigned.get(chat_id) for chat_id in chat_cache.get_active_chats()
+        )
+        loads = []
+        for name in names:
+            cpu, ping = self._samples.get(name, (0.0, 0.0))
+            load = AssistantLoad(
+                name,
+                calls[name],
+                cpu,
+                ping,
+                self._error_score(name, now),
+                healthy=self._down_until.get(name, 0.0) <= now,
+            )
+            load.score = (
+                load.calls * self.CALL_WEIGHT
+                + load.cpu * self.CPU_WEIGHT
+                + load.ping * self.PING_WEIGHT
+                + load.errors
+            )
+            loads.append(load)
+        return loads
+
+    def pick(self, names: Iterable[str]) -> str:
+        """Return the least loaded healthy assistant; ties are broken at random."""
+        self.picks += 1
+        best = min(
+            self.loads(self.healthy(names)),
+            key=lambda load: (load.score, random.random()),
+        )
+        return best.name
+
+    def should_move(self, name: str, names: Iterable[str]) -> bool:
+        """Whether a chat on ``name`` would be clearly better off elsewhere."""
+        loads = {load.name: load.score for load in self.loads(names)}
+        if name not in loads or len(loads) < 2:
+            return False
+        # The chat itself no longer counts towards its assistant's calls
+        return loads[name] - min(loads.values()) > self.REBALANCE_MARGIN
+
+    def start(self, calls: dict[str, Any]) -> None:
+        """Start sampling CPU usage and ping of the given PyTgCalls clients."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_loop(calls))
+
+    async def _sample_loop(self, calls: dict[str, Any]) -> None:
+        while True:
+            for name, client in list(calls.items()):
+                try:
+                    self._samples[name] = (
+                        float(await client.cpu_usage),
+                        float(client.ping or 0),
+                    )
+                except Exception as e:
+                    LOGGER.debug("Could not sample load of %s: %s", name, e)
+            await asyncio.sleep(self.SAMPLE_INTERVAL)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+assistants: AssistantScheduler = AssistantScheduler(config.ASSISTANT_COOLDOWN)
@@ -2,13 +2,13 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
-from collections import deque
-from typing import Any, Optional, TypeAlias, Union
+from typing import Any, Callable, Optional, TypeAlias, Union
 
 from cachetools import TTLCache
 from pytdbot import types
 
 from TgMusic.core._dataclass import CachedTrack
+from TgMusic.core._queue import TrackQueue
 
 chat_invite_cache = TTLCache(maxsize=1000, ttl=1000)
 
@@ -24,71 +24,146 @@ ChatMemberStatus: TypeAlias = Union[
 ChatMemberStatusResult: TypeAlias = Union[ChatMemberStatus, types.Error]
 user_status_cache: TTLCache[str, ChatMemberStatus] = TTLCache(maxsize=5000, ttl=1000)
 
+QueueListener: TypeAlias = Callable[[int, list[CachedTrack]], None]
+ChangeListener: TypeAlias = Callable[[int], None]
+
 
 class ChatCacher:
     def __init__(self):
         self.chat_cache: dict[int, dict[str, Any]] = {}
+        self._listeners: list[QueueListener] = []
+        self._change_listeners: list[ChangeListener] = []
+
+    def add_listener(self, callback: QueueListener) -> None:
+        """Register a callback invoked with (chat_id, removed_tracks)."""
+        self._listeners.append(callback)
+
+    def add_change_listener(self, callback: ChangeListener) -> None:
+        """Register a callback invoked with the chat_id of any queue change."""
+        self._change_listeners.append(callback)
+
+    def _notify_changed(self, chat_id: int) -> None:
+        for callback in self._change_listeners:
+            callback(chat_id)
+
+    def _notify_removed(self, chat_id: int, removed: list[CachedTrack]) -> None:
+        if not removed:
+            return
+        for callback in self._listeners:
+            callback(chat_id, removed)
+
+    def _queue(self, chat_id: int) -> Optional[TrackQueue]:
+        data = self.chat_cache.get(chat_id)
+        return data["queue"] if data else None
 
     def add_song(self, chat_id: int, song: CachedTrack) -> CachedTrack:
         data = self.chat_cache.setdefault(
-            chat_id, {"is_active": True, "queue": deque()}
+            chat_id, {"is_active": True, "queue": TrackQueue()}
         )
-        data["queue"].append(song)
-        return song
+        self._notify_changed(chat_id)
+        return data["queue"].append(song)
+
+    def insert_song(
+        self, chat_id: int, position: int, song: CachedTrack
+    ) -> CachedTrack:
+        data = self.chat_cache.setdefault(
+            chat_id, {"is_active": True, "queue": TrackQueue()}
+        )
+        self._notify_changed(chat_id)
+        return data["queue"].insert(position, song)
 
     def get_upcoming_track(self, chat_id: int) -> Optional[CachedTrack]:
-        queue = self.chat_cache.get(chat_id, {}).get("queue")
-        return queue[1] if queue and len(queue) > 1 else None
+        queue = self._queue(chat_id)
+        return queue.peek(1) if queue else None
 
     def get_playing_track(self, chat_id: int) -> Optional[CachedTrack]:
-        queue = self.chat_cache.get(chat_id, {}).get("queue")
-        return queue[0] if queue else None
+        queue = self._queue(chat_id)
+        return queue.peek(0) if queue else None
+
+    def peek_ahead(self, chat_id: int, count: int) -> list[CachedTrack]:
+        """Return up to ``count`` tracks queued after the playing one."""
+        queue = self._queue(chat_id)
+        return queue.peek_ahead(count) if queue else []
 
     def remove_current_song(self, chat_id: int) -> Optional[CachedTrack]:
-        queue = self.chat_cache.get(chat_id, {}).get("queue")
-        return queue.popleft() if queue else None
+        queue = self._queue(chat_id)
+        if not queue:
+            return None
+        self._notify_changed(chat_id)
+        return queue.popleft()
 
     def is_active(self, chat_id: int) -> bool:
         return self.chat_cache.get(chat_id, {}).get("is_active", False)
 
     def set_active(self, chat_id: int, active: bool):
         data = self.chat_cache.setdefault(
-            chat_id, {"is_active": active, "queue": deque()}
+            chat_id, {"is_active": active, "queue": TrackQueue()}
         )
         data["is_active"] = active
+        self._notify_changed(chat_id)
 
     def clear_chat(self, chat_id: int):
-        self.chat_cache.pop(chat_id, None)
+        data = self.chat_cache.pop(chat_id, None)
+        if data:
+            self._notify_removed(chat_id, data["queue"].clear())
+            self._notify_changed(chat_id)
 
     def get_queue_length(self, chat_id: int) -> int:
-        return len(self.chat_cache.get(chat_id, {}).get("queue", deque()))
+        queue = self._queue(chat_id)
+        return len(queue) if queue else 0
 
     def get_loop_count(self, chat_id: int) -> int:
-        queue = self.chat_cache.get(chat_id, {}).get("queue", deque())
+        queue = self._queue(chat_id)
         return queue[0].loop if queue else 0
 
     def set_loop_count(self, chat_id: int, loop: int) -> bool:
-        if queue := self.chat_cache.get(chat_id, {}).get("queue", deque()):
+        if queue := self._queue(chat_id):
             queue[0].loop = loop
+            self._notify_changed(chat_id)
             return True
         return False
 
-    def remove_track(self, chat_id: int, queue_index: int) -> bool:
-        queue = self.chat_cache.get(chat_id, {}).get("queue")
-        if queue and 0 <= queue_index < len(queue):
-            queue_list = list(queue)
-            queue_list.pop(queue_index)
-            self.chat_cache[chat_id]["queue"] = deque(queue_list)
-            return True
-        return False
+    def remove_track(self, chat_id: int, queue_index: int) -> Optional[CachedTrack]:
+        queue = self._queue(chat_id)
+        removed = queue.remove_at(queue_index) if queue else None
+        if removed:
+            self._notify_removed(chat_id, [removed])
+            self._notify_changed(chat_id)
+        return removed
+
+    def move_track(self, chat_id: int, source: int, target: int) -> bool:
+        queue = self._queue(chat_id)
+        if not queue or not queue.move(source, target):
+            return False
+        self._notify_changed(chat_id)
+        return True
+
+    def shuffle_queue(self, chat_id: int) -> bool:
+        """Shuffle upcoming tracks; the playing track stays in place."""
+        queue = self._queue(chat_id)
+        if not queue or len(queue) < 3:
+            return False
+        queue.shuffle(start=1)
+        self._notify_changed(chat_id)
+        return True
 
     def get_queue(self, chat_id: int) -> list[CachedTrack]:
-        return list(self.chat_cache.get(chat_id, {}).get("queue", deque()))
+        """Return a snapshot of a chat's queue (empty if there is none)."""
+        queue = self._queue(chat_id)
+        return list(queue) if queue else []
 
     def get_active_chats(self) -> list[int]:
         return [
             chat_id for chat_id, data in self.chat_cache.items() if data["is_active"]
         ]
 
+    def get_queued_file_paths(self) -> set[str]:
+        return {
+            str(song.file_path)
+            for data in self.chat_cache.values()
+            for song in data["queue"]
+            if song.file_path
+        }
+
 
 chat_cache: ChatCacher = ChatCacher()
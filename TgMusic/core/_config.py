@@ -46,6 +46,99 @@ class BotConfig:
 
         self.DOWNLOADS_DIR: Path = Path(os.getenv("DOWNLOADS_DIR", "database/videos"))
 
+        # Chat settings cache
+        self.CHAT_CACHE_SIZE: int = self._get_env_int("CHAT_CACHE_SIZE", 1000)
+        self.CHAT_CACHE_TTL: int = self._get_env_int("CHAT_CACHE_TTL", 1200)
+        self.CHAT_CACHE_NEGATIVE_TTL: int = self._get_env_int(
+            "CHAT_CACHE_NEGATIVE_TTL", 300
+        )
+        self.CHAT_CACHE_MAX_STALE: int = self._get_env_int("CHAT_CACHE_MAX_STALE", 3600)
+
+        # Seconds between re-reads of bot-wide flags (0 disables)
+        self.BOT_FLAGS_REFRESH: int = self._get_env_int("BOT_FLAGS_REFRESH", 300)
+
+        # Cross-instance cache invalidation: off, auto, changestream or poll
+        self.CACHE_INVALIDATION: str = os.getenv("CACHE_INVALIDATION", "off").lower()
+        self.CACHE_INVALIDATION_POLL: int = self._get_env_int(
+            "CACHE_INVALIDATION_POLL", 5
+        )
+
+        # Batched chat/user registration
+        self.DB_WRITE_BATCH_SIZE: int = self._get_env_int("DB_WRITE_BATCH_SIZE", 100)
+        self.DB_WRITE_DELAY_MS: int = self._get_env_int("DB_WRITE_DELAY_MS", 500)
+        self.DB_KNOWN_IDS_SIZE: int = self._get_env_int("DB_KNOWN_IDS_SIZE", 50000)
+
+        # Media Cache
+        self.MEDIA_CACHE_MAX_MB: int = self._get_env_int("MEDIA_CACHE_MAX_MB", 5120)
+        self.MEDIA_CACHE_POLICY: str = os.getenv("MEDIA_CACHE_POLICY", "lru").lower()
+
+        # Rendered thumbnails
+        self.THUMB_CACHE_DIR: Path = Path(os.getenv("THUMB_CACHE_DIR", "database/thumbs"))
+        self.THUMB_CACHE_MAX_MB: int = self._get_env_int("THUMB_CACHE_MAX_MB", 200)
+        self.THUMB_COVER_CACHE_SIZE: int = self._get_env_int(
+            "THUMB_COVER_CACHE_SIZE", 32
+        )
+
+        # Metadata Cache
+        self.METADATA_CACHE_SIZE: int = self._get_env_int("METADATA_CACHE_SIZE", 2048)
+        self.METADATA_CACHE_PERSIST: bool = self._get_env_bool(
+            "METADATA_CACHE_PERSIST", True
+        )
+
+        # Search Cache
+        self.SEARCH_CACHE_SIZE: int = self._get_env_int("SEARCH_CACHE_SIZE", 1024)
+        self.SEARCH_CACHE_TTL: int = self._get_env_int("SEARCH_CACHE_TTL", 3600)
+        self.SEARCH_NEGATIVE_TTL: int = self._get_env_int("SEARCH_NEGATIVE_TTL", 120)
+
+        # HTTP connection pool
+        self.HTTP_MAX_CONNECTIONS: int = self._get_env_int("HTTP_MAX_CONNECTIONS", 100)
+        self.HTTP_MAX_KEEPALIVE: int = self._get_env_int("HTTP_MAX_KEEPALIVE", 20)
+        self.HTTP_KEEPALIVE_EXPIRY: int = self._get_env_int("HTTP_KEEPALIVE_EXPIRY", 30)
+        self.HTTP2_ENABLED: bool = self._get_env_bool("HTTP2_ENABLED", False)
+
+        # Segmented downloads
+        self.DOWNLOAD_SEGMENTS: int = self._get_env_int("DOWNLOAD_SEGMENTS", 4)
+        self.DOWNLOAD_SEGMENT_MIN_MB: int = self._get_env_int(
+            "DOWNLOAD_SEGMENT_MIN_MB", 8
+        )
+
+        # Progressive playback
+        self.PROGRESSIVE_PLAYBACK: bool = self._get_env_bool(
+            "PROGRESSIVE_PLAYBACK", False
+        )
+        self.PROGRESSIVE_PREFIX_KB: int = self._get_env_int("PROGRESSIVE_PREFIX_KB", 512)
+        self.PROGRESSIVE_PORT: int = self._get_env_int("PROGRESSIVE_PORT", 0)
+
+        # Queue
+        self.QUEUE_LIMIT: int = self._get_env_int("QUEUE_LIMIT", 500)
+        self.QUEUE_PERSIST: bool = self._get_env_bool("QUEUE_PERSIST", True)
+        self.QUEUE_SNAPSHOT_INTERVAL: int = self._get_env_int(
+            "QUEUE_SNAPSHOT_INTERVAL", 10
+        )
+        self.QUEUE_RESTORE_MAX_AGE: int = self._get_env_int(
+            "QUEUE_RESTORE_MAX_AGE", 900
+        )
+
+        # Assistants
+        self.ASSISTANT_REBALANCE: bool = self._get_env_bool(
+            "ASSISTANT_REBALANCE", False
+        )
+        self.ASSISTANT_FAILOVER: bool = self._get_env_bool("ASSISTANT_FAILOVER", True)
+        self.ASSISTANT_COOLDOWN: int = self._get_env_int("ASSISTANT_COOLDOWN", 300)
+
+        # Prefetch
+        self.PREFETCH_DEPTH: int = self._get_env_int("PREFETCH_DEPTH", 2)
+        self.PREFETCH_CONCURRENCY: int = self._get_env_int("PREFETCH_CONCURRENCY", 3)
+
+        # yt-dlp worker pool
+        self.YTDLP_WORKERS: int = self._get_env_int("YTDLP_WORKERS", 2)
+        self.YTDLP_TIMEOUT: int = self._get_env_int("YTDLP_TIMEOUT", 600)
+
+        # CPU offload
+        self.OFFLOAD_WORKERS: int = self._get_env_int("OFFLOAD_WORKERS", 0)
+        self.OFFLOAD_MAX_PENDING: int = self._get_env_int("OFFLOAD_MAX_PENDING", 64)
+        self.OFFLOAD_PROCESSES: bool = self._get_env_bool("OFFLOAD_PROCESSES", True)
+
         self.SUPPORT_GROUP: str = os.getenv(
             "SUPPORT_GROUP", "https://t.me/GuardxSupport"
         )
@@ -148,6 +241,32 @@ class BotConfig:
             return []
         return [url.strip() for url in value.replace(",", " ").split() if url.strip()]
 
+    @staticmethod
+    def _clear_dir(path: Path, keep: tuple[Path, ...] = ()) -> None:
+        """
+        Recursively delete a directory while preserving selected subdirectories.
+
+        Args:
+            path (Path): Directory to clear.
+            keep (tuple[Path, ...]): Directories that must survive the wipe.
+        """
+        if not path.exists():
+            return
+
+        kept = tuple(p.resolve() for p in keep)
+        if not any(path.resolve() in k.parents for k in kept):
+            shutil.rmtree(path)
+            return
+
+        for child in path.iterdir():
+            resolved = child.resolve()
+            if resolved in kept:
+                continue
+            if child.is_dir() and not child.is_symlink():
+                BotConfig._clear_dir(child, keep)
+            else:
+                child.unlink(missing_ok=True)
+
     def _validate_config(self) -> None:
         """Validate all required environment configuration values."""
         missing = [
@@ -165,14 +284,22 @@ class BotConfig:
         if not self.SESSION_STRINGS and not self.SESSION_STRING:
             raise ValueError("At least one session string (SESSION_STRING) is required")
 
+        if self.MEDIA_CACHE_POLICY not in ("lru", "lfu"):
+            raise ValueError("MEDIA_CACHE_POLICY must be either 'lru' or 'lfu'")
+
+        if self.CACHE_INVALIDATION not in ("off", "auto", "changestream", "poll"):
+            raise ValueError(
+                "CACHE_INVALIDATION must be one of 'off', 'auto', 'changestream' or 'poll'"
+            )
+
         if self.IGNORE_BACKGROUND_UPDATES:
-            db_path = Path("database")
-            if db_path.exists():
-                shutil.rmtree(db_path)
+            self._clear_dir(
+                Path("database"), keep=(self.DOWNLOADS_DIR, self.THUMB_CACHE_DIR)
+            )
 
         try:
             self.DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
-            Path("database/photos").mkdir(parents=True, exist_ok=True)
+            self.THUMB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             raise RuntimeError(f"Failed to create required directories: {e}") from e
 
@@ -2,14 +2,254 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
-from typing import Optional
-
-from cachetools import TTLCache
-from pymongo import AsyncMongoClient
+import asyncio
+import time
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from cachetools import LRUCache
+from pymongo import AsyncMongoClient, DeleteOne, ReplaceOne, UpdateOne
 from pymongo.errors import ConnectionFailure
 
 from TgMusic.logger import LOGGER
 from ._config import config
+from ._dataclass import BotFlags, ChatSettings
+from ._singleflight import SingleFlight
+
+V = TypeVar("V")
+
+# Stamped on chat and bot writes so other instances can poll for changes
+_TOUCH = {"$currentDate": {"updated_at": True}}
+
+
+class UpsertBuffer:
+    """Batch ``$setOnInsert`` upserts of IDs into one collection.
+
+    The ``known_size`` most recently seen IDs are remembered once queued, so
+    repeat calls for them cost no database work; an ID that falls out of that
+    window is upserted again, which is harmless. New IDs are written with a
+    single ``bulk_write`` after ``delay_ms`` or as soon as ``batch_size`` of
+    them are waiting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection: Any,
+        batch_size: int,
+        delay_ms: int,
+        known_size: int,
+    ):
+        self.name = name
+        self._collection = collection
+        self.batch_size = max(batch_size, 1)
+        self.delay = max(delay_ms, 0) / 1000
+        self._known: LRUCache[int, bool] = LRUCache(maxsize=max(known_size, 1))
+        self._pending: set[int] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.added = 0
+        self.skipped = 0
+        self.writes = 0
+
+    def add(self, item_id: int) -> None:
+        # get() rather than ``in`` so a hit refreshes the ID's recency
+        if self._known.get(item_id):
+            self.skipped += 1
+            return
+        self._known[item_id] = True
+        self._pending.add(item_id)
+        if len(self._pending) >= self.batch_size:
+            self._spawn_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.delay, self._spawn_flush
+            )
+
+    def discard(self, item_id: int) -> None:
+        self._known.pop(item_id, None)
+        self._pending.discard(item_id)
+
+    def _spawn_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, set()
+        try:
+            result = await self._collection.bulk_write(
+                [
+                    UpdateOne({"_id": item_id}, {"$setOnInsert": {}}, upsert=True)
+                    for item_id in batch
+                ],
+                ordered=False,
+            )
+        except Exception as e:
+            LOGGER.warning("Error saving %d new %s: %s", len(batch), self.name, e)
+            # Forget them so the next message from these IDs retries the write
+            for item_id in batch:
+                self._known.pop(item_id, None)
+            return
+
+        self.writes += 1
+        if result.upserted_count:
+            self.added += result.upserted_count
+            LOGGER.info("Added %d new %s", result.upserted_count, self.name)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "added": self.added,
+            "skipped": self.skipped,
+            "writes": self.writes,
+            "known": len(self._known),
+        }
+
+
+@dataclass(slots=True)
+class _CachedDoc:
+    doc: Optional[dict]
+    fetched_at: float
+    written_at: float = 0.0
+    # Typed view of ``doc``, rebuilt after the document changes
+    view: Any = None
+
+
+class DocumentCache:
+    """Cache documents by ID, including IDs that have no document.
+
+    Entries are fresh for ``ttl`` seconds (``negative_ttl`` for missing
+    documents). After that the stale value is still returned while one
+    background read refreshes it, for up to ``max_stale`` more seconds.
+    If a read fails, the last known value is served rather than blocking
+    callers on a slow or unavailable database.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[Any], Awaitable[Optional[dict]]],
+        maxsize: int,
+        ttl: int,
+        negative_ttl: int,
+        max_stale: int,
+    ) -> None:
+        self._load = load
+        self._entries: LRUCache[Any, _CachedDoc] = LRUCache(maxsize=maxsize)
+        self._flight: SingleFlight[Optional[dict]] = SingleFlight()
+        self._refreshes: set[asyncio.Task] = set()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+
+    async def get(self, key: Any) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            ttl = self.ttl if entry.doc is not None else self.negative_ttl
+            if age < ttl:
+                self.hits += 1
+                return entry.doc
+            if age < ttl + self.max_stale:
+                self.stale += 1
+                self._refresh(key)
+                return entry.doc
+
+        self.misses += 1
+        try:
+            return await self._flight.do(key, lambda: self._fetch(key))
+        except Exception as e:
+            self.errors += 1
+            LOGGER.warning("Error loading document %s: %s", key, e)
+            return entry.doc if entry is not None else None
+
+    async def get_as(self, key: Any, factory: Callable[[Optional[dict]], V]) -> V:
+        """Return ``factory(doc)``, built once per version of the document."""
+        doc = await self.get(key)
+        entry = self._entries.get(key)
+        if entry is None or entry.doc is not doc:
+            return factory(doc)
+        if entry.view is None:
+            entry.view = factory(doc)
+        return entry.view
+
+    async def _fetch(self, key: Any) -> Optional[dict]:
+        started = time.monotonic()
+        doc = await self._load(key)
+        entry = self._entries.get(key)
+        # A write that landed while we were reading is newer than the read
+        if entry is not None and entry.written_at > started:
+            return entry.doc
+        self._entries[key] = _CachedDoc(doc, time.monotonic())
+        return doc
+
+    def _refresh(self, key: Any) -> None:
+        task = asyncio.create_task(self._flight.do(key, lambda: self._fetch(key)))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and (error := task.exception()) is not None:
+            self.errors += 1
+            LOGGER.warning("Background document refresh failed: %s", error)
+
+    def update(self, key: Any, fields: dict[str, Any]) -> None:
+        """Apply an upsert that just succeeded to the cached document."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if entry.doc is None:
+            entry.doc = {"_id": key}
+        entry.doc.update(fields)
+        entry.written_at = time.monotonic()
+        entry.view = None
+
+    def replace_cached(self, key: Any, doc: Optional[dict]) -> bool:
+        """Swap in a newer copy of ``key`` if it is cached; others stay unloaded."""
+        if key not in self._entries:
+            return False
+        now = time.monotonic()
+        self._entries[key] = _CachedDoc(doc, now, written_at=now)
+        return True
+
+    def invalidate(self, key: Any) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def items(self) -> Iterator[tuple[Any, dict]]:
+        return (
+            (key, entry.doc)
+            for key, entry in list(self._entries.items())
+            if entry.doc is not None
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "errors": self.errors,
+            "entries": len(self._entries),
+        }
 
 
 class Database:
@@ -19,14 +259,44 @@ class Database:
         self.chat_db = _db["chats"]
         self.users_db = _db["users"]
         self.bot_db = _db["bot"]
-
-        self.chat_cache = TTLCache(maxsize=1000, ttl=1200)
-        self.bot_cache = TTLCache(maxsize=1000, ttl=1200)
+        self.metadata_db = _db["metadata"]
+        self.queue_db = _db["queues"]
+
+        self.chat_cache = DocumentCache(
+            lambda chat_id: self.chat_db.find_one(
+                {"_id": chat_id}, projection=list(ChatSettings.FIELDS)
+            ),
+            maxsize=config.CHAT_CACHE_SIZE,
+            ttl=config.CHAT_CACHE_TTL,
+            negative_ttl=config.CHAT_CACHE_NEGATIVE_TTL,
+            max_stale=config.CHAT_CACHE_MAX_STALE,
+        )
+        # Authoritative in memory once loaded; writes update it directly
+        self._bot_flags: dict[int, BotFlags] = {}
+        self._flags_written_at: dict[int, float] = {}
+        self._flags_task: Optional[asyncio.Task] = None
+
+        # Chats and users seen in messages, registered in batches
+        self.new_chats = UpsertBuffer(
+            "chats",
+            self.chat_db,
+            config.DB_WRITE_BATCH_SIZE,
+            config.DB_WRITE_DELAY_MS,
+            config.DB_KNOWN_IDS_SIZE,
+        )
+        self.new_users = UpsertBuffer(
+            "users",
+            self.users_db,
+            config.DB_WRITE_BATCH_SIZE,
+            config.DB_WRITE_DELAY_MS,
+            config.DB_KNOWN_IDS_SIZE,
+        )
 
     async def ping(self) -> None:
         try:
             await self.mongo_client.aconnect()
             await self.mongo_client.admin.command("ping")
+            await self.metadata_db.create_index("expires_at", expireAfterSeconds=0)
             LOGGER.info("Database connection completed.")
         except ConnectionFailure as e:
             raise ConnectionFailure(
@@ -37,41 +307,33 @@ class Database:
             raise RuntimeError(f"Database connection failed.{str(e)}") from e
 
     async def get_chat(self, chat_id: int) -> Optional[dict]:
-        if chat_id in self.chat_cache:
-            return self.chat_cache[chat_id]
-        try:
-            if chat := await self.chat_db.find_one({"_id": chat_id}):
-                self.chat_cache[chat_id] = chat
-            return chat
-        except Exception as e:
-            LOGGER.warning("Error getting chat: %s", e)
-            return None
+        return await self.chat_cache.get(chat_id)
+
+    async def get_chat_settings(self, chat_id: int) -> ChatSettings:
+        """Return every per-chat setting from one cached read.
+
+        Fetch this once per request and pass it along instead of calling
+        the individual getters repeatedly.
+        """
+        return await self.chat_cache.get_as(chat_id, ChatSettings.from_doc)
 
     async def add_chat(self, chat_id: int) -> None:
-        if await self.get_chat(chat_id) is None:
-            LOGGER.info("Added chat: %s", chat_id)
-            await self.chat_db.update_one(
-                {"_id": chat_id}, {"$setOnInsert": {}}, upsert=True
-            )
+        self.new_chats.add(chat_id)
 
     async def _update_chat_field(self, chat_id: int, key: str, value) -> None:
         await self.chat_db.update_one(
-            {"_id": chat_id}, {"$set": {key: value}}, upsert=True
+            {"_id": chat_id}, {"$set": {key: value}, **_TOUCH}, upsert=True
         )
-        cached = self.chat_cache.get(chat_id, {})
-        cached[key] = value
-        self.chat_cache[chat_id] = cached
+        self.chat_cache.update(chat_id, {key: value})
 
     async def get_play_type(self, chat_id: int) -> int:
-        chat = await self.get_chat(chat_id)
-        return chat.get("play_type", 0) if chat else 0
+        return (await self.get_chat_settings(chat_id)).play_type
 
     async def set_play_type(self, chat_id: int, play_type: int) -> None:
         await self._update_chat_field(chat_id, "play_type", play_type)
 
     async def get_assistant(self, chat_id: int) -> Optional[str]:
-        chat = await self.get_chat(chat_id)
-        return chat.get("assistant") if chat else None
+        return (await self.get_chat_settings(chat_id)).assistant
 
     async def set_assistant(self, chat_id: int, assistant: str) -> None:
         await self._update_chat_field(chat_id, "assistant", assistant)
@@ -79,13 +341,13 @@ class Database:
     async def clear_all_assistants(self) -> int:
         # Clear assistants from all chats in the database
         result = await self.chat_db.update_many(
-            {"assistant": {"$exists": True}}, {"$unset": {"assistant": ""}}
+            {"assistant": {"$exists": True}}, {"$unset": {"assistant": ""}, **_TOUCH}
         )
 
         # Clear assistants from all cached chats
-        for chat_id in list(self.chat_cache.keys()):
-            if "assistant" in self.chat_cache[chat_id]:
-                self.chat_cache[chat_id]["assistant"] = None
+        for chat_id, chat in self.chat_cache.items():
+            if "assistant" in chat:
+                self.chat_cache.update(chat_id, {"assistant": None})
 
         LOGGER.info(f"Cleared assistants from {result.modified_count} chats")
         return result.modified_count
@@ -95,58 +357,55 @@ class Database:
 
     async def add_auth_user(self, chat_id: int, auth_user: int) -> None:
         await self.chat_db.update_one(
-            {"_id": chat_id}, {"$addToSet": {"auth_users": auth_user}}, upsert=True
+            {"_id": chat_id},
+            {"$addToSet": {"auth_users": auth_user}, **_TOUCH},
+            upsert=True,
         )
-        chat = await self.get_chat(chat_id)
-        auth_users = chat.get("auth_users", [])
+        auth_users = await self.get_auth_users(chat_id)
         if auth_user not in auth_users:
             auth_users.append(auth_user)
-        self.chat_cache[chat_id]["auth_users"] = auth_users
+        self.chat_cache.update(chat_id, {"auth_users": auth_users})
 
     async def remove_auth_user(self, chat_id: int, auth_user: int) -> None:
         await self.chat_db.update_one(
-            {"_id": chat_id}, {"$pull": {"auth_users": auth_user}}
+            {"_id": chat_id}, {"$pull": {"auth_users": auth_user}, **_TOUCH}
         )
-        chat = await self.get_chat(chat_id)
-        auth_users = chat.get("auth_users", [])
+        auth_users = await self.get_auth_users(chat_id)
         if auth_user in auth_users:
             auth_users.remove(auth_user)
-        self.chat_cache[chat_id]["auth_users"] = auth_users
+        self.chat_cache.update(chat_id, {"auth_users": auth_users})
 
     async def reset_auth_users(self, chat_id: int) -> None:
         await self._update_chat_field(chat_id, "auth_users", [])
 
     async def get_auth_users(self, chat_id: int) -> list[int]:
-        chat = await self.get_chat(chat_id)
-        return chat.get("auth_users", []) if chat else []
+        return list((await self.get_chat_settings(chat_id)).auth_users)
 
     async def is_auth_user(self, chat_id: int, user_id: int) -> bool:
-        return user_id in await self.get_auth_users(chat_id)
+        return user_id in (await self.get_chat_settings(chat_id)).auth_users
 
     async def set_buttons_status(self, chat_id: int, status: bool) -> None:
         await self._update_chat_field(chat_id, "buttons", status)
 
     async def get_buttons_status(self, chat_id: int) -> bool:
-        chat = await self.get_chat(chat_id)
-        return chat.get("buttons", True) if chat else True
+        return (await self.get_chat_settings(chat_id)).buttons
 
     async def set_thumbnail_status(self, chat_id: int, status: bool) -> None:
         await self._update_chat_field(chat_id, "thumb", status)
 
     async def get_thumbnail_status(self, chat_id: int) -> bool:
-        chat = await self.get_chat(chat_id)
-        return chat.get("thumb", True) if chat else True
+        return (await self.get_chat_settings(chat_id)).thumbnail
 
     async def remove_chat(self, chat_id: int) -> None:
+        self.new_chats.discard(chat_id)
         await self.chat_db.delete_one({"_id": chat_id})
-        self.chat_cache.pop(chat_id, None)
+        self.chat_cache.invalidate(chat_id)
 
     async def add_user(self, user_id: int) -> None:
-        await self.users_db.update_one(
-            {"_id": user_id}, {"$setOnInsert": {}}, upsert=True
-        )
+        self.new_users.add(user_id)
 
     async def remove_user(self, user_id: int) -> None:
+        self.new_users.discard(user_id)
         await self.users_db.delete_one({"_id": user_id})
 
     async def is_user_exist(self, user_id: int) -> bool:
@@ -158,52 +417,136 @@ class Database:
     async def get_all_chats(self) -> list[int]:
         return [chat["_id"] async for chat in self.chat_db.find()]
 
-    async def get_logger_status(self, bot_id: int) -> bool:
-        if bot_id in self.bot_cache and self.bot_cache[bot_id].get("logger"):
-            return self.bot_cache[bot_id].get("logger")
-
-        bot_data = await self.bot_db.find_one({"_id": bot_id})
-        status = bot_data.get("logger", False) if bot_data else False
-
-        # Update cache
-        cached = self.bot_cache.get(bot_id, {})
-        cached["logger"] = status
-        self.bot_cache[bot_id] = cached
-
-        return status
+    async def load_bot_flags(self, bot_id: int) -> BotFlags:
+        """Read the bot-wide flags from the database into memory.
 
-    async def set_logger_status(self, bot_id: int, status: bool) -> None:
+        Returns:
+            BotFlags: The loaded flags, or the last known ones if the read fails.
+        """
+        started = time.monotonic()
+        try:
+            doc = await self.bot_db.find_one({"_id": bot_id})
+        except Exception as e:
+            LOGGER.warning("Error loading bot flags: %s", e)
+            return self._bot_flags.get(bot_id, BotFlags())
+
+        # Keep a value written while the read was in flight
+        if self._flags_written_at.get(bot_id, 0.0) > started:
+            return self._bot_flags[bot_id]
+        flags = self._bot_flags[bot_id] = BotFlags.from_doc(doc)
+        return flags
+
+    def watch_bot_flags(self, bot_id: int, interval: int) -> None:
+        """Re-read the flags every ``interval`` seconds (0 disables)."""
+        if interval <= 0 or self._flags_task is not None:
+            return
+
+        async def _refresh() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                await self.load_bot_flags(bot_id)
+
+        self._flags_task = asyncio.create_task(_refresh())
+
+    def apply_bot_flags(self, bot_id: int, doc: Optional[dict]) -> None:
+        """Replace the in-memory flags with a document read elsewhere."""
+        self._bot_flags[bot_id] = BotFlags.from_doc(doc)
+        self._flags_written_at[bot_id] = time.monotonic()
+
+    async def get_bot_flags(self, bot_id: int) -> BotFlags:
+        if (flags := self._bot_flags.get(bot_id)) is None:
+            flags = await self.load_bot_flags(bot_id)
+        return flags
+
+    async def _set_bot_flag(self, bot_id: int, key: str, value: bool) -> None:
         await self.bot_db.update_one(
-            {"_id": bot_id}, {"$set": {"logger": status}}, upsert=True
+            {"_id": bot_id}, {"$set": {key: value}, **_TOUCH}, upsert=True
         )
+        flags = await self.get_bot_flags(bot_id)
+        self._bot_flags[bot_id] = replace(flags, **{key: value})
+        self._flags_written_at[bot_id] = time.monotonic()
 
-        # Update cache
-        cached = self.bot_cache.get(bot_id, {})
-        cached["logger"] = status
-        self.bot_cache[bot_id] = cached
+    async def get_logger_status(self, bot_id: int) -> bool:
+        return (await self.get_bot_flags(bot_id)).logger
 
-    async def get_auto_end(self, bot_id: int) -> bool:
-        if bot_id in self.bot_cache and self.bot_cache[bot_id].get("auto_end"):
-            return self.bot_cache[bot_id].get("auto_end")
+    async def set_logger_status(self, bot_id: int, status: bool) -> None:
+        await self._set_bot_flag(bot_id, "logger", status)
 
-        bot_data = await self.bot_db.find_one({"_id": bot_id})
-        status = bot_data.get("auto_end", True) if bot_data else True
-        # Update cache
-        cached = self.bot_cache.get(bot_id, {})
-        cached["auto_end"] = status
-        self.bot_cache[bot_id] = cached
-        return status
+    async def get_auto_end(self, bot_id: int) -> bool:
+        return (await self.get_bot_flags(bot_id)).auto_end
 
     async def set_auto_end(self, bot_id: int, status: bool) -> None:
-        await self.bot_db.update_one(
-            {"_id": bot_id}, {"$set": {"auto_end": status}}, upsert=True
-        )
-        # Update cache
-        cached = self.bot_cache.get(bot_id, {})
-        cached["auto_end"] = status
-        self.bot_cache[bot_id] = cached
+        await self._set_bot_flag(bot_id, "auto_end", status)
+
+    async def get_metadata(self, key: str) -> Optional[dict]:
+        try:
+            return await self.metadata_db.find_one({"_id": key})
+        except Exception as e:
+            LOGGER.warning("Error getting metadata %s: %s", key, e)
+            return None
+
+    async def set_metadata(self, key: str, entry: dict, expires_at: datetime) -> None:
+        try:
+            await self.metadata_db.update_one(
+                {"_id": key},
+                {"$set": {**entry, "expires_at": expires_at}},
+                upsert=True,
+            )
+        except Exception as e:
+            LOGGER.warning("Error saving metadata %s: %s", key, e)
+
+    async def get_queue_snapshots(self) -> list[dict]:
+        try:
+            return await self.queue_db.find({}).to_list(None)
+        except Exception as e:
+            LOGGER.warning("Error loading queue snapshots: %s", e)
+            return []
+
+    async def write_queue_snapshots(
+        self,
+        snapshots: list[dict],
+        positions: dict[int, int],
+        removed: list[int],
+        saved_at: float,
+    ) -> bool:
+        """Apply queue snapshot changes in a single bulk write.
+
+        Args:
+            snapshots: Full snapshots to upsert, keyed by ``_id``.
+            positions: Playback offsets to update for unchanged queues.
+            removed: Chat IDs whose snapshot should be deleted.
+            saved_at: Timestamp stored with every updated snapshot.
+
+        Returns:
+            bool: False if the write failed and should be retried.
+        """
+        requests = [
+            ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in snapshots
+        ]
+        requests += [
+            UpdateOne(
+                {"_id": chat_id},
+                {"$set": {"position": position, "saved_at": saved_at}},
+            )
+            for chat_id, position in positions.items()
+        ]
+        requests += [DeleteOne({"_id": chat_id}) for chat_id in removed]
+        if not requests:
+            return True
+        try:
+            await self.queue_db.bulk_write(requests, ordered=False)
+            return True
+        except Exception as e:
+            LOGGER.warning("Error saving queue snapshots: %s", e)
+            return False
 
     async def close(self) -> None:
+        if self._flags_task is not None:
+            self._flags_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flags_task
+            self._flags_task = None
+        await asyncio.gather(self.new_chats.close(), self.new_users.close())
         await self.mongo_client.close()
         LOGGER.info("Database connection closed.")
 
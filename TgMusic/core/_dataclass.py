@@ -2,13 +2,121 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Union
+from typing import Any, ClassVar, Optional, Union
 
 from pydantic import BaseModel
 
 
-class CachedTrack(BaseModel):
+@dataclass(slots=True)
+class CachedTrack:
+    """A queue entry.
+
+    Kept as a slotted dataclass because queues hold many of these and they
+    are created in bulk for playlists; use ``CachedTrackModel`` where data
+    crosses a validation boundary (storage, external input).
+    """
+
+    url: str
+    name: str
+    loop: int
+    user: str
+    file_path: Union[str, Path]
+    thumbnail: str
+    track_id: str
+    is_video: bool
+    platform: str
+    duration: int = 0
+    # Stable identity inside a chat queue, assigned by TrackQueue
+    entry_id: int = field(default=0, compare=False)
+
+    @classmethod
+    def from_track(
+        cls,
+        track: "MusicTrack",
+        user: str,
+        is_video: bool = False,
+        loop: int = 0,
+        file_path: Union[str, Path] = "",
+    ) -> "CachedTrack":
+        """Build a queue entry from an already validated ``MusicTrack``."""
+        return cls(
+            url=track.url,
+            name=track.name,
+            loop=loop,
+            user=user,
+            file_path=file_path,
+            thumbnail=track.cover,
+            track_id=track.id,
+            is_video=is_video,
+            platform=track.platform,
+            duration=track.duration,
+        )
+
+    @classmethod
+    def from_model(cls, model: "CachedTrackModel") -> "CachedTrack":
+        return cls(**model.model_dump())
+
+    def to_model(self, validate: bool = True) -> "CachedTrackModel":
+        """Convert to the pydantic form; skip validation for trusted data."""
+        data = asdict(self)
+        if validate:
+            return CachedTrackModel(**data)
+        return CachedTrackModel.model_construct(**data)
+
+
+@dataclass(frozen=True, slots=True)
+class ChatSettings:
+    """Per-chat settings read from a single chat document.
+
+    One instance is shared by every caller until the chat's settings
+    change, so it is immutable.
+    """
+
+    # Document fields the settings are read from
+    FIELDS: ClassVar[tuple[str, ...]] = (
+        "play_type",
+        "buttons",
+        "thumb",
+        "assistant",
+        "auth_users",
+    )
+
+    play_type: int = 0
+    buttons: bool = True
+    thumbnail: bool = True
+    assistant: Optional[str] = None
+    auth_users: tuple[int, ...] = ()
+
+    @classmethod
+    def from_doc(cls, doc: Optional[dict[str, Any]]) -> "ChatSettings":
+        if not doc:
+            return cls()
+        return cls(
+            play_type=doc.get("play_type", 0),
+            buttons=doc.get("buttons", True),
+            thumbnail=doc.get("thumb", True),
+            assistant=doc.get("assistant"),
+            auth_users=tuple(doc.get("auth_users") or ()),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class BotFlags:
+    """Bot-wide switches stored in the ``bot`` collection."""
+
+    logger: bool = False
+    auto_end: bool = True
+
+    @classmethod
+    def from_doc(cls, doc: Optional[dict[str, Any]]) -> "BotFlags":
+        if not doc:
+            return cls()
+        return cls(logger=doc.get("logger", False), auto_end=doc.get("auto_end", True))
+
+
+class CachedTrackModel(BaseModel):
     url: str
     name: str
     loop: int
@@ -19,6 +127,7 @@ class CachedTrack(BaseModel):
     duration: int = 0
     is_video: bool
     platform: str
+    entry_id: int = 0
 
 
 class TrackInfo(BaseModel):
@@ -38,7 +38,8 @@ class DownloaderWrapper(MusicService):
         from ._jiosaavn import JiosaavnData
 
         services = [YouTubeData, JiosaavnData, ApiData]
-        service = next((s(self.query) for s in services if s(self.query).is_valid()), None)
+        candidates = (s(self.query) for s in services)
+        service = next((s for s in candidates if s.is_valid()), None)
 
         if service:
             return service
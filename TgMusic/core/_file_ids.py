@@ -0,0 +1,130 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import os
+from typing import Awaitable, Callable, NamedTuple, Optional, TypeVar
+
+from cachetools import LRUCache, TTLCache
+from pytdbot import types
+
+from TgMusic.logger import LOGGER
+
+T = TypeVar("T")
+
+
+class _PendingSend(NamedTuple):
+    key: str
+    cached: bool
+
+
+class RemoteFileCache:
+    """Reuse Telegram file IDs for photos the bot has already uploaded.
+
+    Sources are keyed by a fingerprint: path, modification time and size
+    for local files, or the string itself for URLs, so a changed file is
+    uploaded again automatically. A cached ID that Telegram rejects is
+    dropped and the send is retried with the original file.
+
+    Edits return the final message immediately; new messages only get
+    their remote ID once ``updateMessageSendSucceeded`` arrives, which is
+    forwarded here by ``on_send_succeeded``/``on_send_failed``.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._ids: LRUCache[str, str] = LRUCache(maxsize=maxsize)
+        self._pending: TTLCache[tuple[int, int], _PendingSend] = TTLCache(
+            maxsize=maxsize, ttl=600
+        )
+        self.hits = 0
+        self.uploads = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def fingerprint(source: str) -> str:
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return source
+        return f"{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    @staticmethod
+    def _input_file(source: str) -> types.InputFile:
+        if os.path.isfile(source):
+            return types.InputFileLocal(source)
+        return types.InputFileRemote(source)
+
+    @staticmethod
+    def _remote_id(message: types.Message) -> Optional[str]:
+        photo = getattr(getattr(message, "content", None), "photo", None)
+        if photo is None or not photo.sizes:
+            return None
+        remote = photo.sizes[-1].photo.remote
+        return remote.id if remote.id and remote.is_uploading_completed else None
+
+    def forget(self, key: str) -> None:
+        if self._ids.pop(key, None) is not None:
+            self.invalidated += 1
+
+    def _track(self, key: str, result: object, cached: bool) -> None:
+        if not isinstance(result, types.Message):
+            return
+        if remote_id := self._remote_id(result):
+            self._ids[key] = remote_id
+        elif result.sending_state is not None:
+            self._pending[(result.chat_id, result.id)] = _PendingSend(key, cached)
+
+    async def send(
+        self, source: str, send: Callable[[types.InputFile], Awaitable[T]]
+    ) -> T:
+        """Send ``source`` with ``send``, reusing a known remote file ID.
+
+        Args:
+            source: Local path or URL of the photo.
+            send: Coroutine function taking the ``InputFile`` to send.
+
+        Returns:
+            Whatever ``send`` returns.
+        """
+        key = self.fingerprint(source)
+        if remote_id := self._ids.get(key):
+            result = await send(types.InputFileRemote(remote_id))
+            if not isinstance(result, types.Error):
+                self.hits += 1
+                self._track(key, result, cached=True)
+                return result
+            LOGGER.info(
+                "Cached file ID for %s was rejected: %s", source, result.message
+            )
+            self.forget(key)
+
+        result = await send(self._input_file(source))
+        if not isinstance(result, types.Error):
+            self.uploads += 1
+            self._track(key, result, cached=False)
+        return result
+
+    def on_send_succeeded(self, update: types.UpdateMessageSendSucceeded) -> None:
+        message_key = (update.message.chat_id, update.old_message_id)
+        pending = self._pending.pop(message_key, None)
+        if pending and not pending.cached:
+            if remote_id := self._remote_id(update.message):
+                self._ids[pending.key] = remote_id
+
+    def on_send_failed(self, update: types.UpdateMessageSendFailed) -> None:
+        message_key = (update.message.chat_id, update.old_message_id)
+        pending = self._pending.pop(message_key, None)
+        if pending and pending.cached:
+            LOGGER.info("Message sent with a cached file ID failed: %s", update.error)
+            self.forget(pending.key)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "uploads": self.uploads,
+            "invalidated": self.invalidated,
+            "cached": len(self._ids),
+        }
+
+
+file_ids: RemoteFileCache = RemoteFileCache()
@@ -3,21 +3,34 @@
 # Part of the TgMusicBot project. All rights reserved where applicable.
 
 import asyncio
+import json
 import re
 import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Any, Optional, Union, Dict
-from urllib.parse import unquote
+from typing import Any, AsyncIterator, Optional, Union, Dict
+from urllib.parse import unquote, urlsplit
 
 import aiofiles
 import httpx
 from aiofiles import os
 
 from ._config import config
+from ._progressive import report_progress
 from TgMusic.logger import LOGGER
 
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class _RangeNotSupported(Exception):
+    """Raised when a server ignores a byte-range request."""
+
 
 @dataclass
 class DownloadResult:
@@ -27,7 +40,169 @@ class DownloadResult:
     status_code: Optional[int] = None
 
 
+@dataclass
+class _PartState:
+    """Progress of a ``.part`` file, persisted in a ``.part.json`` sidecar.
+
+    ``segments`` holds ``[start, end, written]`` triples for ranged
+    downloads; single-stream downloads only use ``written``.
+    """
+
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    size: int = 0
+    written: int = 0
+    segments: list[list[int]] = field(default_factory=list)
+    _saved_at: float = field(default=0.0, repr=False, compare=False)
+    # Segment tasks share one sidecar
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
+    SAVE_INTERVAL = 1.0
+
+    @staticmethod
+    def sidecar(part_path: Path) -> Path:
+        return part_path.with_name(f"{part_path.name}.json")
+
+    @classmethod
+    def from_response(cls, url: str, response: httpx.Response) -> "_PartState":
+        try:
+            size = int(response.headers.get("Content-Length", 0))
+        except ValueError:
+            size = 0
+        return cls(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            size=size,
+        )
+
+    @classmethod
+    async def load(cls, part_path: Path, url: str) -> Optional["_PartState"]:
+        """Load the sidecar for ``part_path`` if it belongs to ``url``."""
+        sidecar = cls.sidecar(part_path)
+        if not part_path.exists() or not sidecar.exists():
+            return None
+        try:
+            async with aiofiles.open(sidecar, "r") as f:
+                data = json.loads(await f.read())
+            state = cls(**data)
+        except Exception as e:
+            LOGGER.debug("Ignoring unreadable download sidecar %s: %s", sidecar, e)
+            return None
+        return state if state.url == url else None
+
+    def contiguous(self) -> int:
+        """Number of bytes available without gaps from the start of the file."""
+        if not self.segments:
+            return self.written
+        available = 0
+        for start, end, written in self.segments:
+            available += written
+            if written < end - start + 1:
+                break
+        return available
+
+    def if_range(self) -> Optional[str]:
+        """Validator for an ``If-Range`` header, preferring the strong ETag."""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    def same_resource(self, other: "_PartState") -> bool:
+        return (
+            self.size == other.size
+            and self.etag == other.etag
+            and self.last_modified == other.last_modified
+            and self.if_range() is not None
+        )
+
+    async def save(self, part_path: Path, force: bool = True) -> None:
+        if not force and (
+            self._lock.locked()
+            or time.monotonic() - self._saved_at < self.SAVE_INTERVAL
+        ):
+            return
+        async with self._lock:
+            self._saved_at = time.monotonic()
+            data = json.dumps(
+                {
+                    f.name: getattr(self, f.name)
+                    for f in fields(self)
+                    if not f.name.startswith("_")
+                }
+            )
+            async with aiofiles.open(self.sidecar(part_path), "w") as f:
+                await f.write(data)
+
+    @classmethod
+    async def discard(cls, part_path: Path) -> None:
+        for path in (part_path, cls.sidecar(part_path)):
+            if path.exists():
+                await os.remove(path)
+
+
+def _is_encoded(response: httpx.Response) -> bool:
+    """Whether the body is compressed, so decoded sizes differ from the headers."""
+    encoding = response.headers.get("Content-Encoding", "").strip().lower()
+    return encoding not in ("", "identity")
+
+
+class HttpClientPool:
+    """Process-wide registry of pooled ``httpx.AsyncClient`` sessions.
+
+    One client is kept per (host, redirect policy) so that connections are
+    reused with keep-alive across every caller in the bot. Clients are only
+    closed by :meth:`close` during shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, int], httpx.AsyncClient] = {}
+        self._limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        self._http2 = config.HTTP2_ENABLED and HTTP2_AVAILABLE
+        if config.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+            LOGGER.warning("HTTP2_ENABLED is set but the 'h2' package is missing")
+
+    def get(self, url: str, max_redirects: int = 0) -> httpx.AsyncClient:
+        """Return the shared client for the host of ``url``.
+
+        Args:
+            url: Request URL; only its host is used for pooling.
+            max_redirects: Redirects to follow (0 disables following).
+
+        Returns:
+            httpx.AsyncClient: A long-lived pooled client.
+        """
+        key = (urlsplit(url).netloc.lower(), max_redirects)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self._limits,
+                http2=self._http2,
+                timeout=HttpxClient.DEFAULT_TIMEOUT,
+                follow_redirects=max_redirects > 0,
+                max_redirects=max_redirects,
+            )
+            self._clients[key] = client
+        return client
+
+    async def close(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        results = await asyncio.gather(
+            *(client.aclose() for client in clients), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER.error("Error closing HTTP session: %s", repr(result))
+
+
 class HttpxClient:
+    # Byte offsets and lengths must count the bytes written to disk
+    IDENTITY_ENCODING = {"Accept-Encoding": "identity"}
     DEFAULT_TIMEOUT = 30
     DEFAULT_DOWNLOAD_TIMEOUT = 120
     CHUNK_SIZE = 1024 * 1024
@@ -43,22 +218,12 @@ class HttpxClient:
         self._timeout = timeout
         self._download_timeout = download_timeout
         self._max_redirects = max_redirects
-        self._session = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                connect=self._timeout,
-                read=self._timeout,
-                write=self._timeout,
-                pool=self._timeout,
-            ),
-            follow_redirects=max_redirects > 0,
-            max_redirects=max_redirects,
-        )
+
+    def _session(self, url: str) -> httpx.AsyncClient:
+        return http_pool.get(url, self._max_redirects)
 
     async def close(self) -> None:
-        try:
-            await self._session.aclose()
-        except Exception as e:
-            LOGGER.error("Error closing HTTP session: %s", repr(e), exc_info=True)
+        """Kept for compatibility; pooled sessions are closed by ``http_pool``."""
 
     @staticmethod
     def _get_headers(url: str, base_headers: Dict[str, str]) -> Dict[str, str]:
@@ -80,6 +245,273 @@ class HttpxClient:
             pass
         return response.text or "No error details provided"
 
+    def _resolve_path(
+        self, url: str, headers: httpx.Headers, file_path: Optional[Union[str, Path]]
+    ) -> Path:
+        if file_path is not None:
+            return Path(file_path) if isinstance(file_path, str) else file_path
+
+        cd = headers.get("Content-Disposition", "")
+        match = re.search(r'filename="?([^"]+)"?', cd)
+        filename = (
+            unquote(match[1]) if match else Path(url).name or f"{uuid.uuid4().hex}.tmp"
+        )
+        return config.DOWNLOADS_DIR / self._sanitize_filename(filename)
+
+    async def _probe_ranges(
+        self, url: str, headers: Dict[str, str]
+    ) -> Optional[httpx.Response]:
+        """Issue a HEAD request and return it if the server supports byte ranges.
+
+        Returns:
+            The HEAD response when ranged download is worthwhile, otherwise None.
+        """
+        try:
+            response = await self._session(url).head(
+                url, headers=headers, timeout=self._timeout
+            )
+        except httpx.RequestError as e:
+            LOGGER.debug("Range probe failed for %s: %s", url, e)
+            return None
+
+        if not response.is_success:
+            return None
+        if response.headers.get("Accept-Ranges", "").lower() != "bytes":
+            return None
+
+        try:
+            size = int(response.headers.get("Content-Length", 0))
+        except ValueError:
+            return None
+        min_size = config.DOWNLOAD_SEGMENT_MIN_MB * 1024 * 1024
+        return response if size >= max(min_size, 1) else None
+
+    @staticmethod
+    def _split_ranges(size: int, parts: int) -> list[tuple[int, int]]:
+        step = -(-size // parts)
+        return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    async def _fetch_range(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        path: Path,
+        segment: list[int],
+        state: _PartState,
+    ) -> None:
+        start, end, _ = segment
+        range_headers = {**headers, "Range": f"bytes={start + segment[2]}-{end}"}
+        if validator := state.if_range():
+            range_headers["If-Range"] = validator
+
+        async with self._session(url).stream(
+            "GET", url, headers=range_headers, timeout=self._download_timeout
+        ) as response:
+            if response.status_code != 206:
+                raise _RangeNotSupported(
+                    f"Expected 206 for range {start}-{end}, got {response.status_code}"
+                )
+            if _is_encoded(response):
+                raise _RangeNotSupported(f"Range {start}-{end} came back compressed")
+
+            async with aiofiles.open(path, "r+b") as f:
+                await f.seek(start + segment[2])
+                async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                    await f.write(chunk)
+                    segment[2] += len(chunk)
+                    await state.save(path, force=False)
+                    report_progress(path, state.contiguous(), state.size)
+
+        if segment[2] != end - start + 1:
+            raise httpx.ReadError(
+                f"Range {start}-{end} ended early ({segment[2]} bytes received)"
+            )
+
+    async def _download_segmented(
+        self,
+        url: str,
+        source_url: str,
+        headers: Dict[str, str],
+        path: Path,
+        probe: httpx.Response,
+    ) -> None:
+        """Download a file over concurrent range requests into ``path``.
+
+        Progress is recorded in a sidecar so an interrupted download resumes
+        only the missing parts of each segment.
+        """
+        fresh = _PartState.from_response(source_url, probe)
+        state = await _PartState.load(path, source_url)
+        if state is None or not state.segments or not state.same_resource(fresh):
+            state = fresh
+            state.segments = [
+                [start, end, 0]
+                for start, end in self._split_ranges(
+                    state.size, config.DOWNLOAD_SEGMENTS
+                )
+            ]
+            async with aiofiles.open(path, "wb") as f:
+                await f.truncate(state.size)
+        else:
+            LOGGER.info(
+                "Resuming %s (%d/%d bytes)",
+                path.name,
+                sum(seg[2] for seg in state.segments),
+                state.size,
+            )
+
+        tasks = [
+            asyncio.create_task(self._fetch_range(url, headers, path, seg, state))
+            for seg in state.segments
+            if seg[2] < seg[1] - seg[0] + 1
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await state.save(path)
+            raise
+
+    async def _download_stream(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        file_path: Optional[Union[str, Path]],
+        overwrite: bool,
+    ) -> DownloadResult:
+        # Partial files can only be matched up front when the target is known
+        temp_path = state = None
+        if file_path is not None:
+            path = self._resolve_path(url, httpx.Headers(), file_path)
+            temp_path = self._temp_path(path)
+            state = await _PartState.load(temp_path, url)
+
+        offset = 0
+        request_headers = headers
+        if state and not state.segments and state.if_range():
+            offset = min(state.written, temp_path.stat().st_size)
+            if offset:
+                request_headers = {
+                    **headers,
+                    "Range": f"bytes={offset}-",
+                    "If-Range": state.if_range(),
+                }
+
+        async with self._session(url).stream(
+            "GET", url, timeout=self._download_timeout, headers=request_headers
+        ) as response:
+            if response.status_code == 416 and offset:
+                # The partial file no longer lines up with the resource
+                await _PartState.discard(temp_path)
+                raise httpx.ReadError("Stale partial download discarded")
+
+            if not response.is_success:
+                error_msg = await self._parse_error_response(response)
+                LOGGER.error(
+                    "Download failed for %s with status %d: %s",
+                    url,
+                    response.status_code,
+                    error_msg,
+                )
+                return DownloadResult(
+                    success=False, error=error_msg, status_code=response.status_code
+                )
+
+            path = self._resolve_path(url, response.headers, file_path)
+            if path.exists() and not overwrite:
+                LOGGER.debug("File already exists at %s and overwrite=False", path)
+                return DownloadResult(success=True, file_path=path)
+
+            temp_path = self._temp_path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            if _is_encoded(response) and response.status_code == 206:
+                await _PartState.discard(temp_path)
+                raise httpx.ReadError("Server compressed a resumed download")
+
+            if response.status_code == 206:
+                match = re.match(
+                    r"bytes (\d+)-\d+/(\d+|\*)",
+                    response.headers.get("Content-Range", ""),
+                )
+                if not match or int(match[1]) != offset:
+                    await _PartState.discard(temp_path)
+                    raise httpx.ReadError("Unexpected Content-Range on resume")
+                if match[2] != "*":
+                    state.size = int(match[2])
+                LOGGER.info("Resuming %s from byte %d", path.name, offset)
+            else:
+                offset = 0
+                state = _PartState.from_response(url, response)
+                if _is_encoded(response):
+                    # Content-Length counts compressed bytes and a resume
+                    # offset could not be mapped back, so neither is used
+                    state = _PartState(url=url)
+
+            state.written = offset
+            try:
+                async with aiofiles.open(temp_path, "r+b" if offset else "wb") as f:
+                    await f.seek(offset)
+                    await f.truncate()
+                    async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                        await f.write(chunk)
+                        await f.flush()
+                        state.written += len(chunk)
+                        await state.save(temp_path, force=False)
+                        report_progress(temp_path, state.written, state.size)
+            except Exception:
+                await state.save(temp_path)
+                raise
+
+        if state.size and state.written != state.size:
+            await state.save(temp_path)
+            raise httpx.ReadError(
+                f"Incomplete download ({state.written}/{state.size} bytes)"
+            )
+
+        temp_path.rename(path)
+        await _PartState.discard(temp_path)
+        return DownloadResult(success=True, file_path=path)
+
+    @staticmethod
+    def _temp_path(path: Path) -> Path:
+        return path.with_suffix(f"{path.suffix}.part")
+
+    async def _download_once(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        file_path: Optional[Union[str, Path]],
+        overwrite: bool,
+    ) -> DownloadResult:
+        probe = None
+        if config.DOWNLOAD_SEGMENTS > 1:
+            probe = await self._probe_ranges(url, headers)
+
+        if probe is not None:
+            path = self._resolve_path(url, probe.headers, file_path)
+            if path.exists() and not overwrite:
+                LOGGER.debug("File already exists at %s and overwrite=False", path)
+                return DownloadResult(success=True, file_path=path)
+
+            temp_path = self._temp_path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                await self._download_segmented(
+                    str(probe.url), url, headers, temp_path, probe
+                )
+            except _RangeNotSupported as e:
+                LOGGER.debug("Falling back to single stream for %s: %s", url, e)
+                await _PartState.discard(temp_path)
+            else:
+                temp_path.rename(path)
+                await _PartState.discard(temp_path)
+                return DownloadResult(success=True, file_path=path)
+
+        return await self._download_stream(url, headers, file_path, overwrite)
+
     async def download_file(
         self,
         url: str,
@@ -93,60 +525,35 @@ class HttpxClient:
             return DownloadResult(success=False, error=error_msg)
 
         headers = self._get_headers(url, kwargs.pop("headers", {}))
+        headers.update(self.IDENTITY_ENCODING)
 
         try:
-            async with self._session.stream(
-                "GET", url, timeout=self._download_timeout, headers=headers
-            ) as response:
-                if not response.is_success:
-                    error_msg = await self._parse_error_response(response)
-                    LOGGER.error(
-                        "Download failed for %s with status %d: %s",
-                        url,
-                        response.status_code,
-                        error_msg,
-                    )
-                    return DownloadResult(
-                        success=False, error=error_msg, status_code=response.status_code
+            # Interrupted transfers keep their .part file and resume on retry
+            for attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    result = await self._download_once(
+                        url, headers, file_path, overwrite
                     )
-
-                if file_path is None:
-                    cd = response.headers.get("Content-Disposition", "")
-                    match = re.search(r'filename="?([^"]+)"?', cd)
-                    filename = (
-                        unquote(match[1])
-                        if match
-                        else Path(url).name or f"{uuid.uuid4().hex}.tmp"
+                    break
+                except httpx.TransportError as e:
+                    if attempt == self.MAX_RETRIES:
+                        raise
+                    LOGGER.warning(
+                        "Download of %s interrupted (attempt %d/%d): %s",
+                        url,
+                        attempt + 1,
+                        self.MAX_RETRIES + 1,
+                        e,
                     )
-                    path = config.DOWNLOADS_DIR / self._sanitize_filename(filename)
-                else:
-                    path = Path(file_path) if isinstance(file_path, str) else file_path
-
-                if path.exists() and not overwrite:
-                    LOGGER.debug("File already exists at %s and overwrite=False", path)
-                    return DownloadResult(success=True, file_path=path)
-
-                # Write to temp file first
-                temp_path = path.with_suffix(f"{path.suffix}.part")
-                path.parent.mkdir(parents=True, exist_ok=True)
-
-                try:
-                    async with aiofiles.open(temp_path, "wb") as f:
-                        async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
-                            await f.write(chunk)
-                except Exception as e:
-                    if temp_path.exists():
-                        await os.remove(temp_path)
-                    raise e
-
-                temp_path.rename(path)
+                    await asyncio.sleep(self.BACKOFF_FACTOR * (2**attempt))
 
+            if result.success:
                 LOGGER.info(
                     "Successfully downloaded file to %s (size: %d bytes)",
-                    path,
-                    path.stat().st_size,
+                    result.file_path,
+                    result.file_path.stat().st_size,
                 )
-                return DownloadResult(success=True, file_path=path)
+            return result
 
         except httpx.HTTPStatusError as e:
             error_msg = await self._parse_error_response(e.response)
@@ -171,6 +578,65 @@ class HttpxClient:
             LOGGER.error(error_msg, exc_info=True)
             return DownloadResult(success=False, error=error_msg)
 
+    async def stream_bytes(self, url: str, **kwargs: Any) -> AsyncIterator[bytes]:
+        """Yield the body of ``url`` chunk by chunk without touching disk.
+
+        Transport errors are retried with a ``Range`` request starting at
+        the first byte not yet yielded, so consumers see one continuous body.
+
+        Raises:
+            httpx.HTTPStatusError: If the server rejects the request.
+            httpx.TransportError: If the connection keeps failing.
+        """
+        headers = self._get_headers(url, kwargs.pop("headers", {}))
+        headers.update(self.IDENTITY_ENCODING)
+        received = 0
+        validator = None
+        resumable = True
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            request_headers = headers
+            if received:
+                request_headers = {**headers, "Range": f"bytes={received}-"}
+                if validator:
+                    request_headers["If-Range"] = validator
+            try:
+                async with self._session(url).stream(
+                    "GET", url, timeout=self._download_timeout, headers=request_headers
+                ) as response:
+                    if not response.is_success:
+                        await response.aread()
+                        response.raise_for_status()
+                    # Decoded byte counts cannot be turned into a Range offset
+                    resumable = resumable and not _is_encoded(response)
+
+                    # A server that ignores Range resends the body from the start
+                    skip = received if response.status_code != 206 else 0
+                    validator = response.headers.get("ETag") or response.headers.get(
+                        "Last-Modified"
+                    )
+                    async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                        if skip:
+                            dropped = min(skip, len(chunk))
+                            chunk, skip = chunk[dropped:], skip - dropped
+                            if not chunk:
+                                continue
+                        received += len(chunk)
+                        yield chunk
+                return
+            except httpx.TransportError as e:
+                if attempt == self.MAX_RETRIES or (received and not resumable):
+                    raise
+                LOGGER.warning(
+                    "Stream of %s interrupted at byte %d (attempt %d/%d): %s",
+                    url,
+                    received,
+                    attempt + 1,
+                    self.MAX_RETRIES + 1,
+                    e,
+                )
+                await asyncio.sleep(self.BACKOFF_FACTOR * (2**attempt))
+
     @staticmethod
     def _sanitize_filename(name: str) -> str:
         """Sanitize filename to remove unsafe characters."""
@@ -188,12 +654,15 @@ class HttpxClient:
             return None
 
         headers = self._get_headers(url, kwargs.pop("headers", {}))
+        kwargs.setdefault("timeout", self._timeout)
         last_error = None
 
         for attempt in range(max_retries):
             try:
                 start = time.monotonic()
-                response = await self._session.get(url, headers=headers, **kwargs)
+                response = await self._session(url).get(
+                    url, headers=headers, **kwargs
+                )
                 duration = time.monotonic() - start
 
                 if not response.is_success:
@@ -252,3 +721,6 @@ class HttpxClient:
             last_error,
         )
         return None
+
+
+http_pool: HttpClientPool = HttpClientPool()
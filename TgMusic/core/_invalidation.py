@@ -0,0 +1,187 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from pymongo.errors import OperationFailure
+
+from TgMusic.logger import LOGGER
+
+from ._config import config
+from ._database import db
+from ._dataclass import ChatSettings
+
+# Returned by servers that are not part of a replica set
+_CHANGE_STREAMS_UNSUPPORTED = 40573
+
+
+class CacheInvalidator:
+    """Apply chat and bot writes made by other bot instances to local caches.
+
+    ``changestream`` follows MongoDB change streams on ``chats`` and ``bot``,
+    which needs a replica set. ``poll`` re-reads documents whose
+    ``updated_at`` stamp moved past the newest one seen, for standalone
+    servers. ``auto`` tries change streams and falls back to polling.
+
+    Only chats already cached are refreshed; others load on first use.
+    After a change stream drops, the chat cache is cleared, because any
+    changes made while it was down were missed.
+    """
+
+    def __init__(self, mode: str, poll_interval: int) -> None:
+        self.mode = mode
+        self.poll_interval = max(poll_interval, 1)
+        self.active_mode = "off"
+        self._bot_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.reconnects = 0
+
+    def start(self, bot_id: int) -> None:
+        if self.mode == "off" or self._task is not None:
+            return
+        self._bot_id = bot_id
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        if self.mode in ("auto", "changestream"):
+            try:
+                await self._follow_changes()
+            except OperationFailure:
+                if self.mode != "auto":
+                    LOGGER.error(
+                        "Change streams need a replica set; cache invalidation is off"
+                    )
+                    self.active_mode = "off"
+                    return
+                LOGGER.info("Change streams unavailable, polling for cache changes")
+        await self._poll()
+
+    @staticmethod
+    def _project(doc: Optional[dict]) -> Optional[dict]:
+        if doc is None:
+            return None
+        return {
+            key: value
+            for key, value in doc.items()
+            if key == "_id" or key in ChatSettings.FIELDS
+        }
+
+    def _apply_chat(self, chat_id: Any, doc: Optional[dict]) -> None:
+        self.events += 1
+        db.chat_cache.replace_cached(chat_id, self._project(doc))
+
+    def _apply_bot(self, bot_id: Any, doc: Optional[dict]) -> None:
+        if bot_id == self._bot_id:
+            self.events += 1
+            db.apply_bot_flags(bot_id, doc)
+
+    async def _follow_changes(self) -> None:
+        backoff = 1
+        while True:
+            self.active_mode = "changestream"
+            watchers = [
+                asyncio.create_task(self._watch(db.chat_db, self._apply_chat)),
+                asyncio.create_task(self._watch(db.bot_db, self._apply_bot)),
+            ]
+            try:
+                # When one stream stops, restart both from a clean cache
+                done, _ = await asyncio.wait(
+                    watchers, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
+            except OperationFailure as e:
+                if e.code == _CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                LOGGER.warning("Cache change stream failed: %s", e)
+            except Exception as e:
+                LOGGER.warning("Cache change stream failed: %s", e)
+            finally:
+                for task in watchers:
+                    task.cancel()
+                await asyncio.gather(*watchers, return_exceptions=True)
+
+            # Anything written while disconnected was missed
+            self.reconnects += 1
+            db.chat_cache.clear()
+            await db.load_bot_flags(self._bot_id)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _watch(
+        self, collection: Any, apply: Callable[[Any, Optional[dict]], None]
+    ) -> None:
+        async with await collection.watch(full_document="updateLookup") as stream:
+            async for change in stream:
+                key = change["documentKey"]["_id"]
+                if change["operationType"] == "delete":
+                    apply(key, None)
+                elif change["operationType"] in ("insert", "update", "replace"):
+                    apply(key, change.get("fullDocument"))
+
+    @staticmethod
+    async def _newest(collection: Any) -> datetime:
+        doc = await collection.find_one(
+            {"updated_at": {"$exists": True}}, sort=[("updated_at", -1)]
+        )
+        return doc["updated_at"] if doc else datetime(1970, 1, 1)
+
+    async def _poll(self) -> None:
+        self.active_mode = "poll"
+        sources = (
+            (db.chat_db, self._apply_chat, list(ChatSettings.FIELDS)),
+            (db.bot_db, self._apply_bot, None),
+        )
+        since: list[Optional[datetime]] = [None] * len(sources)
+        # IDs already applied at exactly ``since``, so they are not re-applied
+        seen: list[set[Any]] = [set() for _ in sources]
+        while True:
+            for index, (collection, apply, fields) in enumerate(sources):
+                try:
+                    if since[index] is None:
+                        await collection.create_index("updated_at")
+                        since[index] = await self._newest(collection)
+                        continue
+                    # $gte: several writes can share the newest timestamp
+                    cursor = collection.find(
+                        {"updated_at": {"$gte": since[index]}},
+                        projection=fields and [*fields, "updated_at"],
+                    )
+                    async for doc in cursor:
+                        stamp = doc.pop("updated_at")
+                        if stamp == since[index] and doc["_id"] in seen[index]:
+                            continue
+                        if stamp > since[index]:
+                            since[index] = stamp
+                            seen[index] = set()
+                        if stamp == since[index]:
+                            seen[index].add(doc["_id"])
+                        apply(doc["_id"], doc)
+                except Exception as e:
+                    LOGGER.warning("Cache invalidation poll failed: %s", e)
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.active_mode = "off"
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.active_mode,
+            "events": self.events,
+            "reconnects": self.reconnects,
+        }
+
+
+invalidator: CacheInvalidator = CacheInvalidator(
+    config.CACHE_INVALIDATION, config.CACHE_INVALIDATION_POLL
+)
@@ -11,10 +11,12 @@ import yt_dlp
 from pytdbot import types
 
 from TgMusic.logger import LOGGER
-from ._config import config
 from ._dataclass import PlatformTracks, MusicTrack, TrackInfo
 from ._downloader import MusicService
 from ._httpx import HttpxClient
+from ._media_cache import media_cache
+from ._metadata_cache import metadata_cache
+from ._search_cache import search_cache
 
 
 class JiosaavnData(MusicService):
@@ -90,6 +92,9 @@ class JiosaavnData(MusicService):
         if self.is_valid():
             return await self.get_info()
 
+        return await search_cache.fetch("jiosaavn", self.query, self._search)
+
+    async def _search(self) -> Union[PlatformTracks, types.Error]:
         try:
             # Make API request to JioSaavn search endpoint
             response = await HttpxClient().make_request(
@@ -158,7 +163,7 @@ class JiosaavnData(MusicService):
             else self.format_jiosaavn_url(self.query)
         )
 
-        data = await self.get_track_data(url)
+        data = await self.get_track_data(url, links=True)
         if not data or not data.get("results"):
             return types.Error(code=404, message="Could not retrieve track details")
 
@@ -174,19 +179,30 @@ class JiosaavnData(MusicService):
             platform="jiosaavn",
         )
 
-    async def get_track_data(self, url: str) -> Optional[dict[str, Any]]:
+    async def get_track_data(
+        self, url: str, links: bool = False
+    ) -> Optional[dict[str, Any]]:
         """Retrieve metadata for a single JioSaavn track.
 
         Args:
             url: JioSaavn track URL
+            links: Require a fresh download URL rather than just metadata
 
         Returns:
             dict: Parsed track metadata or None if failed
         """
+        cache_key = f"track:{self._canonical_url(url)}"
+        if cached := await metadata_cache.get("jiosaavn", cache_key, links=links):
+            return cached
+
         try:
             with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
                 info = await asyncio.to_thread(ydl.extract_info, url, download=False)
-                return {"results": [self._format_track(info)]} if info else None
+            if not info:
+                return None
+            data = {"results": [self._format_track(info)]}
+            await metadata_cache.set("jiosaavn", cache_key, data)
+            return data
         except yt_dlp.DownloadError as error:
             LOGGER.error(f"Download error for track {url}: {error}")
         except Exception as error:
@@ -202,6 +218,10 @@ class JiosaavnData(MusicService):
         Returns:
             dict: Parsed playlist tracks or None if failed
         """
+        cache_key = f"playlist:{self._canonical_url(url)}"
+        if cached := await metadata_cache.get("jiosaavn", cache_key):
+            return cached
+
         try:
             with yt_dlp.YoutubeDL(self._ydl_opts) as ydl:
                 info = await asyncio.to_thread(ydl.extract_info, url, download=False)
@@ -210,11 +230,13 @@ class JiosaavnData(MusicService):
                     LOGGER.warning(f"Empty playlist response for {url}")
                     return None
 
-                return {
+                data = {
                     "results": [
                         self._format_track(track) for track in info["entries"] if track
                     ]
                 }
+            await metadata_cache.set("jiosaavn", cache_key, data)
+            return data
         except yt_dlp.DownloadError as error:
             LOGGER.error(f"Download error for playlist {url}: {error}")
         except Exception as error:
@@ -239,7 +261,11 @@ class JiosaavnData(MusicService):
                 code=400, message=f"No download URL available for track: {track.tc}"
             )
 
-        download_path = config.DOWNLOADS_DIR / f"{track.tc}.m4a"
+        cache_key = media_cache.make_key("jiosaavn", track.tc, video)
+        if cached := media_cache.get(cache_key):
+            return cached
+
+        download_path = media_cache.path_for(cache_key, "m4a")
         result = await HttpxClient(max_redirects=1).download_file(
             track.cdnurl, download_path
         )
@@ -249,7 +275,16 @@ class JiosaavnData(MusicService):
             LOGGER.error(error_msg)
             return types.Error(code=500, message=error_msg)
 
-        return result.file_path
+        return await media_cache.put(cache_key, result.file_path)
+
+    @staticmethod
+    def _canonical_url(url: str) -> str:
+        """Strip scheme, host variations and query strings from a JioSaavn URL.
+
+        The path keeps its case: the tokens in it are case-sensitive.
+        """
+        path = url.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+        return re.split(r"jiosaavn\.com", path, maxsplit=1, flags=re.IGNORECASE)[-1]
 
     @staticmethod
     def format_jiosaavn_url(name_and_id: str) -> str:
@@ -0,0 +1,421 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from cachetools import LRUCache
+
+from TgMusic.logger import LOGGER
+
+from ._cacher import chat_cache
+from ._config import config
+
+
+@dataclass
+class MediaInfo:
+    """Duration and primary stream details of a media file."""
+
+    duration: int = 0
+    codec: str = ""
+    sample_rate: int = 0
+    width: int = 0
+    height: int = 0
+
+    @classmethod
+    def from_ffprobe(cls, data: dict[str, Any]) -> "MediaInfo":
+        streams = data.get("streams") or []
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+        return cls(
+            duration=int(float((data.get("format") or {}).get("duration") or 0)),
+            codec=video.get("codec_name") or audio.get("codec_name") or "",
+            sample_rate=int(audio.get("sample_rate") or 0),
+            width=int(video.get("width") or 0),
+            height=int(video.get("height") or 0),
+        )
+
+    @classmethod
+    def from_ytdlp(cls, data: dict[str, Any]) -> "MediaInfo":
+        vcodec = data.get("vcodec")
+        return cls(
+            duration=int(float(data.get("duration") or 0)),
+            codec=(vcodec if vcodec and vcodec != "none" else data.get("acodec"))
+            or "",
+            sample_rate=int(data.get("asr") or 0),
+            width=int(data.get("width") or 0),
+            height=int(data.get("height") or 0),
+        )
+
+
+@dataclass
+class CacheEntry:
+    path: str
+    size: int
+    created_at: float
+    last_access: float
+    hits: int = 0
+    info: Optional[MediaInfo] = None
+
+    def __post_init__(self) -> None:
+        if isinstance(self.info, dict):
+            self.info = MediaInfo(**self.info)
+
+
+class MediaCache:
+    """Content-addressed index of downloaded media in ``DOWNLOADS_DIR``.
+
+    Entries are keyed by ``(platform, track_id, audio/video, quality)`` and
+    carry size and access statistics so the directory can be kept within a
+    byte budget. Files referenced by any queue in ``chat_cache`` are never
+    evicted. Partial downloads count towards the budget too, and are
+    deleted once they have not been touched for ``STALE_PART_AGE``.
+    """
+
+    INDEX_FILE = ".media_index.json"
+    # Partial downloads, their resume sidecars and atomic-write temp files
+    TEMP_SUFFIXES = (".part", ".part.json", ".tmp")
+    STALE_PART_AGE = 24 * 3600
+    # Platforms whose downloads are audio whether or not video was asked for
+    AUDIO_ONLY_PLATFORMS = frozenset({"jiosaavn", "spotify"})
+
+    def __init__(self, root: Path, max_bytes: int = 0, policy: str = "lru") -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._entries: dict[str, CacheEntry] = {}
+        # Media info by (path, mtime, size), including files outside the index
+        self._info: LRUCache[tuple[str, int, int], MediaInfo] = LRUCache(maxsize=4096)
+        self._loaded = False
+        self._dirty = False
+        self._temp_bytes = 0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def make_key(
+        cls,
+        platform: str,
+        track_id: str,
+        is_video: bool = False,
+        quality: str = "best",
+    ) -> str:
+        """Return the cache key for a track.
+
+        Every lookup and store must go through this, so that ``/play`` and
+        ``/vplay`` of an audio-only platform share one entry.
+        """
+        platform = platform.lower()
+        kind = (
+            "video"
+            if is_video and platform not in cls.AUDIO_ONLY_PLATFORMS
+            else "audio"
+        )
+        return f"{platform}:{track_id}:{kind}:{quality}"
+
+    def stem_for(self, key: str) -> str:
+        """Return the deterministic file stem used for a cache key."""
+        platform = key.split(":", 1)[0] or "media"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:20]
+        return f"{platform}_{digest}"
+
+    def path_for(self, key: str, ext: str) -> Path:
+        """Return the canonical on-disk location for a cache key."""
+        return self.root / f"{self.stem_for(key)}.{ext.lstrip('.')}"
+
+    @property
+    def total_size(self) -> int:
+        self._ensure_loaded()
+        return sum(entry.size for entry in self._entries.values())
+
+    def _sweep_temp(self) -> int:
+        """Delete stale partial downloads and return the size of the rest."""
+        if not self.root.exists():
+            return 0
+
+        known = {os.path.abspath(entry.path) for entry in self._entries.values()}
+        now = time.time()
+        size = 0
+        for file in self.root.iterdir():
+            if not file.name.endswith(self.TEMP_SUFFIXES):
+                continue
+            if os.path.abspath(file) in known:
+                continue
+            try:
+                stat = file.stat()
+                if now - stat.st_mtime > self.STALE_PART_AGE:
+                    file.unlink()
+                    LOGGER.debug("Removed stale partial download %s", file.name)
+                else:
+                    size += stat.st_size
+            except OSError:
+                continue
+        return size
+
+    async def sweep_temp(self) -> int:
+        """Clean up stale partial downloads and recount the ones in progress.
+
+        Returns:
+            Bytes held by the remaining partial downloads.
+        """
+        self._ensure_loaded()
+        self._temp_bytes = await asyncio.to_thread(self._sweep_temp)
+        return self._temp_bytes
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def _index_path(self) -> Path:
+        return self.root / self.INDEX_FILE
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._entries = {
+                key: CacheEntry(**value)
+                for key, value in raw.items()
+                if os.path.exists(value.get("path", ""))
+            }
+        except FileNotFoundError:
+            self._entries = {}
+        except Exception as e:
+            LOGGER.warning("Media cache index is unreadable, rebuilding: %s", e)
+            self._entries = {}
+
+        self._adopt_untracked()
+
+    def _adopt_untracked(self) -> None:
+        """Track files left in the downloads directory by older naming schemes."""
+        if not self.root.exists():
+            return
+
+        known = {os.path.abspath(entry.path) for entry in self._entries.values()}
+        now = time.time()
+        for file in self.root.iterdir():
+            if not file.is_file() or file.name == self.INDEX_FILE:
+                continue
+            if os.path.abspath(file) in known:
+                continue
+            if file.name.endswith(self.TEMP_SUFFIXES):
+                # Partial downloads are kept for resuming, but not forever
+                if now - file.stat().st_mtime > self.STALE_PART_AGE:
+                    file.unlink(missing_ok=True)
+                continue
+
+            stat = file.stat()
+            self._entries[f"untracked:{file.name}"] = CacheEntry(
+                path=str(file),
+                size=stat.st_size,
+                created_at=stat.st_mtime,
+                last_access=min(stat.st_atime, now),
+            )
+            self._dirty = True
+
+    def get(self, key: str) -> Optional[Path]:
+        """Look up a cached file and record the access.
+
+        Returns:
+            Path of the cached file, or None on a miss.
+        """
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        path = Path(entry.path)
+        if not path.exists():
+            self._entries.pop(key, None)
+            self._dirty = True
+            return None
+
+        entry.last_access = time.time()
+        entry.hits += 1
+        self._dirty = True
+        return path
+
+    @staticmethod
+    def _fingerprint(path: Union[str, Path]) -> Optional[tuple[str, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+    def info_for(self, path: Union[str, Path]) -> Optional[MediaInfo]:
+        """Return known media info for the current version of ``path``."""
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return None
+        if (info := self._info.get(fingerprint)) is not None:
+            return info
+
+        self._ensure_loaded()
+        for entry in self._entries.values():
+            if entry.info is not None and entry.size == fingerprint[2]:
+                if os.path.abspath(entry.path) == fingerprint[0]:
+                    self._info[fingerprint] = entry.info
+                    return entry.info
+        return None
+
+    def remember_info(self, path: Union[str, Path], info: MediaInfo) -> None:
+        """Store media info for ``path`` and its cache entry, if any."""
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return
+        self._info[fingerprint] = info
+
+        self._ensure_loaded()
+        for entry in self._entries.values():
+            if os.path.abspath(entry.path) == fingerprint[0]:
+                entry.info = info
+                self._dirty = True
+
+    async def put(
+        self, key: str, path: Union[str, Path], info: Optional[MediaInfo] = None
+    ) -> Path:
+        """Register a downloaded file under ``key`` and enforce the budget.
+
+        Files inside the cache directory are renamed to their canonical,
+        content-addressed name; files elsewhere are indexed in place.
+
+        Args:
+            key: Cache key from ``make_key``.
+            path: Downloaded file.
+            info: Media info captured during the download, if any.
+
+        Returns:
+            The final path of the file.
+        """
+        self._ensure_loaded()
+        path = Path(path)
+        info = info or self.info_for(path)
+        if path.parent.resolve() == self.root.resolve():
+            canonical = self.path_for(key, path.suffix or ".bin")
+            if path != canonical:
+                try:
+                    os.replace(path, canonical)
+                    path = canonical
+                except OSError as e:
+                    LOGGER.warning("Could not move %s into cache: %s", path, e)
+
+        now = time.time()
+        previous = self._entries.get(key)
+        self._entries[key] = CacheEntry(
+            path=str(path),
+            size=path.stat().st_size,
+            created_at=now,
+            last_access=now,
+            hits=previous.hits if previous else 0,
+            info=info,
+        )
+        if info is not None:
+            self.remember_info(path, info)
+        self._dirty = True
+
+        await self.sweep_temp()
+        await self.enforce_budget()
+        await self.save()
+        return path
+
+    def forget(self, key: str) -> None:
+        self._ensure_loaded()
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def _eviction_order(self) -> list[tuple[str, CacheEntry]]:
+        if self.policy == "lfu":
+            sort_key = lambda item: (item[1].hits, item[1].last_access)
+        else:
+            sort_key = lambda item: item[1].last_access
+        return sorted(self._entries.items(), key=sort_key)
+
+    async def enforce_budget(self) -> int:
+        """Evict cold entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            Number of bytes freed.
+        """
+        if self.max_bytes <= 0:
+            return 0
+
+        async with self._lock:
+            # Partial downloads cannot be evicted, but they take up the space
+            total = self.total_size + self._temp_bytes
+            if total <= self.max_bytes:
+                return 0
+
+            pinned = {os.path.abspath(p) for p in chat_cache.get_queued_file_paths()}
+            freed = 0
+            for key, entry in self._eviction_order():
+                if total - freed <= self.max_bytes:
+                    break
+                if os.path.abspath(entry.path) in pinned:
+                    continue
+
+                try:
+                    await asyncio.to_thread(os.remove, entry.path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    LOGGER.warning("Failed to evict %s: %s", entry.path, e)
+                    continue
+
+                self._entries.pop(key, None)
+                freed += entry.size
+                LOGGER.debug("Evicted %s (%d bytes)", entry.path, entry.size)
+
+            self._dirty = True
+            if total - freed > self.max_bytes:
+                LOGGER.warning(
+                    "Media cache over budget (%d/%d bytes); remaining files are in use",
+                    total - freed,
+                    self.max_bytes,
+                )
+            return freed
+
+    def _write_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {key: asdict(entry) for key, entry in self._entries.items()}
+        tmp_path = self._index_path().with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._index_path())
+
+    async def save(self) -> None:
+        """Persist the index if anything changed since the last save."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write_index)
+        except Exception as e:
+            self._dirty = True
+            LOGGER.warning("Failed to save media cache index: %s", e)
+
+    def stats(self) -> dict[str, int]:
+        self._ensure_loaded()
+        return {
+            "files": len(self._entries),
+            "bytes": self.total_size,
+            "partial_bytes": self._temp_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+media_cache: MediaCache = MediaCache(
+    config.DOWNLOADS_DIR,
+    max_bytes=max(config.MEDIA_CACHE_MAX_MB, 0) * 1024 * 1024,
+    policy=config.MEDIA_CACHE_POLICY,
+)
@@ -0,0 +1,126 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from cachetools import LRUCache
+
+from ._config import config
+from ._database import db
+
+
+class MetadataCache:
+    """Two-level (memory + MongoDB) cache for resolved track metadata.
+
+    Entries are keyed by platform and a canonical identifier and expire
+    after a per-platform TTL. Signed download links (``cdnurl``/``key``)
+    age much faster than titles and durations, so callers that need them
+    ask for ``links=True`` and get a shorter freshness window on the same
+    entry. An entry can name the platform whose link TTL applies when it
+    is stored under a generic one, such as API track lookups.
+    """
+
+    TTLS = {
+        "youtube": 7 * 86400,
+        "jiosaavn": 86400,
+        "spotify": 86400,
+    }
+    LINK_TTLS = {
+        "youtube": 7 * 86400,
+        "jiosaavn": 3600,
+        "spotify": 900,
+    }
+    DEFAULT_TTL = 86400
+    DEFAULT_LINK_TTL = 900
+
+    def __init__(self, maxsize: int) -> None:
+        self._memory: LRUCache[str, dict[str, Any]] = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        """Canonical cache key for a URL.
+
+        Only the scheme and host are lowercased: track IDs and tokens in
+        the path, such as Spotify's base62 IDs, are case-sensitive.
+        """
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        return urlunsplit(
+            (
+                parts.scheme.lower(),
+                parts.netloc.lower(),
+                parts.path.rstrip("/"),
+                parts.query,
+                "",
+            )
+        )
+
+    def ttl(self, platform: str, links: bool = False) -> int:
+        if links:
+            return self.LINK_TTLS.get(platform, self.DEFAULT_LINK_TTL)
+        return self.TTLS.get(platform, self.DEFAULT_TTL)
+
+    async def get(
+        self, platform: str, key: str, links: bool = False
+    ) -> Optional[dict[str, Any]]:
+        """Return cached metadata if it is still fresh.
+
+        Args:
+            platform: Platform the identifier belongs to.
+            key: Canonical identifier (video ID, track URL, ...).
+            links: Whether the caller relies on expiring download links.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        full_key = f"{platform}:{key}"
+        entry = self._memory.get(full_key)
+        if entry is None and config.METADATA_CACHE_PERSIST:
+            if entry := await db.get_metadata(full_key):
+                self._memory[full_key] = entry
+
+        if entry:
+            ttl = self.ttl(entry.get("link_platform") or platform, links)
+            if time.time() - entry["fetched_at"] < ttl:
+                self.hits += 1
+                return entry["value"]
+
+        self.misses += 1
+        return None
+
+    async def set(
+        self,
+        platform: str,
+        key: str,
+        value: dict[str, Any],
+        link_platform: Optional[str] = None,
+    ) -> None:
+        """Store metadata for ``key``.
+
+        Args:
+            platform: Platform the identifier belongs to.
+            key: Canonical identifier (video ID, track URL, ...).
+            value: Metadata to cache.
+            link_platform: Platform whose link TTL applies, if not ``platform``.
+        """
+        full_key = f"{platform}:{key}"
+        entry = {"value": value, "fetched_at": time.time()}
+        if link_platform:
+            entry["link_platform"] = link_platform.lower()
+        self._memory[full_key] = entry
+        if config.METADATA_CACHE_PERSIST:
+            expires_at = datetime.now(timezone.utc) + timedelta(
+                seconds=self.ttl(platform)
+            )
+            await db.set_metadata(full_key, entry, expires_at)
+
+    def invalidate(self, platform: str, key: str) -> None:
+        self._memory.pop(f"{platform}:{key}", None)
+
+
+metadata_cache: MetadataCache = MetadataCache(config.METADATA_CACHE_SIZE)
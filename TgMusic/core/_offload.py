@@ -0,0 +1,182 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from TgMusic.logger import LOGGER
+
+from ._config import config
+
+T = TypeVar("T")
+
+
+@dataclass
+class TaskStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    wait_time: float = 0.0
+    run_time: float = 0.0
+    max_run_time: float = 0.0
+
+
+class CpuOffload:
+    """Shared executor for CPU-bound work that must not run on the event loop.
+
+    Work is submitted with ``run(task_class, fn, *args)``. By default it runs
+    in a process pool so pure-Python work escapes the GIL; ``process=False``
+    uses a thread pool for C code that releases the GIL or for callables
+    that cannot be pickled. When processes are unavailable, all work falls
+    back to threads; a pool whose worker dies is replaced on next use.
+
+    At most ``max_pending`` jobs are queued or running at once; further
+    callers wait for a slot. Counters are kept per task class.
+
+    Functions sent to the process pool must be importable module-level
+    callables and their arguments and results must be picklable.
+
+    Workers are forked by ``start`` while the process is still
+    single-threaded. Forking once TDLib, ntgcalls or pymongo threads run can
+    leave a child stuck on a lock held at fork time, and ``forkserver`` or
+    ``spawn`` workers would import the bot package and run its startup code.
+    A pool needed after that, such as the replacement for a broken one or
+    the pool after a restart, is therefore not created; work runs on
+    threads instead.
+    """
+
+    def __init__(self, workers: int, max_pending: int, use_processes: bool) -> None:
+        self.workers = max(workers, 1)
+        self.use_processes = use_processes
+        self._slots = asyncio.Semaphore(max(max_pending, 1))
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._stats: dict[str, TaskStats] = {}
+
+    def _process_pool(self) -> Optional[Executor]:
+        if not self.use_processes:
+            return None
+        if self._processes is None:
+            # Fork is only safe while no other thread can be holding a lock
+            if threading.active_count() > 1:
+                LOGGER.warning(
+                    "Process offload needs a single-threaded fork, using threads"
+                )
+                self.use_processes = False
+                return None
+            try:
+                self._processes = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("fork")
+                )
+            except (ValueError, OSError) as e:
+                LOGGER.warning("Process offload unavailable, using threads: %s", e)
+                self.use_processes = False
+                return None
+        return self._processes
+
+    async def start(self) -> None:
+        """Create the process pool and start its workers.
+
+        Call this before anything starts threads, so workers can be forked.
+        """
+        pool = self._process_pool()
+        if pool is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            # Concurrent jobs make the pool launch every worker now
+            await asyncio.gather(
+                *(loop.run_in_executor(pool, os.getpid) for _ in range(self.workers))
+            )
+        except BrokenProcessPool as e:
+            LOGGER.warning("Process offload unavailable, using threads: %s", e)
+            self._discard_process_pool(pool)
+            self.use_processes = False
+
+    def _thread_pool(self) -> Executor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="offload"
+            )
+        return self._threads
+
+    async def run(
+        self,
+        task_class: str,
+        fn: Callable[..., T],
+        *args: Any,
+        process: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """Run ``fn(*args, **kwargs)`` off the event loop.
+
+        Args:
+            task_class: Name used to group metrics, e.g. ``"thumbnail"``.
+            fn: Callable to run.
+            process: Prefer the process pool; set False for GIL-releasing work.
+
+        Returns:
+            The return value of ``fn``.
+        """
+        stats = self._stats.setdefault(task_class, TaskStats())
+        stats.submitted += 1
+        queued_at = time.monotonic()
+        call = partial(fn, *args, **kwargs)
+
+        async with self._slots:
+            started = time.monotonic()
+            stats.wait_time += started - queued_at
+            stats.in_flight += 1
+            loop = asyncio.get_running_loop()
+            try:
+                executor = (process and self._process_pool()) or self._thread_pool()
+                try:
+                    result = await loop.run_in_executor(executor, call)
+                except BrokenProcessPool:
+                    # Never retry in-process: the job may be what killed the worker
+                    LOGGER.error("Process offload pool broke during %s", task_class)
+                    self._discard_process_pool(executor)
+                    raise
+            except BaseException:
+                stats.failed += 1
+                raise
+            else:
+                stats.completed += 1
+                return result
+            finally:
+                elapsed = time.monotonic() - started
+                stats.in_flight -= 1
+                stats.run_time += elapsed
+                stats.max_run_time = max(stats.max_run_time, elapsed)
+
+    def _discard_process_pool(self, pool: Executor) -> None:
+        """Drop a broken process pool; a fresh one is created on next use."""
+        if self._processes is pool:
+            self._processes = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, TaskStats]:
+        return dict(self._stats)
+
+    async def close(self) -> None:
+        for pool in (self._processes, self._threads):
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+        self._processes = self._threads = None
+
+
+offload: CpuOffload = CpuOffload(
+    config.OFFLOAD_WORKERS or min(os.cpu_count() or 1, 4),
+    config.OFFLOAD_MAX_PENDING,
+    config.OFFLOAD_PROCESSES,
+)
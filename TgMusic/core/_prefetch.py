@@ -0,0 +1,103 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+
+from pytdbot import types
+
+from TgMusic.logger import LOGGER
+
+from ._cacher import chat_cache
+from ._config import config
+from ._dataclass import CachedTrack
+from ._probe import media_probe
+
+
+class Prefetcher:
+    """Download upcoming queue entries before they are due to play.
+
+    Up to ``depth`` tracks after the currently playing one are fetched per
+    chat, with at most ``concurrency`` downloads running across all chats.
+    Finished downloads are written back to ``CachedTrack.file_path``.
+    A failed download is reported to the chat once and not prefetched
+    again; ``play_next`` retries it when its turn comes.
+    """
+
+    def __init__(self, depth: int, concurrency: int) -> None:
+        self.depth = max(depth, 0)
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        # Running prefetches by entry ID, per chat
+        self._tasks: dict[int, dict[int, asyncio.Task]] = {}
+        # Entry IDs of upcoming tracks whose prefetch failed, per chat
+        self._failed: dict[int, set[int]] = {}
+        chat_cache.add_listener(self._on_tracks_removed)
+
+    def schedule(self, chat_id: int) -> None:
+        """Start prefetching the next tracks in a chat's queue."""
+        if self.depth <= 0:
+            return
+
+        pending = self._tasks.setdefault(chat_id, {})
+        upcoming = chat_cache.peek_ahead(chat_id, self.depth)
+        failed = self._failed.pop(chat_id, set())
+        # Tracks that left the window have played or were removed
+        failed &= {song.entry_id for song in upcoming}
+        if failed:
+            self._failed[chat_id] = failed
+        for song in upcoming:
+            if song.file_path or song.entry_id in pending or song.entry_id in failed:
+                continue
+            task = asyncio.create_task(self._prefetch(chat_id, song))
+            pending[song.entry_id] = task
+            task.add_done_callback(
+                lambda t, key=song.entry_id: self._discard(chat_id, key, t)
+            )
+
+    async def _prefetch(self, chat_id: int, song: CachedTrack) -> None:
+        from ._tgcalls import call
+
+        async with self._semaphore:
+            if song.file_path:
+                return
+            result = await call.song_download(song)
+
+        if isinstance(result, types.Error) or not result:
+            LOGGER.warning("Prefetch failed for %s: %s", song.name, result)
+            self._failed.setdefault(chat_id, set()).add(song.entry_id)
+            reason = result.message if isinstance(result, types.Error) else "no file"
+            await call.bot.sendTextMessage(
+                chat_id,
+                f"⚠️ Could not download queued track <b>{song.name}</b>: {reason}\n"
+                "It will be retried when its turn comes.",
+            )
+            return
+
+        song.file_path = result
+        if not song.duration:
+            song.duration = await media_probe.duration(result)
+        LOGGER.debug("Prefetched %s to %s", song.name, result)
+
+    def _discard(self, chat_id: int, key: int, task: asyncio.Task) -> None:
+        pending = self._tasks.get(chat_id)
+        if pending is None or pending.get(key) is not task:
+            return
+        del pending[key]
+        if not pending:
+            self._tasks.pop(chat_id, None)
+
+    def _on_tracks_removed(self, chat_id: int, removed: list[CachedTrack]) -> None:
+        if failed := self._failed.get(chat_id):
+            failed.difference_update(song.entry_id for song in removed)
+        pending = self._tasks.get(chat_id)
+        if not pending:
+            return
+        for song in removed:
+            if task := pending.get(song.entry_id):
+                task.cancel()
+
+    def pending(self) -> int:
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+
+prefetcher: Prefetcher = Prefetcher(config.PREFETCH_DEPTH, config.PREFETCH_CONCURRENCY)
@@ -0,0 +1,81 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Union
+
+from TgMusic.logger import LOGGER
+
+from ._media_cache import MediaInfo, media_cache
+from ._singleflight import SingleFlight
+
+
+class MediaProber:
+    """Run ffprobe at most once per version of a file.
+
+    Results are looked up in ``media_cache`` first, which also holds info
+    captured at download time (yt-dlp fields, API durations). Fresh probes
+    are stored back there, keyed by path, modification time and size.
+    """
+
+    def __init__(self, concurrency: int = 4) -> None:
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._flight: SingleFlight[MediaInfo] = SingleFlight()
+        self.hits = 0
+        self.probes = 0
+
+    async def probe(self, path: Union[str, Path]) -> MediaInfo:
+        """Return duration and stream info for ``path``.
+
+        Returns:
+            MediaInfo: Empty (zero duration) if the file cannot be probed.
+        """
+        if (info := media_cache.info_for(path)) is not None:
+            self.hits += 1
+            return info
+        return await self._flight.do(
+            os.path.abspath(path), lambda: self._run_ffprobe(path)
+        )
+
+    async def _run_ffprobe(self, path: Union[str, Path]) -> MediaInfo:
+        async with self._semaphore:
+            self.probes += 1
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    "ffprobe",
+                    "-v",
+                    "quiet",
+                    "-print_format",
+                    "json",
+                    "-show_format",
+                    "-show_streams",
+                    str(path),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stdout, _ = await proc.communicate()
+                info = MediaInfo.from_ffprobe(json.loads(stdout))
+            except Exception as e:
+                LOGGER.warning("Failed to probe %s with ffprobe: %s", path, e)
+                return MediaInfo()
+
+        if info.duration:
+            media_cache.remember_info(path, info)
+        return info
+
+    async def duration(self, path: Union[str, Path]) -> int:
+        return (await self.probe(path)).duration
+
+    async def probe_many(self, paths: Iterable[Union[str, Path]]) -> list[MediaInfo]:
+        """Probe several files, running up to ``concurrency`` ffprobes at once."""
+        return list(await asyncio.gather(*(self.probe(path) for path in paths)))
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "probes": self.probes}
+
+
+media_probe: MediaProber = MediaProber()
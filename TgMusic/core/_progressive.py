@@ -0,0 +1,330 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import re
+import socket
+import struct
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Awaitable, Callable, Hashable, Optional, Union
+
+from pytdbot import types
+
+from TgMusic.logger import LOGGER
+
+from ._config import config
+
+
+class DownloadProgress:
+    """Progress of a file that is still being written to disk.
+
+    ``written`` only counts the contiguous prefix starting at byte zero, so
+    readers can safely consume everything before it.
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[Path] = None
+        self.written = 0
+        self.total = 0
+        self.final_path: Optional[Path] = None
+        self.error: Optional[str] = None
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def update(self, path: Path, written: int, total: int = 0) -> None:
+        self.path = path
+        self.written = written
+        self.total = total or self.total
+        self._notify()
+
+    def finish(self, result: Union[Path, types.Error, None]) -> None:
+        if isinstance(result, Path):
+            self.final_path = result
+            self.total = self.written = result.stat().st_size
+        else:
+            self.error = getattr(result, "message", None) or "Download failed"
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, timeout: float) -> None:
+        """Wait until progress changes or ``timeout`` elapses."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+_current_progress: ContextVar[Optional[DownloadProgress]] = ContextVar(
+    "current_progress", default=None
+)
+
+
+# Progress of running downloads by key, whichever task started them
+_downloads: dict[Hashable, DownloadProgress] = {}
+
+
+def report_progress(path: Path, written: int, total: int = 0) -> None:
+    """Publish download progress to a progressive reader, if one is waiting."""
+    if progress := _current_progress.get():
+        progress.update(path, written, total)
+
+
+def tracked(
+    key: Hashable, download: Callable[[], Awaitable[Union[Path, types.Error]]]
+) -> Callable[[], Awaitable[Union[Path, types.Error]]]:
+    """Wrap a download so its progress can be found by ``key``.
+
+    The progress is registered as soon as the returned factory is called,
+    so a reader joining a download started elsewhere, e.g. by the
+    prefetcher, still sees it.
+    """
+
+    def start() -> Awaitable[Union[Path, types.Error]]:
+        progress = DownloadProgress()
+        _downloads[key] = progress
+        return _run_tracked(key, progress, download)
+
+    return start
+
+
+async def _run_tracked(
+    key: Hashable,
+    progress: DownloadProgress,
+    download: Callable[[], Awaitable[Union[Path, types.Error]]],
+) -> Union[Path, types.Error]:
+    # The task runs in its own copy of the context, so this stays local to it
+    _current_progress.set(progress)
+    result = None
+    try:
+        result = await download()
+        return result
+    finally:
+        progress.finish(result)
+        if _downloads.get(key) is progress:
+            del _downloads[key]
+
+
+class LoopbackServer:
+    """Serve growing downloads to ffmpeg over a local HTTP endpoint.
+
+    Readers that catch up with the writer simply wait for more data instead
+    of reaching EOF, so the voice chat stalls briefly rather than ending.
+    """
+
+    READ_SIZE = 256 * 1024
+    STALL_TIMEOUT = 120
+
+    def __init__(self) -> None:
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._streams: dict[str, DownloadProgress] = {}
+        self._readers: dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self.port = 0
+
+    async def _ensure_started(self) -> None:
+        async with self._lock:
+            if self._server is not None:
+                return
+            self._server = await asyncio.start_server(
+                self._handle, "127.0.0.1", config.PROGRESSIVE_PORT
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            LOGGER.info("Progressive playback server listening on port %d", self.port)
+
+    async def register(self, progress: DownloadProgress) -> str:
+        await self._ensure_started()
+        token = uuid.uuid4().hex
+        self._streams[token] = progress
+        return f"http://127.0.0.1:{self.port}/stream/{token}"
+
+    def _release(self, token: str) -> None:
+        progress = self._streams.get(token)
+        if progress and progress.done and not self._readers.get(token):
+            self._streams.pop(token, None)
+            self._readers.pop(token, None)
+
+    def release_when_done(self, url: str) -> None:
+        self._release(url.rsplit("/", 1)[-1])
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        token = ""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            request = head.decode("latin-1")
+            match = re.match(r"(GET|HEAD) /stream/(\w+) HTTP", request)
+            progress = self._streams.get(match[2]) if match else None
+            if progress is None or progress.error:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nConnection: close\r\n\r\n")
+                return
+
+            token = match[2]
+            self._readers[token] = self._readers.get(token, 0) + 1
+            start = 0
+            if range_match := re.search(r"(?im)^range:\s*bytes=(\d+)-", request):
+                start = int(range_match[1])
+
+            status = "206 Partial Content" if start else "200 OK"
+            headers = [
+                f"HTTP/1.1 {status}",
+                "Content-Type: application/octet-stream",
+                "Accept-Ranges: bytes",
+                "Connection: close",
+            ]
+            if total := progress.total:
+                headers.append(f"Content-Length: {total - start}")
+                if start:
+                    headers.append(f"Content-Range: bytes {start}-{total - 1}/{total}")
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode())
+            if match[1] == "GET":
+                await self._stream(progress, writer, start)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            LOGGER.warning("Progressive stream error: %s", e)
+        finally:
+            if token:
+                self._readers[token] -= 1
+                self._release(token)
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _stream(
+        self, progress: DownloadProgress, writer: asyncio.StreamWriter, offset: int
+    ) -> None:
+        while progress.path is None and not progress.done:
+            await progress.wait(1)
+
+        file = None
+        try:
+            while True:
+                if progress.error:
+                    self._abort(writer)
+                    return
+                final = str(progress.final_path)
+                if file is None or (progress.done and file.name != final):
+                    # Reopen the finished file: the partial one may have been replaced
+                    if file is not None:
+                        file.close()
+                    path = progress.final_path if progress.done else progress.path
+                    file = await asyncio.to_thread(open, path, "rb")
+
+                available = progress.written - offset
+                if available <= 0:
+                    if progress.done:
+                        return
+                    await progress.wait(self.STALL_TIMEOUT)
+                    continue
+
+                await asyncio.to_thread(file.seek, offset)
+                chunk = await asyncio.to_thread(
+                    file.read, min(available, self.READ_SIZE)
+                )
+                if not chunk:
+                    await progress.wait(0.5)
+                    continue
+
+                writer.write(chunk)
+                await writer.drain()
+                offset += len(chunk)
+        finally:
+            if file is not None:
+                file.close()
+
+    @staticmethod
+    def _abort(writer: asyncio.StreamWriter) -> None:
+        """Reset the connection so ffmpeg sees a failed read, not an EOF."""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # A zero linger time makes close() send RST instead of FIN
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+            )
+        writer.transport.abort()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class ProgressivePlayer:
+    """Start playback from a partially downloaded file."""
+
+    def __init__(self) -> None:
+        self.server = LoopbackServer()
+
+    @property
+    def enabled(self) -> bool:
+        return config.PROGRESSIVE_PLAYBACK
+
+    def is_stream(self, source: Union[str, Path, None]) -> bool:
+        return bool(self.server.port) and str(source).startswith(
+            f"http://127.0.0.1:{self.server.port}/"
+        )
+
+    async def fetch(
+        self,
+        key: Hashable,
+        download: Callable[[], Awaitable[Union[Path, types.Error]]],
+        on_complete: Callable[[Path], None],
+    ) -> Union[Path, str, types.Error]:
+        """Run ``download`` and return a playable source as early as possible.
+
+        Args:
+            key: Key the download's progress is ``tracked`` under.
+            download: Coroutine factory performing the actual download.
+            on_complete: Called with the final path once the download finishes.
+
+        Returns:
+            The finished file if it completed before the prefix was reached,
+            a loopback URL streaming the growing file, or types.Error.
+        """
+        task = asyncio.ensure_future(download())
+
+        prefix = config.PROGRESSIVE_PREFIX_KB * 1024
+        progress: Optional[DownloadProgress] = None
+        while not task.done():
+            progress = progress or _downloads.get(key)
+            if progress is not None and progress.written >= prefix:
+                break
+            # The download registers its progress once it has started
+            waiter = asyncio.create_task(
+                progress.wait(5) if progress else asyncio.sleep(0.1)
+            )
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+
+        if task.done():
+            return task.result()
+
+        url = await self.server.register(progress)
+
+        def _finished(t: asyncio.Task) -> None:
+            result = None
+            if not t.cancelled() and t.exception() is None:
+                result = t.result()
+            if isinstance(result, Path):
+                on_complete(result)
+            else:
+                LOGGER.warning("Progressive download failed: %s", progress.error)
+            self.server.release_when_done(url)
+
+        task.add_done_callback(_finished)
+        LOGGER.info("Starting progressive playback after %d bytes", progress.written)
+        return url
+
+
+progressive: ProgressivePlayer = ProgressivePlayer()
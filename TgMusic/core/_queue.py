@@ -0,0 +1,250 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import itertools
+import random
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional, Union, overload
+
+from ._dataclass import CachedTrack
+
+_entry_ids = itertools.count(1)
+
+
+class _Block:
+    """A run of consecutive queue entries and where it starts in the queue."""
+
+    __slots__ = ("items", "start")
+
+    def __init__(self, items: list[CachedTrack]) -> None:
+        self.items = items
+        self.start = 0
+
+
+class TrackQueue:
+    """Per-chat playback queue.
+
+    Entry 0 is the track currently playing. Every entry gets an
+    ``entry_id`` that stays the same while it moves around the queue, so
+    callers can refer to tracks without relying on positions.
+
+    Entries are kept in a list of blocks holding between ``BLOCK // 2`` and
+    ``BLOCK * 2`` tracks each. A position is found by bisecting the block
+    start offsets, which are recomputed lazily after a change, and an entry
+    ID maps straight to its block. Positional insert, remove, move and
+    ``position`` therefore cost O(n / BLOCK + BLOCK) rather than a walk over
+    the whole queue, which keeps them cheap when ``QUEUE_LIMIT`` is 0.
+    """
+
+    BLOCK = 256
+
+    __slots__ = ("_blocks", "_by_id", "_block_of", "_starts", "_size")
+
+    def __init__(self, tracks: Iterable[CachedTrack] = ()) -> None:
+        self._blocks: list[_Block] = []
+        self._by_id: dict[int, CachedTrack] = {}
+        self._block_of: dict[int, _Block] = {}
+        # Start offset of each block; None until needed after a change
+        self._starts: Optional[list[int]] = []
+        self._size = 0
+        self.extend(tracks)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator[CachedTrack]:
+        return self._iter_from(0)
+
+    @overload
+    def __getitem__(self, index: int) -> CachedTrack: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[CachedTrack]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[CachedTrack, list[CachedTrack]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                return list(self)[index]
+            return list(itertools.islice(self._iter_from(start), max(stop - start, 0)))
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("queue index out of range")
+        block, offset = self._locate(index)
+        return self._blocks[block].items[offset]
+
+    def _index(self) -> list[int]:
+        if self._starts is None:
+            starts, position = [], 0
+            for block in self._blocks:
+                block.start = position
+                starts.append(position)
+                position += len(block.items)
+            self._starts = starts
+        return self._starts
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """Return the index of the block holding ``position`` and the offset
+        inside it."""
+        starts = self._index()
+        index = bisect_right(starts, position) - 1
+        return index, position - starts[index]
+
+    def _iter_from(self, position: int) -> Iterator[CachedTrack]:
+        if not 0 <= position < self._size:
+            return
+        index, offset = self._locate(position)
+        yield from itertools.islice(self._blocks[index].items, offset, None)
+        for block in self._blocks[index + 1 :]:
+            yield from block.items
+
+    def _register(self, track: CachedTrack) -> CachedTrack:
+        if not track.entry_id or track.entry_id in self._by_id:
+            track.entry_id = next(_entry_ids)
+        self._by_id[track.entry_id] = track
+        return track
+
+    def _insert(self, position: int, track: CachedTrack) -> None:
+        if not self._blocks:
+            self._blocks.append(_Block([]))
+        if position >= self._size:
+            index, offset = len(self._blocks) - 1, len(self._blocks[-1].items)
+        else:
+            index, offset = self._locate(position)
+        block = self._blocks[index]
+        block.items.insert(offset, track)
+        self._block_of[track.entry_id] = block
+        self._size += 1
+        self._starts = None
+        if len(block.items) > self.BLOCK * 2:
+            self._split(index)
+
+    def _pop(self, position: int) -> CachedTrack:
+        index, offset = self._locate(position)
+        block = self._blocks[index]
+        track = block.items.pop(offset)
+        del self._block_of[track.entry_id]
+        self._size -= 1
+        self._starts = None
+        if len(block.items) < self.BLOCK // 2:
+            self._merge(index)
+        return track
+
+    def _split(self, index: int) -> None:
+        block = self._blocks[index]
+        half = len(block.items) // 2
+        tail = _Block(block.items[half:])
+        del block.items[half:]
+        self._blocks.insert(index + 1, tail)
+        for track in tail.items:
+            self._block_of[track.entry_id] = tail
+
+    def _merge(self, index: int) -> None:
+        """Fold an undersized block into a neighbour so blocks stay dense."""
+        if not self._blocks[index].items:
+            del self._blocks[index]
+            return
+        if len(self._blocks) < 2:
+            return
+        # Fold the later of the two blocks into the earlier one
+        index = max(index, 1)
+        first, second = self._blocks[index - 1], self._blocks[index]
+        first.items.extend(second.items)
+        for track in second.items:
+            self._block_of[track.entry_id] = first
+        del self._blocks[index]
+        if len(first.items) > self.BLOCK * 2:
+            self._split(index - 1)
+
+    def append(self, track: CachedTrack) -> CachedTrack:
+        self._insert(self._size, self._register(track))
+        return track
+
+    def extend(self, tracks: Iterable[CachedTrack]) -> None:
+        for track in tracks:
+            self.append(track)
+
+    def insert(self, position: int, track: CachedTrack) -> CachedTrack:
+        """Insert ``track`` before ``position`` (clamped to the queue bounds)."""
+        position = max(0, min(position, self._size))
+        self._insert(position, self._register(track))
+        return track
+
+    def popleft(self) -> Optional[CachedTrack]:
+        if not self._size:
+            return None
+        track = self._pop(0)
+        self._by_id.pop(track.entry_id, None)
+        return track
+
+    def peek(self, position: int = 0) -> Optional[CachedTrack]:
+        return self[position] if 0 <= position < self._size else None
+
+    def peek_ahead(self, count: int, start: int = 1) -> list[CachedTrack]:
+        """Return up to ``count`` entries from ``start`` without copying the rest."""
+        return list(itertools.islice(self._iter_from(start), max(count, 0)))
+
+    def get(self, entry_id: int) -> Optional[CachedTrack]:
+        return self._by_id.get(entry_id)
+
+    def position(self, entry_id: int) -> int:
+        """Return the current position of an entry, or -1 if it is not queued."""
+        track = self._by_id.get(entry_id)
+        if track is None:
+            return -1
+        block = self._block_of[entry_id]
+        self._index()
+        for offset, item in enumerate(block.items):
+            if item is track:
+                return block.start + offset
+        return -1
+
+    def remove_at(self, position: int) -> Optional[CachedTrack]:
+        if not 0 <= position < self._size:
+            return None
+        track = self._pop(position)
+        self._by_id.pop(track.entry_id, None)
+        return track
+
+    def remove(self, entry_id: int) -> Optional[CachedTrack]:
+        position = self.position(entry_id)
+        return self.remove_at(position) if position >= 0 else None
+
+    def move(self, source: int, target: int) -> bool:
+        """Move the entry at ``source`` so that it ends up at ``target``."""
+        if not (0 <= source < self._size and 0 <= target < self._size):
+            return False
+        if source != target:
+            self._insert(target, self._pop(source))
+        return True
+
+    def _rebuild(self, tracks: list[CachedTrack]) -> None:
+        self._blocks = [
+            _Block(tracks[i : i + self.BLOCK])
+            for i in range(0, len(tracks), self.BLOCK)
+        ]
+        self._block_of = {
+            track.entry_id: block for block in self._blocks for track in block.items
+        }
+        self._size = len(tracks)
+        self._starts = None
+
+    def shuffle(self, start: int = 1) -> None:
+        """Shuffle entries from ``start`` on, leaving the playing track alone."""
+        tracks = list(self)
+        tail = tracks[start:]
+        random.shuffle(tail)
+        self._rebuild(tracks[:start] + tail)
+
+    def clear(self) -> list[CachedTrack]:
+        removed = list(self)
+        self._rebuild([])
+        self._by_id.clear()
+        return removed
@@ -0,0 +1,240 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import os
+import time
+from contextlib import suppress
+from dataclasses import asdict
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from pytdbot import types
+
+from TgMusic.logger import LOGGER
+from TgMusic.modules.utils import sec_to_min
+
+from ._cacher import chat_cache
+from ._config import config
+from ._database import db
+from ._dataclass import CachedTrack, CachedTrackModel
+from ._prefetch import prefetcher
+from ._progressive import progressive
+from ._tgcalls import call
+
+
+class QueueStore:
+    """Write-behind snapshots of chat queues, used to resume after a restart.
+
+    ``chat_cache`` reports which chats changed. Every ``interval`` seconds
+    the changed queues are written in one bulk write and the playback
+    position of the other connected chats is refreshed, so a crash loses at
+    most one interval. On startup each snapshot is loaded back and the
+    current track is replayed from the cached file at the saved offset.
+    """
+
+    def __init__(self, enabled: bool, interval: int, max_age: int) -> None:
+        self.enabled = enabled
+        self.interval = max(interval, 1)
+        self.max_age = max_age
+        self._dirty: set[int] = set()
+        self._tracking = False
+        self._task: Optional[asyncio.Task] = None
+        self.writes = 0
+        self.restored = 0
+        chat_cache.add_change_listener(self._on_change)
+
+    def _on_change(self, chat_id: int) -> None:
+        if self._tracking:
+            self._dirty.add(chat_id)
+
+    def start(self) -> None:
+        """Start tracking queue changes and writing snapshots."""
+        if not self.enabled or self._task is not None:
+            return
+        self._tracking = True
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER.warning("Queue snapshot failed: %s", e)
+
+    @staticmethod
+    def _serialize(track: CachedTrack) -> dict[str, Any]:
+        data = asdict(track)
+        # Entry IDs are only unique within this process
+        data.pop("entry_id")
+        path = str(track.file_path or "")
+        # Progressive stream URLs die with the process; the cache key remains
+        data["file_path"] = "" if progressive.is_stream(path) else path
+        return data
+
+    @staticmethod
+    async def _position(chat_id: int) -> Optional[int]:
+        # played_time clears the chat when the assistant is not in the call,
+        # which would wipe queues that are still being started
+        try:
+            return await call.position(chat_id)
+        except Exception as e:
+            LOGGER.debug("Position check failed for %s: %s", chat_id, e)
+            return None
+
+    async def flush(self) -> None:
+        """Write changed queues and refresh positions of active chats."""
+        if not self._tracking:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        try:
+            saved_at = time.time()
+            snapshots: list[dict[str, Any]] = []
+            positions: dict[int, int] = {}
+            removed: list[int] = []
+            for chat_id in dirty | set(chat_cache.get_active_chats()):
+                position: Optional[int] = None
+                if chat_cache.get_queue_length(chat_id):
+                    position = await self._position(chat_id)
+                # Read the queue after awaiting so the snapshot is current
+                queue = chat_cache.get_queue(chat_id)
+                if not queue:
+                    if chat_id in dirty:
+                        removed.append(chat_id)
+                elif chat_id in dirty:
+                    snapshots.append(
+                        {
+                            "_id": chat_id,
+                            "tracks": [self._serialize(track) for track in queue],
+                            "position": position or 0,
+                            "saved_at": saved_at,
+                        }
+                    )
+                elif position is not None:
+                    # Chats without an assistant yet keep their saved position
+                    positions[chat_id] = position
+
+            written = await db.write_queue_snapshots(
+                snapshots, positions, removed, saved_at
+            )
+        except BaseException:
+            self._dirty |= dirty
+            raise
+
+        if written:
+            self.writes += 1
+        else:
+            self._dirty |= dirty
+
+    async def restore(self) -> int:
+        """Reload saved queues and resume playback in each chat.
+
+        Returns:
+            int: Number of chats where playback resumed.
+        """
+        if not self.enabled:
+            return 0
+
+        restored = 0
+        stale: list[int] = []
+        now = time.time()
+        for snapshot in await db.get_queue_snapshots():
+            chat_id = snapshot["_id"]
+            age = now - snapshot.get("saved_at", 0)
+            if self.max_age and age > self.max_age:
+                LOGGER.info("Skipping queue snapshot for %s (%ds old)", chat_id, age)
+                stale.append(chat_id)
+                continue
+            try:
+                if await self._resume(chat_id, snapshot):
+                    restored += 1
+            except Exception as e:
+                LOGGER.error(
+                    "Failed to resume queue in %s: %s", chat_id, e, exc_info=True
+                )
+                chat_cache.clear_chat(chat_id)
+
+        if stale:
+            await db.write_queue_snapshots([], {}, stale, now)
+        self.restored += restored
+        LOGGER.info("Resumed playback in %d chat(s)", restored)
+        return restored
+
+    async def _resume(self, chat_id: int, snapshot: dict[str, Any]) -> bool:
+        # After an in-process restart the queue is still in memory
+        if not chat_cache.get_queue_length(chat_id):
+            try:
+                tracks = [
+                    CachedTrack.from_model(CachedTrackModel(**data))
+                    for data in snapshot.get("tracks", [])
+                ]
+            except ValidationError as e:
+                LOGGER.warning("Discarding invalid queue snapshot for %s: %s", chat_id, e)
+                tracks = []
+            for track in tracks:
+                chat_cache.add_song(chat_id, track)
+
+        song = chat_cache.get_playing_track(chat_id)
+        if song is None:
+            chat_cache.clear_chat(chat_id)
+            return False
+
+        file_path = song.file_path
+        if not file_path or not os.path.exists(file_path):
+            file_path = await call.song_download(song)
+        if isinstance(file_path, types.Error) or not file_path:
+            LOGGER.warning("Cannot resume %s in %s: %s", song.name, chat_id, file_path)
+            chat_cache.clear_chat(chat_id)
+            return False
+        song.file_path = file_path
+
+        position = int(snapshot.get("position", 0))
+        if 0 < position < song.duration:
+            result = await call.seek_stream(
+                chat_id, file_path, position, song.duration, song.is_video
+            )
+        else:
+            position = 0
+            result = await call.play_media(chat_id, file_path, video=song.is_video)
+        if isinstance(result, types.Error):
+            LOGGER.warning("Cannot resume playback in %s: %s", chat_id, result.message)
+            chat_cache.clear_chat(chat_id)
+            return False
+
+        prefetcher.schedule(chat_id)
+        await call.bot.sendTextMessage(
+            chat_id,
+            f"▶️ <b>Playback resumed</b> after a restart.\n\n"
+            f"‣ <b>Title:</b> <a href='{song.url}'>{song.name}</a>\n"
+            f"‣ <b>Position:</b> {sec_to_min(position)}/{sec_to_min(song.duration)}",
+        )
+        return True
+
+    async def close(self) -> None:
+        """Stop the snapshot loop after writing any pending changes.
+
+        Changes made after this, such as calls being ended for a restart,
+        are not recorded, so the last snapshot is what gets resumed.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        self._tracking = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "writes": self.writes,
+            "restored": self.restored,
+            "pending": len(self._dirty),
+        }
+
+
+queue_store: QueueStore = QueueStore(
+    config.QUEUE_PERSIST, config.QUEUE_SNAPSHOT_INTERVAL, config.QUEUE_RESTORE_MAX_AGE
+)
@@ -0,0 +1,98 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import re
+import unicodedata
+from typing import Awaitable, Callable, Union
+
+from cachetools import TTLCache
+from pytdbot import types
+
+from ._config import config
+from ._dataclass import PlatformTracks
+from ._singleflight import SingleFlight
+
+SearchResult = Union[PlatformTracks, types.Error]
+
+
+class SearchCache:
+    """Cache text search results per provider.
+
+    Queries are normalised so that case, punctuation and spacing variants
+    share one entry. "No results" answers are kept for a much shorter time
+    than real results, and identical searches running at the same time are
+    coalesced into a single provider request.
+    """
+
+    _WHITESPACE = re.compile(r"\s+")
+
+    def __init__(self, maxsize: int, ttl: int, negative_ttl: int) -> None:
+        self._results: TTLCache[tuple[str, str], PlatformTracks] = TTLCache(
+            maxsize=maxsize, ttl=ttl
+        )
+        self._misses: TTLCache[tuple[str, str], types.Error] = TTLCache(
+            maxsize=maxsize, ttl=negative_ttl
+        )
+        self._flight: SingleFlight[SearchResult] = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        # Only punctuation and symbols are dropped; "\w" would also drop the
+        # combining vowel signs of scripts such as Devanagari
+        query = "".join(
+            " " if unicodedata.category(char)[0] in "PS" else char
+            for char in query.casefold()
+        )
+        return cls._WHITESPACE.sub(" ", query).strip()
+
+    async def fetch(
+        self, provider: str, query: str, search: Callable[[], Awaitable[SearchResult]]
+    ) -> SearchResult:
+        """Return cached results for ``query`` or run ``search`` once to get them.
+
+        Args:
+            provider: Name of the search backend.
+            query: Raw user query.
+            search: Coroutine factory performing the provider search.
+
+        Returns:
+            PlatformTracks on success, or types.Error.
+        """
+        key = (provider, self.normalize(query) or query)
+        if (cached := self._results.get(key)) is not None:
+            self.hits += 1
+            return cached
+        if (error := self._misses.get(key)) is not None:
+            self.hits += 1
+            return error
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._search(key, search))
+
+    async def _search(
+        self, key: tuple[str, str], search: Callable[[], Awaitable[SearchResult]]
+    ) -> SearchResult:
+        result = await search()
+        if isinstance(result, types.Error):
+            # Only remember definite "not found" answers, not transient failures
+            if result.code == 404:
+                self._misses[key] = result
+        elif result.tracks:
+            self._results[key] = result
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "entries": len(self._results),
+        }
+
+
+search_cache: SearchCache = SearchCache(
+    config.SEARCH_CACHE_SIZE, config.SEARCH_CACHE_TTL, config.SEARCH_NEGATIVE_TTL
+)
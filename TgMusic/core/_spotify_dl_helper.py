@@ -5,10 +5,10 @@
 import asyncio
 import os
 import subprocess
+import time
 from pathlib import Path
 from typing import Union
 
-import aiofiles
 from Crypto.Cipher import AES
 from Crypto.Util import Counter
 from pytdbot import types
@@ -18,124 +18,157 @@ from TgMusic.logger import LOGGER
 from ._config import config
 from ._httpx import HttpxClient
 from ._dataclass import TrackInfo
+from ._media_cache import media_cache
+from ._offload import offload
+from ._progressive import report_progress
+
+_OGG_S = b"OggS"
+_ZEROES = b"\x00" * 10
+
+# (offset, bytes) patches that repair the first OGG pages of a decrypted track
+OGG_HEADER_PATCHES = (
+    (0, _OGG_S),
+    (6, _ZEROES),
+    (26, b"\x01\x1e\x01vorbis"),
+    (39, b"\x02"),
+    (40, b"\x44\xac\x00\x00"),
+    (48, b"\x00\xe2\x04\x00"),
+    (56, b"\xb8\x01"),
+    (58, _OGG_S),
+    (62, _ZEROES),
+)
+OGG_HEADER_SIZE = max(offset + len(data) for offset, data in OGG_HEADER_PATCHES)
+
+SPOTIFY_IV = int.from_bytes(bytes.fromhex("72e067fbddcbcf77ebe8bc643f630d93"), "big")
+
+
+def decrypt_ctr(key: bytes, offset: int, data: bytes) -> bytes:
+    """
+    Decrypt ``data`` found at byte ``offset`` of an AES-CTR encrypted track.
+
+    The counter is derived from the offset, so chunks can be decrypted
+    independently of each other.
+    """
+    block, skip = divmod(offset, AES.block_size)
+    cipher = AES.new(
+        key, AES.MODE_CTR, counter=Counter.new(128, initial_value=SPOTIFY_IV + block)
+    )
+    if skip:
+        cipher.decrypt(bytes(skip))
+    return cipher.decrypt(data)
 
 
-async def rebuild_ogg(filename: str) -> None:
+def rebuild_ogg(header: bytearray) -> None:
     """
-    Fixes broken OGG headers.
+    Fixes broken OGG headers in place.
     """
-    if not os.path.exists(filename):
-        LOGGER.error("❌ Error: %s not found.", filename)
-        return
-
-    try:
-        async with aiofiles.open(filename, "r+b") as ogg_file:
-            ogg_s = b"OggS"
-            zeroes = b"\x00" * 10
-            vorbis_start = b"\x01\x1e\x01vorbis"
-            channels = b"\x02"
-            sample_rate = b"\x44\xac\x00\x00"
-            bit_rate = b"\x00\xe2\x04\x00"
-            packet_sizes = b"\xb8\x01"
-
-            await ogg_file.seek(0)
-            await ogg_file.write(ogg_s)
-            await ogg_file.seek(6)
-            await ogg_file.write(zeroes)
-            await ogg_file.seek(26)
-            await ogg_file.write(vorbis_start)
-            await ogg_file.seek(39)
-            await ogg_file.write(channels)
-            await ogg_file.seek(40)
-            await ogg_file.write(sample_rate)
-            await ogg_file.seek(48)
-            await ogg_file.write(bit_rate)
-            await ogg_file.seek(56)
-            await ogg_file.write(packet_sizes)
-            await ogg_file.seek(58)
-            await ogg_file.write(ogg_s)
-            await ogg_file.seek(62)
-            await ogg_file.write(zeroes)
-    except Exception as e:
-        LOGGER.error("Error rebuilding OGG file %s: %s", filename, e)
+    for offset, data in OGG_HEADER_PATCHES:
+        header[offset : offset + len(data)] = data
 
 
 class SpotifyDownload:
+    """Download, decrypt and remux a Spotify track in a single pass.
+
+    The encrypted body is decrypted as it arrives, the OGG header is patched
+    in memory and the plaintext is piped straight into ffmpeg, so the remuxed
+    output is the only file ever written.
+    """
+
     def __init__(self, track: TrackInfo):
         self.track = track
-        self.encrypted_file = os.path.join(
-            config.DOWNLOADS_DIR, f"{track.tc}.encrypted.ogg"
-        )
-        self.decrypted_file = os.path.join(
-            config.DOWNLOADS_DIR, f"{track.tc}.decrypted.ogg"
+        self.cache_key = media_cache.make_key("spotify", track.tc)
+        stem = media_cache.stem_for(self.cache_key)
+        self.temp_file = os.path.join(config.DOWNLOADS_DIR, f"{stem}.ogg.tmp")
+        self.output_file = str(media_cache.path_for(self.cache_key, "ogg"))
+
+    async def _start_ffmpeg(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "ogg",
+            "-i",
+            "pipe:0",
+            "-c",
+            "copy",
+            "-f",
+            "ogg",
+            self.temp_file,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
         )
-        self.output_file = os.path.join(config.DOWNLOADS_DIR, f"{track.tc}.ogg")
 
-    async def decrypt_audio(self) -> None:
-        """
-        Decrypt the downloaded audio file using a stream-based approach.
-        """
-        try:
-            key = bytes.fromhex(self.track.key)
-            iv = bytes.fromhex("72e067fbddcbcf77ebe8bc643f630d93")
-            iv_int = int.from_bytes(iv, "big")
-            cipher = AES.new(
-                key, AES.MODE_CTR, counter=Counter.new(128, initial_value=iv_int)
-            )
+    async def _pipeline(self) -> int:
+        """Stream, decrypt and remux the track into ``temp_file``.
 
-            chunk_size = 8192  # 8KB chunks
-            async with (
-                aiofiles.open(self.encrypted_file, "rb") as fin,
-                aiofiles.open(self.decrypted_file, "wb") as f,
-            ):
-                while chunk := await fin.read(chunk_size):
-                    decrypted_chunk = cipher.decrypt(chunk)
-                    await f.write(decrypted_chunk)
-        except Exception as e:
-            LOGGER.error("Error decrypting audio file: %s", e)
-            raise
-
-    async def fix_audio(self) -> None:
-        """
-        Fix the decrypted audio file using ffmpeg.
+        Returns:
+            int: Number of encrypted bytes received.
         """
+        key = bytes.fromhex(self.track.key)
+        process = await self._start_ffmpeg()
+        stderr = asyncio.create_task(process.stderr.read())
+        received = 0
+        header = bytearray()
+
         try:
-            process = await asyncio.create_subprocess_exec(
-                "ffmpeg",
-                "-i",
-                self.decrypted_file,
-                "-c",
-                "copy",
-                self.output_file,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            _, stderr = await process.communicate()
-            if process.returncode != 0:
-                LOGGER.error("ffmpeg error: %s", stderr.decode().strip())
-                raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
-        except Exception as e:
-            LOGGER.error("Error fixing audio file: %s", e)
+            async for chunk in HttpxClient().stream_bytes(self.track.cdnurl):
+                # pycryptodome releases the GIL, so a thread avoids pickling chunks
+                data = await offload.run(
+                    "decrypt", decrypt_ctr, key, received, chunk, process=False
+                )
+                received += len(chunk)
+                if header is not None:
+                    header += data
+                    if len(header) < OGG_HEADER_SIZE:
+                        continue
+                    rebuild_ogg(header)
+                    data, header = bytes(header), None
+
+                process.stdin.write(data)
+                await process.stdin.drain()
+                if os.path.exists(self.temp_file):
+                    report_progress(
+                        Path(self.temp_file), os.path.getsize(self.temp_file)
+                    )
+
+            if header:
+                # Track shorter than the header; pass it through unpatched
+                process.stdin.write(bytes(header))
+            process.stdin.close()
+            await process.wait()
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
             raise
+        finally:
+            error = await stderr
+
+        if process.returncode != 0:
+            LOGGER.error("ffmpeg error: %s", error.decode().strip())
+            raise subprocess.CalledProcessError(process.returncode, "ffmpeg")
+        return received
 
     async def _cleanup(self) -> None:
         """
-        Cleanup temporary files asynchronously.
+        Remove the partially written output.
         """
-        for file in [self.encrypted_file, self.decrypted_file]:
-            try:
-                if os.path.exists(file):
-                    os.remove(file)
-            except Exception as e:
-                LOGGER.warning("Error removing %s: %s", file, e)
+        try:
+            if os.path.exists(self.temp_file):
+                os.remove(self.temp_file)
+        except Exception as e:
+            LOGGER.warning("Error removing %s: %s", self.temp_file, e)
 
     async def process(self) -> Union[Path, types.Error]:
         """
         Main function to download, decrypt, and fix audio.
         """
-        if os.path.exists(self.output_file):
-            LOGGER.info("✅ Found existing file: %s", self.output_file)
-            return Path(self.output_file)
+        if cached := media_cache.get(self.cache_key):
+            LOGGER.info("✅ Found existing file: %s", cached)
+            return cached
 
         _track_id = self.track.tc
         if not self.track.cdnurl or not self.track.key:
@@ -145,13 +178,18 @@ class SpotifyDownload:
             )
 
         try:
-            await HttpxClient().download_file(self.track.cdnurl, self.encrypted_file)
-            await self.decrypt_audio()
-            await rebuild_ogg(self.decrypted_file)
-            await self.fix_audio()
-            await self._cleanup()
-            LOGGER.info("✅ Successfully processed track: %s", self.output_file)
-            return Path(self.output_file)
+            started = time.monotonic()
+            received = await self._pipeline()
+            os.replace(self.temp_file, self.output_file)
+            LOGGER.info(
+                "✅ Successfully processed track: %s in %.2fs "
+                "(%d bytes received, peak disk %d bytes)",
+                self.output_file,
+                time.monotonic() - started,
+                received,
+                os.path.getsize(self.output_file),
+            )
+            return await media_cache.put(self.cache_key, self.output_file)
         except Exception as e:
             LOGGER.error("Error processing track %s: %s", _track_id, e)
             await self._cleanup()
@@ -2,9 +2,10 @@
 #  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
+import asyncio
 import os
-import random
 import re
+from contextlib import suppress
 from pathlib import Path
 from typing import Optional, Union
 
@@ -30,20 +31,30 @@ from TgMusic.modules.utils import (
     get_audio_duration,
     sec_to_min,
 )
+from ._assistants import assistants
 from ._cacher import (
     chat_cache,
     ChatMemberStatusResult,
     user_status_cache,
     chat_invite_cache,
 )
+from ._config import config
 from ._database import db
 from ._dataclass import CachedTrack
 from ._downloader import DownloaderWrapper
+from ._file_ids import file_ids
+from ._media_cache import MediaInfo, media_cache
+from ._prefetch import prefetcher
+from ._progressive import progressive, tracked
+from ._singleflight import SingleFlight
 from .buttons import control_buttons
 from .thumbnails import gen_thumb
 from .utils import send_logger
 
 
+download_flight: SingleFlight[Union[Path, types.Error]] = SingleFlight()
+
+
 class Calls:
     def __init__(self):
         self.calls: dict[str, PyTgCalls] = {}
@@ -51,6 +62,8 @@ class Calls:
         self.client_counter: int = 1
         self.available_clients: list[str] = []
         self.bot: Optional[Client] = None
+        self._failing_over: set[str] = set()
+        assistants.add_down_listener(self._on_assistant_down)
 
     async def add_bot(self, bot: Client) -> types.Ok:
         self.bot = bot
@@ -64,17 +77,46 @@ class Calls:
             )
 
         if chat_id == 1:
-            return random.choice(self.available_clients)
+            return assistants.pick(self.available_clients)
 
         assistant = await db.get_assistant(chat_id)
-        if assistant and assistant in self.available_clients:
+        if assistant and assistant in assistants.healthy(self.available_clients):
+            assistants.assign(chat_id, assistant)
             return assistant
 
-        new_client = random.choice(self.available_clients)
+        new_client = assistants.pick(self.available_clients)
+        assistants.assign(chat_id, new_client)
         await db.set_assistant(chat_id, assistant=new_client)
-        LOGGER.info("Set assistant for %s to %s", chat_id, new_client)
+        if assistant in self.available_clients:
+            LOGGER.info(
+                "Moved %s from unhealthy assistant %s to %s",
+                chat_id,
+                assistant,
+                new_client,
+            )
+        else:
+            LOGGER.info("Set assistant for %s to %s", chat_id, new_client)
         return new_client
 
+    @staticmethod
+    def _record_failure(name: str, error: Exception) -> None:
+        """Feed an assistant's error into its load, and into its health if
+        the error is about the session rather than the chat.
+
+        Chat-specific errors such as ChatAdminRequired, GroupcallForbidden
+        or ChannelPrivate say nothing about the assistant itself, so they
+        only add to its load.
+        """
+        flood = isinstance(error, (errors.Flood, errors.FloodWait))
+        assistants.record_error(name, flood=flood)
+        if isinstance(error, errors.FloodWait):
+            assistants.record_failure(name, retry_after=int(error.value or 0))
+        elif isinstance(error, errors.Unauthorized):
+            # Revoked, deactivated or banned session, including AuthKey* errors
+            assistants.record_failure(name, fatal=True)
+        elif isinstance(error, (ConnectionError, asyncio.TimeoutError)):
+            assistants.record_failure(name)
+
     async def _group_assistant(self, chat_id: int) -> Union[PyTgCalls, types.Error]:
         client_name = await self._get_client_name(chat_id)
         if isinstance(client_name, types.Error):
@@ -154,12 +196,17 @@ class Calls:
                 await client.get_me()
                 await client.send_message("me", "Health check")
                 LOGGER.debug("Client %s is healthy", name)
-            except (errors.Flood, errors.FloodWait):
+                assistants.record_ok(name)
+            except (errors.Flood, errors.FloodWait) as e:
                 LOGGER.warning("Flood error while checking health of client %s", name)
+                self._record_failure(name, e)
             except errors.RPCError as e:
                 LOGGER.error("Error checking health of client %s: %s", name, e)
+                self._record_failure(name, e)
             except Exception as e:
                 LOGGER.error("Error checking health of client %s: %s", name, e)
+                # The connection itself is gone
+                assistants.record_failure(name, fatal=True)
                 raise RuntimeError(f"Failed to check health of client {name}: {str(e)}") from e
 
     async def register_decorators(self) -> None:
@@ -215,10 +262,11 @@ class Calls:
                 "Audio streaming configuration: audio_path=%s, audio_flags=REQUIRED, video_flags=IGNORE", file_path
             )
 
-        client = await self._group_assistant(chat_id)
-        if isinstance(client, types.Error):
+        client_name = await self._get_client_name(chat_id)
+        if isinstance(client_name, types.Error):
             chat_cache.clear_chat(chat_id)
-            return client
+            return client_name
+        client = self.calls[client_name]
 
         # Validate media file exists if not URL
         if not re.match("^https?://", str(file_path)) and not os.path.exists(file_path):
@@ -248,6 +296,7 @@ class Calls:
         )
         try:
             await client.play(chat_id, _stream, call_config)
+            assistants.record_ok(client_name)
             # Send playback log if enabled
             if await db.get_logger_status(self.bot.me.id):
                 self.bot.loop.create_task(
@@ -274,7 +323,14 @@ class Calls:
             return types.Error(code=404, message="Audio source not found.")
         except errors.RPCError as e:
             LOGGER.error("Playback failed in chat %s: %s", chat_id, str(e))
+            self._record_failure(client_name, e)
             return types.Error(code=e.CODE or 500, message=f"Playback error: {str(e)}")
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            LOGGER.error("Assistant %s lost its connection: %s", client_name, e)
+            self._record_failure(client_name, e)
+            return types.Error(
+                code=503, message=f"Assistant connection lost: {str(e)}"
+            )
         except Exception as e:
             LOGGER.error(
                 "Playback failed in chat %s: %s", chat_id, str(e), exc_info=True
@@ -326,8 +382,8 @@ class Calls:
                 return
 
             # Download song if isn't downloaded
-            file_path = song.file_path or await self.song_download(song)
-            if not file_path:
+            file_path = song.file_path or await self.fetch_for_playback(song)
+            if isinstance(file_path, types.Error) or not file_path:
                 await reply.edit_text(
                     "⚠️ Failed to download the song.\n" "Skipping to next track..."
                 )
@@ -340,8 +396,12 @@ class Calls:
                 await reply.edit_text(play_result.message)
                 return
 
+            prefetcher.schedule(chat_id)
+
             # Get duration if not available
-            duration = song.duration or await get_audio_duration(file_path)
+            duration = song.duration
+            if not duration and not progressive.is_stream(file_path):
+                duration = song.duration = await get_audio_duration(file_path)
 
             # Prepare a playback message
             text = (
@@ -351,9 +411,8 @@ class Calls:
                 f"‣ <b>Requested by:</b> {song.user}"
             )
 
-            thumbnail = (
-                await gen_thumb(song) if await db.get_thumbnail_status(chat_id) else ""
-            )
+            settings = await db.get_chat_settings(chat_id)
+            thumbnail = await gen_thumb(song) if settings.thumbnail else ""
             # Parse text entities
             parse = await self.bot.parseTextEntities(text, types.TextParseModeHTML())
             if isinstance(parse, types.Error):
@@ -362,17 +421,16 @@ class Calls:
 
             # Update a message with media or text
             if thumbnail:
-                input_content = types.InputMessagePhoto(
-                    photo=types.InputFileLocal(thumbnail), caption=parse
-                )
-                await self.bot.editMessageMedia(
-                    chat_id=chat_id,
-                    message_id=reply.id,
-                    input_message_content=input_content,
-                    reply_markup=(
-                        control_buttons("play")
-                        if await db.get_buttons_status(chat_id)
-                        else None
+                reply_markup = control_buttons("play") if settings.buttons else None
+                await file_ids.send(
+                    thumbnail,
+                    lambda photo: self.bot.editMessageMedia(
+                        chat_id=chat_id,
+                        message_id=reply.id,
+                        input_message_content=types.InputMessagePhoto(
+                            photo=photo, caption=parse
+                        ),
+                        reply_markup=reply_markup,
                     ),
                 )
             else:
@@ -384,9 +442,7 @@ class Calls:
                         link_preview_options=types.LinkPreviewOptions(is_disabled=True),
                     ),
                     reply_markup=(
-                        control_buttons("play")
-                        if await db.get_buttons_status(chat_id)
-                        else None
+                        control_buttons("play") if settings.buttons else None
                     ),
                 )
 
@@ -395,6 +451,30 @@ class Calls:
                 "Error in _play_song for chat %s: %s", chat_id, str(e), exc_info=True
             )
 
+    async def fetch_for_playback(
+        self, song: CachedTrack
+    ) -> Union[Path, str, types.Error]:
+        """Download a song, or return a progressive stream URL if enabled.
+
+        Args:
+            song: CachedTrack object containing song data
+
+        Returns:
+            Local path or loopback URL to play, or types.Error on failure
+        """
+        if not progressive.enabled:
+            return await self.song_download(song)
+
+        def _on_complete(path: Path) -> None:
+            song.file_path = path
+
+        result = await progressive.fetch(
+            self._flight_key(song), lambda: self.song_download(song), _on_complete
+        )
+        if isinstance(result, str):
+            song.file_path = result
+        return result
+
     @staticmethod
     async def song_download(song: CachedTrack) -> Union[Path, types.Error]:
         """Download a song from various platforms.
@@ -405,14 +485,62 @@ class Calls:
         Returns:
             Path to the downloaded file or types.Error if download fails
         """
-        song_url = song.url
+        cache_key = media_cache.make_key(song.platform, song.track_id, song.is_video)
+        if cached := media_cache.get(cache_key):
+            return cached
+
+        # Concurrent requests for the same track share a single download
+        key = Calls._flight_key(song)
+        return await download_flight.do(
+            key,
+            tracked(key, lambda: Calls._download(song.url, song.is_video)),
+        )
+
+    @staticmethod
+    def _flight_key(song: CachedTrack) -> tuple[str, str, bool]:
+        return song.platform, song.track_id, song.is_video
+
+    @staticmethod
+    async def validate_track(song: CachedTrack) -> Union[types.Ok, types.Error]:
+        """Check that a track can be resolved, without downloading it.
+
+        Used before queueing a track whose download is left to the
+        prefetcher. The resolved metadata is cached, so the later download
+        does not look it up again.
+
+        Args:
+            song: CachedTrack object containing song data
+
+        Returns:
+            types.Ok if the track resolves or types.Error describing why not
+        """
+        cache_key = media_cache.make_key(song.platform, song.track_id, song.is_video)
+        if media_cache.get(cache_key):
+            return types.Ok()
+
+        wrapper = DownloaderWrapper(song.url)
+        if not wrapper.is_valid():
+            return types.Error(code=400, message=f"Invalid URL: {song.url}")
+
+        track_info = await wrapper.get_track()
+        return track_info if isinstance(track_info, types.Error) else types.Ok()
+
+    @staticmethod
+    async def _download(song_url: str, is_video: bool) -> Union[Path, types.Error]:
         wrapper = DownloaderWrapper(song_url)
         if wrapper.is_valid():
             track_info = await wrapper.get_track()
             if isinstance(track_info, types.Error):
                 return track_info
 
-            return await wrapper.download_track(track_info, song.is_video)
+            result = await wrapper.download_track(track_info, is_video)
+            if isinstance(result, Path) and track_info.duration:
+                # Provider metadata saves a later ffprobe for the duration
+                if media_cache.info_for(result) is None:
+                    media_cache.remember_info(
+                        result, MediaInfo(duration=track_info.duration)
+                    )
+            return result
         return types.Error(
             code=400,
             message=f"Invalid URL: {song_url}",
@@ -456,6 +584,8 @@ class Calls:
             ):
                 pass  # Already not in call
 
+            if config.ASSISTANT_REBALANCE:
+                await self._rebalance(chat_id)
             return types.Ok()
         except Exception as e:
             LOGGER.error(
@@ -463,6 +593,108 @@ class Calls:
             )
             return types.Error(code=500, message=f"Failed to end call: {str(e)}")
 
+    async def _rebalance(self, chat_id: int) -> None:
+        """Unpin a chat from a busy assistant so its next play picks a new one."""
+        current = assistants.assistant_of(chat_id)
+        if current and assistants.should_move(current, self.available_clients):
+            await db.remove_assistant(chat_id)
+            assistants.rebalanced += 1
+            LOGGER.info("Unassigned %s from busy assistant %s", chat_id, current)
+
+    def _on_assistant_down(self, name: str) -> None:
+        if config.ASSISTANT_FAILOVER and self.bot is not None:
+            self.bot.loop.create_task(self.failover(name))
+
+    async def failover(self, name: str) -> int:
+        """Move active chats off an unhealthy assistant.
+
+        Each chat is given a healthy assistant and its current track is
+        resumed there from the position it had reached. Chats that are not
+        playing are moved the next time they need an assistant.
+
+        Args:
+            name: Assistant to move chats away from
+
+        Returns:
+            int: Number of chats where playback continued
+        """
+        if name in self._failing_over:
+            return 0
+        others = [client for client in self.available_clients if client != name]
+        if not any(assistants.is_healthy(client) for client in others):
+            LOGGER.warning("No healthy assistant to take over from %s", name)
+            return 0
+
+        self._failing_over.add(name)
+        moved = 0
+        try:
+            for chat_id in chat_cache.get_active_chats():
+                if assistants.assistant_of(chat_id) != name:
+                    continue
+                try:
+                    if await self._migrate(chat_id, name, others):
+                        moved += 1
+                except Exception as e:
+                    LOGGER.error(
+                        "Failed to move %s off %s: %s", chat_id, name, e, exc_info=True
+                    )
+        finally:
+            self._failing_over.discard(name)
+
+        assistants.migrated += moved
+        LOGGER.info("Moved %d chat(s) off assistant %s", moved, name)
+        return moved
+
+    async def _migrate(self, chat_id: int, old: str, others: list[str]) -> bool:
+        song = chat_cache.get_playing_track(chat_id)
+        if song is None:
+            return False
+
+        position = 0
+        old_client = self.calls[old]
+        with suppress(Exception):
+            position = int(await asyncio.wait_for(old_client.time(chat_id), 5) or 0)
+        with suppress(Exception):
+            await asyncio.wait_for(old_client.leave_call(chat_id), 5)
+
+        new = assistants.pick(others)
+        assistants.assign(chat_id, new)
+        await db.set_assistant(chat_id, assistant=new)
+
+        file_path = song.file_path
+        path = str(file_path or "")
+        if not path or not (progressive.is_stream(path) or os.path.exists(path)):
+            file_path = await self.song_download(song)
+        if isinstance(file_path, types.Error) or not file_path:
+            result = file_path or types.Error(code=404, message="Track not available")
+        else:
+            song.file_path = file_path
+            if 0 < position < song.duration:
+                result = await self.seek_stream(
+                    chat_id, file_path, position, song.duration, song.is_video
+                )
+            else:
+                position = 0
+                result = await self.play_media(chat_id, file_path, video=song.is_video)
+
+        if isinstance(result, types.Error):
+            LOGGER.warning("Could not move %s to %s: %s", chat_id, new, result.message)
+            chat_cache.clear_chat(chat_id)
+            await self.bot.sendTextMessage(
+                chat_id,
+                "⚠️ The assistant became unavailable and playback could not be "
+                f"continued.\n\n{result.message}",
+            )
+            return False
+
+        await self.bot.sendTextMessage(
+            chat_id,
+            "🔁 <b>Switched assistant</b> after the previous one became "
+            f"unavailable.\n\n‣ <b>Resumed at:</b> "
+            f"{sec_to_min(position)}/{sec_to_min(song.duration)}",
+        )
+        return True
+
     async def seek_stream(
         self,
         chat_id: int,
@@ -679,6 +911,28 @@ class Calls:
                 code=500, message=f"Failed to get playback time: {str(e)}"
             )
 
+    async def position(self, chat_id: int) -> Optional[int]:
+        """Get the playback position without touching the chat's state.
+
+        Unlike ``played_time`` this never assigns an assistant or clears the
+        queue, so it is safe to call while a track is still being set up.
+
+        Args:
+            chat_id: Target chat ID
+
+        Returns:
+            Position in seconds, 0 if the assistant is not in the call yet,
+            or None if no assistant serves the chat
+        """
+        name = assistants.assistant_of(chat_id)
+        client = self.calls.get(name) if name else None
+        if client is None:
+            return None
+        try:
+            return int(await client.time(chat_id) or 0)
+        except exceptions.NotInCallError:
+            return 0
+
     async def vc_users(self, chat_id: int) -> Union[list, types.Error]:
         """Get a list of participants in voice chat.
 
@@ -824,6 +1078,9 @@ class Calls:
         except errors.UserAlreadyParticipant:
             user_status_cache[cache_key] = types.ChatMemberStatusMember()
             return types.Ok()
+        except (errors.Flood, errors.FloodWait) as e:
+            self._record_failure(client.name, e)
+            return types.Error(code=429, message=f"Assistant is rate limited: {e}")
         except errors.InviteHashExpired:
             return types.Error(
                 code=400,
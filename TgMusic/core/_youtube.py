@@ -3,6 +3,7 @@
 # Part of the TgMusicBot project. All rights reserved where applicable.
 
 import asyncio
+import json
 import os
 import random
 import re
@@ -19,6 +20,11 @@ from ._config import config
 from ._dataclass import MusicTrack, PlatformTracks, TrackInfo
 from ._downloader import MusicService
 from ._httpx import HttpxClient
+from ._media_cache import MediaInfo, media_cache
+from ._metadata_cache import metadata_cache
+from ._progressive import report_progress
+from ._search_cache import search_cache
+from ._ytdlp_pool import YtDlpPoolError, ytdlp_pool
 
 
 class YouTubeUtils:
@@ -69,6 +75,15 @@ class YouTubeUtils:
                 return match.group(1)
         return None
 
+    @staticmethod
+    def metadata_key(url: str) -> Optional[str]:
+        """Build a canonical metadata cache key for a video or playlist URL."""
+        if match := YouTubeUtils.YOUTUBE_PLAYLIST_PATTERN.match(url):
+            return f"playlist:{match.group(1)}"
+        if video_id := YouTubeUtils._extract_video_id(url):
+            return f"video:{video_id}"
+        return None
+
     @staticmethod
     async def normalize_youtube_url(url: str) -> Optional[str]:
         """Normalize different YouTube URL formats to standard watch URL."""
@@ -255,7 +270,8 @@ class YouTubeUtils:
         video_id: str, video: bool, cookie_file: Optional[str]
     ) -> list[str]:
         """Construct yt-dlp parameters based on video/audio requirements."""
-        output_template = str(config.DOWNLOADS_DIR / "%(id)s.%(ext)s")
+        cache_key = media_cache.make_key("youtube", video_id, video)
+        output_template = str(media_cache.path_for(cache_key, "%(ext)s"))
 
         format_selector = (
             "bestvideo[ext=mp4][height<=1080]+bestaudio[ext=m4a]/best[ext=mp4][height<=1080]"
@@ -300,10 +316,80 @@ class YouTubeUtils:
             ytdlp_params += ["--cookies", cookie_file]
 
         video_url = f"https://www.youtube.com/watch?v={video_id}"
-        ytdlp_params += [video_url, "--print", "after_move:filepath"]
+        ytdlp_params += [
+            video_url,
+            "--print",
+            "after_move:%(.{filepath,duration,acodec,vcodec,asr,width,height})j",
+        ]
 
         return ytdlp_params
 
+    @staticmethod
+    def _build_ytdlp_options(
+        video_id: str, video: bool, cookie_file: Optional[str]
+    ) -> dict[str, Any]:
+        """Construct ``YoutubeDL`` options matching ``_build_ytdlp_params``.
+
+        Workers keep one ``YoutubeDL`` per distinct set of options, so only
+        ``outtmpl`` should vary between jobs of the same kind.
+        """
+        cache_key = media_cache.make_key("youtube", video_id, video)
+        return {
+            "format": (
+                "bestvideo[ext=mp4][height<=1080]+bestaudio[ext=m4a]/best[ext=mp4][height<=1080]"
+                if video
+                else "bestaudio[ext=m4a]/bestaudio[ext=mp4]/bestaudio[ext=webm]/bestaudio/best"
+            ),
+            "outtmpl": str(media_cache.path_for(cache_key, "%(ext)s")),
+            "merge_output_format": "mp4" if video else None,
+            "proxy": config.PROXY or None,
+            "cookiefile": None if config.PROXY else cookie_file,
+            "geo_bypass": True,
+            "retries": 2,
+            "continuedl": True,
+            "nopart": True,
+            "concurrent_fragment_downloads": 3,
+            "socket_timeout": 10,
+            "throttledratelimit": 100 * 1024,
+            "writethumbnail": False,
+            "writeinfojson": False,
+        }
+
+    @staticmethod
+    async def _download_with_pool(
+        video_id: str, video: bool, cookie_file: Optional[str]
+    ) -> Optional[Path]:
+        """Download through a warm yt-dlp worker.
+
+        Returns:
+            Optional[Path]: The downloaded file, or None if yt-dlp failed.
+
+        Raises:
+            YtDlpPoolError: If the pool cannot run the job.
+        """
+        options = YouTubeUtils._build_ytdlp_options(video_id, video, cookie_file)
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        try:
+            result = await ytdlp_pool.download(
+                video_url,
+                options,
+                timeout=config.YTDLP_TIMEOUT,
+                # Video is merged from two streams, so only audio can be
+                # played while it downloads
+                on_progress=None if video else report_progress,
+            )
+        except asyncio.TimeoutError:
+            LOGGER.error("yt-dlp timed out for video ID: %s", video_id)
+            return None
+
+        if result is None:
+            # yt-dlp itself failed; the CLI would fail the same way
+            return None
+        path, info = result
+        media_cache.remember_info(path, MediaInfo.from_ytdlp(info))
+        LOGGER.info("Successfully downloaded %s to %s", video_id, path)
+        return path
+
     @staticmethod
     async def download_with_yt_dlp(video_id: str, video: bool) -> Optional[Path]:
         """Download YouTube media using yt-dlp.
@@ -316,6 +402,18 @@ class YouTubeUtils:
             Optional[str]: File path of the downloaded media, or None on failure.
         """
         cookie_file = await YouTubeUtils.get_cookie_file()
+        if ytdlp_pool.available:
+            try:
+                return await YouTubeUtils._download_with_pool(
+                    video_id, video, cookie_file
+                )
+            except YtDlpPoolError as e:
+                LOGGER.warning(
+                    "yt-dlp pool failed for %s, retrying with yt-dlp CLI: %s",
+                    video_id,
+                    e,
+                )
+
         ytdlp_params = YouTubeUtils._build_ytdlp_params(video_id, video, cookie_file)
 
         try:
@@ -327,7 +425,9 @@ class YouTubeUtils:
                 stderr=asyncio.subprocess.PIPE,
             )
 
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=600)
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=config.YTDLP_TIMEOUT
+            )
 
             if proc.returncode != 0:
                 LOGGER.error(
@@ -338,20 +438,26 @@ class YouTubeUtils:
                 )
                 return None
 
-            downloaded_path_str = stdout.decode().strip()
-            if not downloaded_path_str:
+            output = stdout.decode().strip().splitlines()
+            try:
+                info = json.loads(output[-1]) if output else {}
+            except ValueError:
+                info = {}
+            if not info.get("filepath"):
                 LOGGER.error(
                     "yt-dlp finished but no output path returned for %s", video_id
                 )
                 return None
 
-            downloaded_path = Path(downloaded_path_str)
+            downloaded_path = Path(info["filepath"])
             if not downloaded_path.exists():
                 LOGGER.error(
                     "yt-dlp reported path but file not found: %s", downloaded_path
                 )
                 return None
 
+            media_cache.remember_info(downloaded_path, MediaInfo.from_ytdlp(info))
+
             LOGGER.info("Successfully downloaded %s to %s", video_id, downloaded_path)
             return downloaded_path
 
@@ -421,6 +527,9 @@ class YouTubeData(MusicService):
         if self.is_valid():
             return await self.get_info()
 
+        return await search_cache.fetch("youtube", self.query, self._search)
+
+    async def _search(self) -> Union[PlatformTracks, types.Error]:
         try:
             search = VideosSearch(self.query, limit=5)
             results = await search.next()
@@ -479,10 +588,14 @@ class YouTubeData(MusicService):
         if not track:
             return types.Error(code=400, message="Invalid track information provided")
 
+        cache_key = media_cache.make_key("youtube", track.tc, video)
+        if cached := media_cache.get(cache_key):
+            return cached
+
         # Try API download first if configured
         if config.API_URL and config.API_KEY:
             if api_result := await YouTubeUtils.download_with_api(track.tc, video):
-                return api_result
+                return await media_cache.put(cache_key, api_result)
 
         # Fall back to yt-dlp if API fails or not configured
         dl_path = await YouTubeUtils.download_with_yt_dlp(track.tc, video)
@@ -491,7 +604,7 @@ class YouTubeData(MusicService):
                 code=500, message="Failed to download track from YouTube"
             )
 
-        return dl_path
+        return await media_cache.put(cache_key, dl_path)
 
     async def _fetch_data(self, url: str) -> Optional[Dict[str, Any]]:
         """Internal method to fetch YouTube data.
@@ -499,12 +612,21 @@ class YouTubeData(MusicService):
         Handles both videos and playlists.
         """
         try:
+            cache_key = YouTubeUtils.metadata_key(url)
+            if cache_key:
+                if cached := await metadata_cache.get("youtube", cache_key):
+                    return cached
+
             if YouTubeUtils.YOUTUBE_PLAYLIST_PATTERN.match(url):
                 LOGGER.debug(f"Processing YouTube playlist: {url}")
-                return await self._get_playlist_data(url)
-
-            LOGGER.debug(f"Processing YouTube video: {url}")
-            return await self._get_video_data(url)
+                data = await self._get_playlist_data(url)
+            else:
+                LOGGER.debug(f"Processing YouTube video: {url}")
+                data = await self._get_video_data(url)
+
+            if cache_key and data and data.get("results"):
+                await metadata_cache.set("youtube", cache_key, data)
+            return data
         except Exception as error:
             LOGGER.error(f"Data fetch failed for {url}: {error}")
             return None
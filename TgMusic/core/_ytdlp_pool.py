@@ -0,0 +1,220 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from TgMusic.logger import LOGGER
+
+from ._config import config
+
+WORKER_SCRIPT = Path(__file__).with_name("_ytdlp_worker.py")
+
+
+class YtDlpPoolError(Exception):
+    """Raised when the worker pool cannot run a job (as opposed to yt-dlp failing)."""
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.jobs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def send(self, message: dict[str, Any]) -> None:
+        self.proc.stdin.write((json.dumps(message) + "\n").encode())
+        await self.proc.stdin.drain()
+
+    async def receive(self) -> dict[str, Any]:
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise YtDlpPoolError("yt-dlp worker exited unexpectedly")
+        return json.loads(line)
+
+    async def stop(self) -> None:
+        if not self.alive:
+            return
+        try:
+            self.proc.stdin.close()
+            await asyncio.wait_for(self.proc.wait(), 5)
+        except Exception:
+            self.proc.kill()
+            await self.proc.wait()
+
+
+class YtDlpPool:
+    """Pool of warm yt-dlp worker processes.
+
+    Each worker imports yt-dlp once and keeps ``YoutubeDL`` instances alive
+    between jobs. Jobs are handed to idle workers through a queue; a job
+    that times out or whose caller is cancelled is cancelled inside the
+    worker, and the worker is replaced if it does not respond in time.
+    """
+
+    CANCEL_GRACE = 10
+    START_TIMEOUT = 60
+    MAX_JOBS_PER_WORKER = 200
+
+    def __init__(self, size: int) -> None:
+        self.size = max(size, 0)
+        self._idle: asyncio.Queue[_Worker] = asyncio.Queue()
+        self._workers: set[_Worker] = set()
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._started = False
+        self.available = self.size > 0
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        worker = _Worker(proc)
+        try:
+            ready = await asyncio.wait_for(worker.receive(), self.START_TIMEOUT)
+            if not ready.get("ready"):
+                raise YtDlpPoolError(f"Unexpected worker handshake: {ready}")
+        except Exception:
+            await worker.stop()
+            raise
+        self._workers.add(worker)
+        return worker
+
+    async def _ensure_started(self) -> None:
+        if self._started:
+            return
+        async with self._lock:
+            if self._started:
+                return
+            results = await asyncio.gather(
+                *(self._spawn() for _ in range(self.size)), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, _Worker):
+                    self._idle.put_nowait(result)
+                else:
+                    LOGGER.warning("Failed to start yt-dlp worker: %s", result)
+            self._started = True
+            self.available = bool(self._workers)
+            LOGGER.info("yt-dlp worker pool started with %d workers", len(self._workers))
+
+    async def _retire(self, worker: _Worker) -> None:
+        self._workers.discard(worker)
+        await worker.stop()
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            LOGGER.error("Failed to respawn yt-dlp worker: %s", e)
+            self.available = bool(self._workers)
+
+    async def _release(self, worker: _Worker, job_id: int, cancel: bool) -> None:
+        """Return a worker to the pool once it has finished ``job_id``."""
+        try:
+            if cancel:
+                await worker.send({"op": "cancel", "id": job_id})
+                while True:
+                    reply = await asyncio.wait_for(worker.receive(), self.CANCEL_GRACE)
+                    if reply.get("id") == job_id:
+                        break
+        except Exception as e:
+            LOGGER.warning("yt-dlp worker did not stop cleanly, replacing it: %s", e)
+            await self._retire(worker)
+            return
+
+        if worker.jobs >= self.MAX_JOBS_PER_WORKER:
+            await self._retire(worker)
+        else:
+            self._idle.put_nowait(worker)
+
+    async def download(
+        self,
+        url: str,
+        options: dict[str, Any],
+        timeout: float,
+        on_progress: Optional[Callable[[Path, int, int], None]] = None,
+    ) -> Optional[tuple[Path, dict[str, Any]]]:
+        """Run a yt-dlp download on a pooled worker.
+
+        Args:
+            url: Media URL to download.
+            options: ``YoutubeDL`` parameters for this job.
+            timeout: Seconds to wait before cancelling the job.
+            on_progress: Called with the output path, the bytes written so
+                far and the total size (0 if unknown) while the file is
+                written in one contiguous run. Only pass it for jobs that
+                download a single format without merging or postprocessing.
+
+        Returns:
+            Path of the downloaded file and its yt-dlp stream fields, or None
+            if yt-dlp reported an error.
+
+        Raises:
+            YtDlpPoolError: If no worker is available to run the job or the
+                worker broke while running it.
+            asyncio.TimeoutError: If the job exceeded ``timeout``.
+        """
+        await self._ensure_started()
+        if not self.available:
+            raise YtDlpPoolError("No yt-dlp workers available")
+
+        worker = await self._idle.get()
+        job_id = next(self._ids)
+        worker.jobs += 1
+        try:
+            await worker.send(
+                {
+                    "op": "download",
+                    "id": job_id,
+                    "url": url,
+                    "opts": options,
+                    "progress": on_progress is not None,
+                }
+            )
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while True:
+                reply = await asyncio.wait_for(
+                    worker.receive(), max(deadline - loop.time(), 0)
+                )
+                if "progress" not in reply:
+                    break
+                if on_progress is not None and reply["progress"] == job_id:
+                    on_progress(
+                        Path(reply["path"]), reply["written"], reply["total"]
+                    )
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            asyncio.create_task(self._release(worker, job_id, cancel=True))
+            raise
+        except Exception as e:
+            asyncio.create_task(self._retire(worker))
+            raise YtDlpPoolError(str(e)) from e
+
+        asyncio.create_task(self._release(worker, job_id, cancel=False))
+        if not reply.get("ok"):
+            LOGGER.error("yt-dlp worker failed for %s: %s", url, reply.get("error"))
+            return None
+
+        path = Path(reply["path"])
+        if not path.exists():
+            raise YtDlpPoolError(f"yt-dlp worker reported a missing file: {path}")
+        return path, reply.get("info") or {}
+
+    async def close(self) -> None:
+        workers, self._workers = list(self._workers), set()
+        await asyncio.gather(*(w.stop() for w in workers), return_exceptions=True)
+        self._idle = asyncio.Queue()
+        self._started = False
+
+
+ytdlp_pool: YtDlpPool = YtDlpPool(config.YTDLP_WORKERS)
@@ -0,0 +1,162 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+"""Long-lived yt-dlp worker process.
+
+Run as a standalone script by ``YtDlpPool``. It deliberately imports nothing
+from the bot package so that starting a worker stays cheap. Jobs arrive as
+JSON lines on stdin and results are written as JSON lines to stdout:
+
+    -> {"op": "download", "id": 1, "url": "...", "opts": {...}, "progress": true}
+    -> {"op": "cancel", "id": 1}
+    <- {"progress": 1, "path": "...", "written": ..., "total": ...}
+    <- {"id": 1, "ok": true, "path": "...", "info": {"duration": ..., ...}}
+    <- {"id": 1, "ok": false, "error": "...", "cancelled": false}
+"""
+
+import json
+import queue
+import sys
+import threading
+
+
+# Stream details reported back with every finished download
+INFO_FIELDS = ("duration", "acodec", "vcodec", "asr", "width", "height")
+
+# Bytes written between progress messages
+PROGRESS_STEP = 256 * 1024
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _StderrLogger:
+    def debug(self, msg: str) -> None:
+        pass
+
+    def info(self, msg: str) -> None:
+        pass
+
+    def warning(self, msg: str) -> None:
+        print(msg, file=sys.stderr)
+
+    def error(self, msg: str) -> None:
+        print(msg, file=sys.stderr)
+
+
+def _read_stdin(jobs: "queue.Queue[dict]", cancel: threading.Event, current: list):
+    for line in sys.stdin:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            continue
+        if message.get("op") == "cancel":
+            if current and current[0] == message.get("id"):
+                cancel.set()
+        else:
+            jobs.put(message)
+    jobs.put({"op": "exit"})
+
+
+def main() -> None:
+    out = sys.stdout
+    # Keep stdout reserved for protocol messages
+    sys.stdout = sys.stderr
+
+    import yt_dlp
+
+    def send(message: dict) -> None:
+        out.write(json.dumps(message) + "\n")
+        out.flush()
+
+    jobs: "queue.Queue[dict]" = queue.Queue()
+    cancel = threading.Event()
+    current: list = []
+    threading.Thread(
+        target=_read_stdin, args=(jobs, cancel, current), daemon=True
+    ).start()
+
+    # Job that asked for progress and the byte count last reported for it
+    watch: dict = {}
+
+    def progress_hook(status: dict) -> None:
+        if cancel.is_set():
+            raise _Cancelled("Download cancelled")
+        if not watch or status.get("status") != "downloading":
+            return
+        # Fragments are not written to the output file in one contiguous run
+        if status.get("fragment_index") is not None:
+            return
+        written = status.get("downloaded_bytes") or 0
+        if written - watch["sent"] < PROGRESS_STEP:
+            return
+        watch["sent"] = written
+        send(
+            {
+                "progress": watch["id"],
+                "path": status.get("filename"),
+                "written": written,
+                "total": status.get("total_bytes") or 0,
+            }
+        )
+
+    # YoutubeDL compiles options such as the format selector and
+    # postprocessors in __init__, so an instance is kept per distinct set of
+    # options; only the output template changes between jobs.
+    instances: dict[str, "yt_dlp.YoutubeDL"] = {}
+    send({"ready": True})
+
+    while True:
+        job = jobs.get()
+        if job.get("op") == "exit":
+            break
+
+        job_id = job.get("id")
+        opts = job.get("opts", {})
+        current[:] = [job_id]
+        cancel.clear()
+        if job.get("progress"):
+            watch.update(id=job_id, sent=0)
+        try:
+            params = {
+                name: value
+                for name, value in opts.items()
+                if name != "outtmpl" and value is not None
+            }
+            key = json.dumps(params, sort_keys=True)
+            ydl = instances.get(key)
+            if ydl is None:
+                ydl = instances[key] = yt_dlp.YoutubeDL(
+                    {
+                        **params,
+                        "quiet": True,
+                        "no_warnings": True,
+                        "noprogress": True,
+                        "logger": _StderrLogger(),
+                        "progress_hooks": [progress_hook],
+                        "postprocessor_hooks": [progress_hook],
+                    }
+                )
+
+            if "outtmpl" in opts:
+                ydl.params["outtmpl"]["default"] = opts["outtmpl"]
+
+            info = ydl.extract_info(job["url"], download=True)
+            downloads = (info or {}).get("requested_downloads") or [{}]
+            path = downloads[0].get("filepath") or ydl.prepare_filename(info)
+            fields = {name: (info or {}).get(name) for name in INFO_FIELDS}
+            send({"id": job_id, "ok": True, "path": path, "info": fields})
+        except _Cancelled as e:
+            send({"id": job_id, "ok": False, "error": str(e), "cancelled": True})
+        except Exception as e:
+            cancelled = cancel.is_set()
+            send({"id": job_id, "ok": False, "error": str(e), "cancelled": cancelled})
+        finally:
+            current.clear()
+            watch.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,21 @@
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
 import asyncio
+import hashlib
+import os
+from functools import lru_cache
 from io import BytesIO
+from pathlib import Path
+from typing import Optional
 
-import httpx
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont, ImageOps
-from aiofiles.os import path as aiopath
+from cachetools import LRUCache
 
+from ._config import config
 from ._dataclass import CachedTrack
+from ._httpx import http_pool
+from ._offload import offload
+from ._singleflight import SingleFlight
 from TgMusic.logger import LOGGER
 
 FONTS = {
@@ -19,6 +27,23 @@ FONTS = {
     "tfont": ImageFont.truetype("TgMusic/modules/utils/font.ttf", 20),
 }
 
+# Loaded once at import, in the bot and in each offload worker
+CONTROLS = Image.open("TgMusic/modules/utils/controls.png").convert("RGBA")
+CONTROLS_BOX = (120, 120, 520, 480)
+
+# Prepared background and rounded cover for one cover URL
+Cover = tuple[Image.Image, Image.Image]
+
+
+@lru_cache(maxsize=8)
+def rounded_mask(size: tuple[int, int], radius: int) -> Image.Image:
+    """
+    Returns a shared rounded-rectangle alpha mask. Callers must not modify it.
+    """
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, *size), radius, fill=255)
+    return mask
+
 
 def resize_youtube_thumbnail(img: Image.Image) -> Image.Image:
     """
@@ -58,6 +83,41 @@ def resize_jiosaavn_thumbnail(img: Image.Image) -> Image.Image:
     return img
 
 
+def _normalize_image_url(url: str) -> str:
+    if url.startswith("https://is1-ssl.mzstatic.com"):
+        return url.replace("500x500bb.jpg", "600x600bb.jpg")
+    return url
+
+
+async def _fetch_image_bytes(url: str) -> bytes | None:
+    if not url:
+        return None
+
+    try:
+        url = _normalize_image_url(url)
+        response = await http_pool.get(url).get(url, timeout=5)
+        response.raise_for_status()
+        return response.content
+    except Exception as e:
+        LOGGER.error("Image loading error: %s", e)
+        return None
+
+
+def load_image(data: bytes, url: str) -> Image.Image:
+    """
+    Decodes image bytes and applies the platform-specific resize for ``url``.
+    """
+    url = _normalize_image_url(url)
+    img = Image.open(BytesIO(data)).convert("RGBA")
+    if url.startswith("https://i.ytimg.com"):
+        img = resize_youtube_thumbnail(img)
+    elif url.startswith("http://c.saavncdn.com") or url.startswith(
+        "https://i1.sndcdn"
+    ):
+        img = resize_jiosaavn_thumbnail(img)
+    return img
+
+
 async def fetch_image(url: str) -> Image.Image | None:
     """
     Fetches an image from the given URL, resizes it if necessary for JioSaavn and
@@ -70,26 +130,15 @@ async def fetch_image(url: str) -> Image.Image | None:
     Returns:
         Image.Image | None: The fetched and possibly resized image, or None if the fetch fails.
     """
-    if not url:
+    data = await _fetch_image_bytes(url)
+    if data is None:
         return None
 
-    async with httpx.AsyncClient() as client:
-        try:
-            if url.startswith("https://is1-ssl.mzstatic.com"):
-                url = url.replace("500x500bb.jpg", "600x600bb.jpg")
-            response = await client.get(url, timeout=5)
-            response.raise_for_status()
-            img = Image.open(BytesIO(response.content)).convert("RGBA")
-            if url.startswith("https://i.ytimg.com"):
-                img = resize_youtube_thumbnail(img)
-            elif url.startswith("http://c.saavncdn.com") or url.startswith(
-                "https://i1.sndcdn"
-            ):
-                img = resize_jiosaavn_thumbnail(img)
-            return img
-        except Exception as e:
-            LOGGER.error("Image loading error: %s", e)
-            return None
+    try:
+        return await offload.run("image", load_image, data, url)
+    except Exception as e:
+        LOGGER.error("Image loading error: %s", e)
+        return None
 
 
 def clean_text(text: str, limit: int = 17) -> str:
@@ -105,19 +154,14 @@ def add_controls(img: Image.Image) -> Image.Image:
     Adds blurred background effect and overlay controls.
     """
     img = img.filter(ImageFilter.GaussianBlur(25))
-    box = (120, 120, 520, 480)
+    box = CONTROLS_BOX
 
     region = img.crop(box)
-    controls = Image.open("TgMusic/modules/utils/controls.png").convert("RGBA")
     dark_region = ImageEnhance.Brightness(region).enhance(0.5)
-
-    mask = Image.new("L", dark_region.size, 0)
-    ImageDraw.Draw(mask).rounded_rectangle(
-        (0, 0, box[2] - box[0], box[3] - box[1]), 40, fill=255
-    )
+    mask = rounded_mask((box[2] - box[0], box[3] - box[1]), 40)
 
     img.paste(dark_region, box, mask)
-    img.paste(controls, (135, 305), controls)
+    img.paste(CONTROLS, (135, 305), CONTROLS)
 
     return img
 
@@ -138,11 +182,8 @@ def make_sq(image: Image.Image, size: int = 125) -> Image.Image:
     )
     resize = crop.resize((size, size), Image.Resampling.LANCZOS)
 
-    mask = Image.new("L", (size, size), 0)
-    ImageDraw.Draw(mask).rounded_rectangle((0, 0, size, size), radius=30, fill=255)
-
     rounded = ImageOps.fit(resize, (size, size))
-    rounded.putalpha(mask)
+    rounded.putalpha(rounded_mask((size, size), 30))
     return rounded
 
 
@@ -161,28 +202,59 @@ def get_duration(duration: int, time: str = "0:24") -> str:
         return "0:00"
 
 
-async def gen_thumb(song: CachedTrack) -> str:
+def encode_image(img: Image.Image) -> bytes:
     """
-    Generates and saves a thumbnail for the song.
+    Encodes an image as a fast, lightly compressed PNG.
     """
-    save_dir = f"database/photos/{song.track_id}.png"
-    if await aiopath.exists(save_dir):
-        return save_dir
+    buffer = BytesIO()
+    img.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
 
-    title, artist = clean_text(song.name), clean_text("Spotify")
-    duration = song.duration or 0
 
-    thumb = await fetch_image(song.thumbnail)
-    if not thumb:
-        return ""
+def prepare_cover(data: bytes, url: str) -> tuple[bytes, bytes]:
+    """
+    Decodes a cover and builds the parts of the card that only depend on it.
+
+    Runs in the CPU offload pool, so the results are sent back as PNG bytes
+    rather than pickled images.
+
+    Returns:
+        tuple[bytes, bytes]: The blurred background with controls and the
+        rounded cover.
+    """
+    thumb = load_image(data, url)
+    return encode_image(add_controls(thumb)), encode_image(make_sq(thumb))
 
-    # Process Image
-    bg = add_controls(thumb)
-    image = make_sq(thumb)
+
+def decode_cover(background: bytes, cover: bytes) -> Cover:
+    """
+    Loads the images returned by ``prepare_cover``.
+    """
+    images = (Image.open(BytesIO(background)), Image.open(BytesIO(cover)))
+    for img in images:
+        img.load()
+    return images
+
+
+def compose_card(
+    background: Image.Image,
+    cover: Image.Image,
+    title: str,
+    artist: str,
+    duration: int,
+    save_path: str,
+) -> None:
+    """
+    Draws the track details on a prepared cover and saves the card.
+
+    Runs on an offload thread: the work is a paste and a few text draws, far
+    cheaper than pickling both images into a worker process.
+    """
+    bg = background.copy()
 
     # Positions
     paste_x, paste_y = 145, 155
-    bg.paste(image, (paste_x, paste_y), image)
+    bg.paste(cover, (paste_x, paste_y), cover)
 
     draw = ImageDraw.Draw(bg)
     draw.text((285, 180), "Fallen Beatz", (192, 192, 192), font=FONTS["nfont"])
@@ -190,5 +262,129 @@ async def gen_thumb(song: CachedTrack) -> str:
     draw.text((287, 235), artist, (255, 255, 255), font=FONTS["cfont"])
     draw.text((478, 321), get_duration(duration), (192, 192, 192), font=FONTS["dfont"])
 
-    await asyncio.to_thread(bg.save, save_dir)
-    return save_dir if await aiopath.exists(save_dir) else ""
+    bg.save(save_path, format="PNG")
+
+
+class ThumbnailEngine:
+    """Render now-playing cards with as little repeated work as possible.
+
+    Decoded covers and their blurred backgrounds are kept in an in-memory
+    LRU keyed by cover URL, so a cover shared by several tracks or replayed
+    in another chat is only fetched and blurred once. Finished cards are
+    stored in a size-bounded directory that survives restarts; the least
+    recently used cards are removed when it grows past its budget.
+    """
+
+    def __init__(self, root: Path, max_mb: int, covers: int) -> None:
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self._covers: LRUCache[str, Cover] = LRUCache(maxsize=max(covers, 1))
+        self._flight: SingleFlight[Optional[Cover]] = SingleFlight()
+        self._renders: SingleFlight[str] = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def card_path(self, song: CachedTrack, title: str, artist: str) -> Path:
+        key = "|".join(
+            (song.track_id, song.thumbnail, title, artist, str(song.duration or 0))
+        )
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()[:24]}.png"
+
+    async def _load_cover(self, url: str) -> Optional[Cover]:
+        data = await _fetch_image_bytes(url)
+        if not data:
+            return None
+        encoded = await offload.run("cover", prepare_cover, data, url)
+        cover = await offload.run("cover", decode_cover, *encoded, process=False)
+        self._covers[url] = cover
+        return cover
+
+    async def cover(self, url: str) -> Optional[Cover]:
+        """Return the prepared cover for ``url``, fetching it at most once."""
+        if (cached := self._covers.get(url)) is not None:
+            return cached
+        return await self._flight.do(url, lambda: self._load_cover(url))
+
+    async def render(self, song: CachedTrack) -> str:
+        """Return the path of the card for ``song``, rendering it if needed.
+
+        Returns:
+            str: Path to the PNG card, or an empty string on failure.
+        """
+        title, artist = clean_text(song.name), clean_text("Spotify")
+        path = self.card_path(song, title, artist)
+        try:
+            # Touch the card so budget eviction treats it as recently used
+            await asyncio.to_thread(os.utime, path)
+            self.hits += 1
+            return str(path)
+        except FileNotFoundError:
+            self.misses += 1
+
+        return await self._renders.do(
+            path, lambda: self._render(song, title, artist, path)
+        )
+
+    async def _render(
+        self, song: CachedTrack, title: str, artist: str, path: Path
+    ) -> str:
+        try:
+            cover = await self.cover(song.thumbnail)
+            if cover is None:
+                return ""
+            temp_path = path.with_suffix(".tmp")
+            await offload.run(
+                "thumbnail",
+                compose_card,
+                *cover,
+                title,
+                artist,
+                song.duration or 0,
+                str(temp_path),
+                process=False,
+            )
+            os.replace(temp_path, path)
+        except Exception as e:
+            LOGGER.error("Thumbnail rendering error: %s", e)
+            return ""
+
+        await asyncio.to_thread(self._enforce_budget)
+        return str(path)
+
+    def _enforce_budget(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            cards = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in os.scandir(self.root)
+                if entry.name.endswith(".png")
+            ]
+        except OSError as e:
+            LOGGER.warning("Could not scan thumbnail cache: %s", e)
+            return
+
+        total = sum(size for _, size, _ in cards)
+        for _, size, card in sorted(cards):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(card)
+                total -= size
+            except OSError as e:
+                LOGGER.warning("Could not remove thumbnail %s: %s", card, e)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "covers": len(self._covers)}
+
+
+thumb_engine: ThumbnailEngine = ThumbnailEngine(
+    config.THUMB_CACHE_DIR, config.THUMB_CACHE_MAX_MB, config.THUMB_COVER_CACHE_SIZE
+)
+
+
+async def gen_thumb(song: CachedTrack) -> str:
+    """
+    Generates and saves a thumbnail for the song.
+    """
+    return await thumb_engine.render(song)
@@ -24,7 +24,7 @@ async def clear_queue(c: Client, msg: types.Message) -> None:
         await msg.reply_text("ℹ️ No active playback session found.")
         return None
 
-    if not chat_cache.get_queue(chat_id):
+    if not chat_cache.get_queue_length(chat_id):
         await msg.reply_text("ℹ️ The queue is already empty.")
         return None
 
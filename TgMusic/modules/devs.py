@@ -25,7 +25,21 @@ from pytdbot import __version__ as py_td_ver
 from pytgcalls import __version__ as pytgver
 
 from TgMusic import StartTime
-from TgMusic.core import Filter, chat_cache, config, call, db
+from TgMusic.core import (
+    Filter,
+    assistants,
+    chat_cache,
+    config,
+    call,
+    db,
+    download_flight,
+    file_ids,
+    invalidator,
+    offload,
+    queue_store,
+    search_cache,
+)
+from TgMusic.core.thumbnails import thumb_engine
 from TgMusic.modules.utils.play_helpers import del_msg, extract_argument
 
 
@@ -224,6 +238,20 @@ async def sys_stats(client: Client, message: types.Message) -> None:
     # Database Statistics
     chats = len(await db.get_all_chats())
     users = len(await db.get_all_users())
+    downloads = download_flight.stats()
+    searches = search_cache.stats()
+    thumbs = thumb_engine.stats()
+    uploads = file_ids.stats()
+    snapshots = queue_store.stats()
+    new_chats, new_users = db.new_chats.stats(), db.new_users.stats()
+    chat_docs = db.chat_cache.stats()
+    sync = invalidator.stats()
+    offload_lines = "\n".join(
+        f"  • <b>{name.title()}:</b> <code>{s.completed:,} done, {s.failed:,} failed, "
+        f"{s.in_flight} running, avg {s.run_time / max(s.completed + s.failed, 1):.2f}s, "
+        f"max {s.max_run_time:.2f}s</code>"
+        for name, s in offload.stats().items()
+    ) or "  • <code>Idle</code>"
 
     def format_bytes(size):
         for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
@@ -242,6 +270,35 @@ async def sys_stats(client: Client, message: types.Message) -> None:
 <b>💬 Database Stats:</b>
   • <b>Chats:</b> <code>{chats:,}</code>
   • <b>Users:</b> <code>{users:,}</code>
+  • <b>Registered This Run:</b> <code>{new_chats['added'] + new_users['added']:,} in {new_chats['writes'] + new_users['writes']:,} writes</code>
+  • <b>Repeat Writes Skipped:</b> <code>{new_chats['skipped'] + new_users['skipped']:,}</code>
+  • <b>Chat Settings Cache:</b> <code>{chat_docs['hits']:,} hits, {chat_docs['misses']:,} misses, {chat_docs['stale']:,} stale, {chat_docs['errors']:,} errors</code>
+  • <b>Cross-Instance Sync:</b> <code>{sync['mode']}, {sync['events']:,} updates, {sync['reconnects']:,} reconnects</code>
+
+<b>📥 Downloads:</b>
+  • <b>Started:</b> <code>{downloads['started']:,}</code>
+  • <b>Coalesced:</b> <code>{downloads['coalesced']:,}</code>
+  • <b>In Progress:</b> <code>{downloads['in_flight']:,}</code>
+
+<b>🔎 Search Cache:</b>
+  • <b>Hits:</b> <code>{searches['hits']:,}</code>
+  • <b>Misses:</b> <code>{searches['misses']:,}</code>
+  • <b>Coalesced:</b> <code>{searches['coalesced']:,}</code>
+
+<b>🖼 Thumbnails:</b>
+  • <b>Cards Reused:</b> <code>{thumbs['hits']:,}</code>
+  • <b>Cards Rendered:</b> <code>{thumbs['misses']:,}</code>
+  • <b>Covers In Memory:</b> <code>{thumbs['covers']:,}</code>
+  • <b>Uploads Reused:</b> <code>{uploads['hits']:,}</code>
+  • <b>Uploaded:</b> <code>{uploads['uploads']:,}</code>
+
+<b>💾 Queue Snapshots:</b>
+  • <b>Writes:</b> <code>{snapshots['writes']:,}</code>
+  • <b>Pending Chats:</b> <code>{snapshots['pending']:,}</code>
+  • <b>Resumed After Restart:</b> <code>{snapshots['restored']:,}</code>
+
+<b>🧵 CPU Offload:</b>
+{offload_lines}
 
 <b>📦 Software Versions:</b>
   • <b>Python:</b> <code>{pyver.split()[0]}</code>
@@ -292,9 +349,22 @@ async def active_vc(c: Client, message: types.Message) -> None:
         await del_msg(message)
         return None
 
+    load_text = "⚖️ <b>Assistant Load</b> (calls · cpu · ping · errors → score):\n"
+    for load in assistants.loads(call.available_clients):
+        load_text += (
+            f"{'➤' if load.healthy else '⛔'} <code>{load.name}</code>: "
+            f"{load.calls} · {load.cpu:.1f}% · {load.ping:.0f}ms · "
+            f"{load.errors:.1f} → <b>{load.score:.2f}</b>\n"
+        )
+    load_text += (
+        f"Picks: <code>{assistants.picks:,}</code> · "
+        f"Rebalanced: <code>{assistants.rebalanced:,}</code> · "
+        f"Failed over: <code>{assistants.migrated:,}</code>\n"
+    )
+
     active_chats = chat_cache.get_active_chats()
     if not active_chats:
-        reply = await message.reply_text("No active voice chats.")
+        reply = await message.reply_text(f"No active voice chats.\n\n{load_text}")
         if isinstance(reply, types.Error):
             c.logger.warning(reply.message)
 
@@ -311,12 +381,14 @@ async def active_vc(c: Client, message: types.Message) -> None:
 
         text += (
             f"➤ <b>Chat ID:</b> <code>{chat_id}</code>\n"
+            f"🤖 <b>Assistant:</b> <code>{assistants.assistant_of(chat_id) or 'unknown'}</code>\n"
             f"📌 <b>Queue Size:</b> {queue_length}\n"
             f"{song_info}\n\n"
         )
 
+    text += load_text
     if len(text) > 4096:
-        text = f"🎵 <b>Active Voice Chats</b> ({len(active_chats)})"
+        text = f"🎵 <b>Active Voice Chats</b> ({len(active_chats)})\n\n{load_text}"
 
     reply = await message.reply_text(text, disable_web_page_preview=True)
     if isinstance(reply, types.Error):
@@ -5,7 +5,7 @@ import asyncio
 import time
 from datetime import datetime, timedelta
 from pytdbot import Client, types
-from TgMusic.core import chat_cache, call, db, config
+from TgMusic.core import chat_cache, call, db, config, assistants
 from pyrogram import errors
 from pyrogram.client import Client as PyroClient
 
@@ -95,6 +95,7 @@ class InactiveCallManager:
             self.bot.logger.debug(f"[{ub.name}] Left chat {chat_id}")
             return True
         except errors.FloodWait as e:
+            assistants.record_error(ub.name, flood=True)
             wait_time = e.value
             if wait_time <= 100:
                 self.bot.logger.warning(f"[{ub.name}] FloodWait {wait_time}s for chat {chat_id}")
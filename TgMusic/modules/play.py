@@ -3,15 +3,20 @@
 #  Part of the TgMusicBot project. All rights reserved where applicable.
 
 import re
+from typing import Optional
 
 from pytdbot import Client, types
 
-from TgMusic.core import YouTubeData, DownloaderWrapper, db, call, tg
+from TgMusic.core import YouTubeData, DownloaderWrapper, db, call, tg, config
 from TgMusic.core import (
     CachedTrack,
+    ChatSettings,
     MusicTrack,
     PlatformTracks,
     chat_cache,
+    file_ids,
+    prefetcher,
+    progressive,
 )
 from TgMusic.logger import LOGGER
 from TgMusic.core import (
@@ -91,14 +96,14 @@ async def _update_msg_with_thumb(
     if isinstance(parsed_text, types.Error):
         return await edit_text(msg, text=parsed_text.message, reply_markup=button)
 
-    input_content = types.InputMessagePhoto(
-        types.InputFileLocal(thumb), caption=parsed_text
-    )
-    edit_result = await c.editMessageMedia(
-        chat_id=msg.chat_id,
-        message_id=msg.id,
-        input_message_content=input_content,
-        reply_markup=button,
+    edit_result = await file_ids.send(
+        thumb,
+        lambda photo: c.editMessageMedia(
+            chat_id=msg.chat_id,
+            message_id=msg.id,
+            input_message_content=types.InputMessagePhoto(photo, caption=parsed_text),
+            reply_markup=button,
+        ),
     )
 
     return edit_result
@@ -111,24 +116,24 @@ async def _handle_single_track(
     user_by: str,
     file_path: str = None,
     is_video: bool = False,
+    settings: Optional[ChatSettings] = None,
 ):
     chat_id = msg.chat_id
-    song = CachedTrack(
-        name=track.name,
-        track_id=track.id,
-        loop=0,
-        duration=track.duration,
-        file_path=file_path or "",
-        thumbnail=track.cover,
-        user=user_by,
-        platform=track.platform,
-        is_video=is_video,
-        url=track.url,
+    settings = settings or await db.get_chat_settings(chat_id)
+    song = CachedTrack.from_track(
+        track, user_by, is_video=is_video, file_path=file_path or ""
     )
 
-    # Download track if not already cached
-    if not song.file_path:
-        download_result = await call.song_download(song)
+    is_active = chat_cache.is_active(chat_id)
+
+    # Queued tracks are downloaded in the background by the prefetcher, so
+    # they are only resolved here; the track that starts now is fetched inline.
+    if not song.file_path and is_active:
+        resolved = await call.validate_track(song)
+        if isinstance(resolved, types.Error):
+            return await edit_text(msg, f"❌ Cannot queue track: {resolved.message}")
+    elif not song.file_path:
+        download_result = await call.fetch_for_playback(song)
         if isinstance(download_result, types.Error):
             return await edit_text(
                 msg, f"❌ Download failed: {download_result.message}"
@@ -139,28 +144,34 @@ async def _handle_single_track(
             return await edit_text(msg, "❌ Failed to download track")
 
     # Get duration if not provided
-    song.duration = song.duration or await get_audio_duration(song.file_path)
-
-    if chat_cache.is_active(chat_id):
+    if (
+        not song.duration
+        and song.file_path
+        and not progressive.is_stream(song.file_path)
+    ):
+        song.duration = await get_audio_duration(song.file_path)
+
+    if is_active:
         # Add to queue if playback is active
-        queue = chat_cache.get_queue(chat_id)
+        position = chat_cache.get_queue_length(chat_id)
         chat_cache.add_song(chat_id, song)
+        prefetcher.schedule(chat_id)
 
         media_type = "🎬 Video" if is_video else "🎧 Track"
         queue_info = (
-            f"<b>{media_type} Added to Queue (#{len(queue)})</b>\n\n"
+            f"<b>{media_type} Added to Queue (#{position})</b>\n\n"
             f"▫ <b>Title:</b> <a href='{song.url}'>{song.name}</a>\n"
             f"▫ <b>Duration:</b> {sec_to_min(song.duration)}\n"
             f"▫ <b>Requested by:</b> {song.user}"
         )
 
-        thumb = await gen_thumb(song) if await db.get_thumbnail_status(chat_id) else ""
+        thumb = await gen_thumb(song) if settings.thumbnail else ""
         return await _update_msg_with_thumb(
             c,
             msg,
             queue_info,
             thumb,
-            control_buttons("play") if await db.get_buttons_status(chat_id) else None,
+            control_buttons("play") if settings.buttons else None,
         )
 
     # Start new playback session
@@ -172,7 +183,7 @@ async def _handle_single_track(
         return await edit_text(msg, text=f"⚠️ Playback error: {play_result.message}")
 
     # Prepare now playing message
-    thumb = await gen_thumb(song) if await db.get_thumbnail_status(chat_id) else ""
+    thumb = await gen_thumb(song) if settings.thumbnail else ""
     media_type = "🎬 Video" if is_video else "🎵 Track"
     now_playing = (
         f"{media_type} <b>Now Playing:</b>\n\n"
@@ -186,7 +197,7 @@ async def _handle_single_track(
         msg,
         now_playing,
         thumb,
-        control_buttons("play") if await db.get_buttons_status(chat_id) else None,
+        control_buttons("play") if settings.buttons else None,
     )
 
     if isinstance(update_result, types.Error):
@@ -200,27 +211,34 @@ async def _handle_multiple_tracks(
     """Process and queue multiple tracks (simple handling)."""
     chat_id = msg.chat_id
     is_active = chat_cache.is_active(chat_id)
-    queue = chat_cache.get_queue(chat_id)
+    queue_length = chat_cache.get_queue_length(chat_id)
+
+    # Only queue as many tracks as the configured cap leaves room for
+    skipped = 0
+    if config.QUEUE_LIMIT > 0:
+        room = max(config.QUEUE_LIMIT - queue_length, 0)
+        skipped = max(len(tracks) - room, 0)
+        tracks = tracks[:room]
+    if not tracks:
+        return await edit_text(
+            msg,
+            f"⚠️ Queue limit reached ({config.QUEUE_LIMIT} tracks max). "
+            "Use /end to clear queue.",
+        )
 
     media_type = "🎬 Videos" if is_video else "🎧 Tracks"
     queue_header = f"<b>📥 Added {media_type} to Queue:</b>\n<blockquote expandable>\n"
     queue_items = []
 
     for index, track in enumerate(tracks):
-        position = len(queue) + index
+        position = queue_length + index
         chat_cache.add_song(
             chat_id,
-            CachedTrack(
-                name=track.name,
-                track_id=track.id,
-                loop=1 if not is_active and index == 0 else 0,
-                duration=track.duration,
-                thumbnail=track.cover,
-                user=user_by,
-                file_path="",
-                platform=track.platform,
+            CachedTrack.from_track(
+                track,
+                user_by,
                 is_video=is_video,
-                url=track.url,
+                loop=1 if not is_active and index == 0 else 0,
             ),
         )
         queue_items.append(
@@ -229,10 +247,12 @@ async def _handle_multiple_tracks(
 
     queue_summary = (
         f"</blockquote>\n"
-        f"<b>📋 Total in Queue:</b> {len(chat_cache.get_queue(chat_id))}\n"
+        f"<b>📋 Total in Queue:</b> {chat_cache.get_queue_length(chat_id)}\n"
         f"<b>⏱ Total Duration:</b> {sec_to_min(sum(t.duration for t in tracks))}\n"
         f"<b>👤 Requested by:</b> {user_by}"
     )
+    if skipped:
+        queue_summary += f"\n<b>⚠️ Skipped:</b> {skipped} (queue limit reached)"
 
     full_message = queue_header + "\n".join(queue_items) + queue_summary
 
@@ -240,7 +260,9 @@ async def _handle_multiple_tracks(
     if len(full_message) > 4096:
         full_message = queue_summary
 
-    if not is_active:
+    if is_active:
+        prefetcher.schedule(chat_id)
+    else:
         await call.play_next(chat_id)
 
     await edit_text(msg, full_message, reply_markup=control_buttons("play"))
@@ -253,6 +275,7 @@ async def play_music(
     user_by: str,
     tg_file_path: str = None,
     is_video: bool = False,
+    settings: Optional[ChatSettings] = None,
 ):
     """Main music playback handler for both single tracks and playlists."""
     if not url_data or not url_data.tracks:
@@ -262,13 +285,17 @@ async def play_music(
 
     if len(url_data.tracks) == 1:
         return await _handle_single_track(
-            c, msg, url_data.tracks[0], user_by, tg_file_path, is_video
+            c, msg, url_data.tracks[0], user_by, tg_file_path, is_video, settings
         )
     return await _handle_multiple_tracks(msg, url_data.tracks, user_by, is_video)
 
 
 async def _handle_telegram_file(
-    c: Client, reply: types.Message, reply_message: types.Message, user_by: str
+    c: Client,
+    reply: types.Message,
+    reply_message: types.Message,
+    user_by: str,
+    settings: Optional[ChatSettings] = None,
 ):
     """Process Telegram audio/video file attachments."""
     content = reply.content
@@ -289,7 +316,11 @@ async def _handle_telegram_file(
             ),
         )
 
-    duration = await get_audio_duration(file_path.path)
+    # Audio and video messages already carry their duration
+    media = getattr(content, "audio", None) or getattr(content, "video", None)
+    duration = getattr(media, "duration", 0) or await get_audio_duration(
+        file_path.path
+    )
     track_data = PlatformTracks(
         tracks=[
             MusicTrack(
@@ -303,7 +334,9 @@ async def _handle_telegram_file(
         ]
     )
 
-    await play_music(c, reply_message, track_data, user_by, file_path.path, is_video)
+    await play_music(
+        c, reply_message, track_data, user_by, file_path.path, is_video, settings
+    )
     return None
 
 
@@ -312,10 +345,10 @@ async def _handle_text_search(
     msg: types.Message,
     wrapper: DownloaderWrapper,
     user_by: str,
+    settings: Optional[ChatSettings] = None,
 ):
     """Handle text-based music searches."""
-    chat_id = msg.chat_id
-    play_type = await db.get_play_type(chat_id)
+    settings = settings or await db.get_chat_settings(msg.chat_id)
 
     search_result = await wrapper.search()
     if isinstance(search_result, types.Error):
@@ -333,7 +366,7 @@ async def _handle_text_search(
         )
 
     # Direct play if configured
-    if play_type == 0:
+    if settings.play_type == 0:
         track_url = search_result.tracks[0].url
         track_info = await DownloaderWrapper(track_url).get_info()
         if isinstance(track_info, types.Error):
@@ -342,7 +375,7 @@ async def _handle_text_search(
                 text=f"⚠️ Track info error: {track_info.message}",
                 reply_markup=SupportButton,
             )
-        return await play_music(c, msg, track_info, user_by)
+        return await play_music(c, msg, track_info, user_by, settings=settings)
 
     # Show selection menu
     selection_text, selection_keyboard = build_song_selection_message(
@@ -365,12 +398,15 @@ async def handle_play_command(c: Client, msg: types.Message, is_video: bool = Fa
         return await msg.reply_text("❌ This command only works in groups/channels.")
 
     # Check queue limit
-    queue = chat_cache.get_queue(chat_id)
-    if len(queue) > 10:
+    if 0 < config.QUEUE_LIMIT <= chat_cache.get_queue_length(chat_id):
         return await msg.reply_text(
-            "⚠️ Queue limit reached (10 tracks max). Use /end to clear queue."
+            f"⚠️ Queue limit reached ({config.QUEUE_LIMIT} tracks max). "
+            "Use /end to clear queue."
         )
 
+    # Loaded once and passed down instead of per-setting lookups
+    settings = await db.get_chat_settings(chat_id)
+
     # Verify bot admin status
     await load_admin_cache(c, chat_id)
     if not await is_admin(chat_id, c.me.id):
@@ -424,7 +460,7 @@ async def handle_play_command(c: Client, msg: types.Message, is_video: bool = Fa
         # Check if it's a video message and use enhanced video handler
         if is_video or VideoHandler.is_video_message(reply):
             return await handle_video_reply(c, reply, status_msg, requester)
-        return await _handle_telegram_file(c, reply, status_msg, requester)
+        return await _handle_telegram_file(c, reply, status_msg, requester, settings)
 
     # Handle URL playback
     if url:
@@ -447,11 +483,13 @@ async def handle_play_command(c: Client, msg: types.Message, is_video: bool = Fa
                 reply_markup=SupportButton,
             )
 
-        return await play_music(c, status_msg, track_info, requester, is_video=is_video)
+        return await play_music(
+            c, status_msg, track_info, requester, is_video=is_video, settings=settings
+        )
 
     # Handle text search for audio only
     if not is_video:
-        return await _handle_text_search(c, status_msg, wrapper, requester)
+        return await _handle_text_search(c, status_msg, wrapper, requester, settings)
 
     # Handle video search
     search_result = await wrapper.search()
@@ -478,7 +516,9 @@ async def handle_play_command(c: Client, msg: types.Message, is_video: bool = Fa
             reply_markup=SupportButton,
         )
 
-    return await play_music(c, status_msg, video_info, requester, is_video=True)
+    return await play_music(
+        c, status_msg, video_info, requester, is_video=True, settings=settings
+    )
 
 
 @Client.on_message(filters=Filter.command("play"), position=-5)
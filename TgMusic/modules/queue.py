@@ -4,7 +4,7 @@
 
 from pytdbot import Client, types
 
-from TgMusic.core import Filter, chat_cache, call
+from TgMusic.core import Filter, chat_cache, call, media_probe, progressive
 from TgMusic.modules.utils import sec_to_min
 
 
@@ -16,6 +16,8 @@ async def queue_info(_: Client, msg: types.Message) -> None:
 
     chat_id = msg.chat_id
     _queue = chat_cache.get_queue(chat_id)
+    total = len(_queue)
+    _queue = _queue[:11]
 
     if not _queue:
         await msg.reply_text("📭 The queue is currently empty.")
@@ -32,6 +34,19 @@ async def queue_info(_: Client, msg: types.Message) -> None:
         )
         return
 
+    # Fill in unknown durations of downloaded entries with one batch probe
+    missing = [
+        song
+        for song in _queue
+        if not song.duration
+        and song.file_path
+        and not progressive.is_stream(song.file_path)
+    ]
+    if missing:
+        infos = await media_probe.probe_many(song.file_path for song in missing)
+        for song, info in zip(missing, infos):
+            song.duration = info.duration
+
     current_song = _queue[0]
     text = [
         f"<b>🎧 Queue for {chat.title}</b>",
@@ -44,16 +59,16 @@ async def queue_info(_: Client, msg: types.Message) -> None:
         f"└ <b>Progress:</b> {sec_to_min(await call.played_time(chat.id))} min",
     ]
 
-    if len(_queue) > 1:
-        text.extend(["", f"<b>⏭ Next Up ({len(_queue) - 1}):</b>"])
+    if total > 1:
+        text.extend(["", f"<b>⏭ Next Up ({total - 1}):</b>"])
         text.extend(
             f"{i}. <code>{song.name[:45]}</code> | {sec_to_min(song.duration)} min"
             for i, song in enumerate(_queue[1:11], 1)
         )
-        if len(_queue) > 11:
-            text.append(f"...and {len(_queue) - 11} more")
+        if total > 11:
+            text.append(f"...and {total - 11} more")
 
-    text.append(f"\n<b>📊 Total:</b> {len(_queue)} track(s) in queue")
+    text.append(f"\n<b>📊 Total:</b> {total} track(s) in queue")
 
     # Handle message length limit
     formatted_text = "\n".join(text)
@@ -66,7 +81,7 @@ async def queue_info(_: Client, msg: types.Message) -> None:
                 f"├ <code>{current_song.name[:45]}</code>",
                 f"└ {sec_to_min(await call.played_time(chat.id))}/{sec_to_min(current_song.duration)} min",
                 "",
-                f"<b>📊 Total:</b> {len(_queue)} track(s) in queue",
+                f"<b>📊 Total:</b> {total} track(s) in queue",
             ]
         )
 
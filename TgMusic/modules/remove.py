@@ -39,19 +39,23 @@ async def remove_song(c: Client, msg: types.Message) -> None:
         await msg.reply_text("⚠️ Please enter a valid track number.")
         return None
 
-    _queue = chat_cache.get_queue(chat_id)
+    # Track numbers match /queue: 1 is the next track, the playing one is 0
+    upcoming = chat_cache.get_queue_length(chat_id) - 1
 
-    if not _queue:
+    if upcoming <= 0:
         await msg.reply_text("📭 The queue is currently empty.")
         return None
 
-    if track_num <= 0 or track_num > len(_queue):
+    if track_num <= 0 or track_num > upcoming:
         await msg.reply_text(
-            f"⚠️ Invalid track number. Please choose between 1 and {len(_queue)}."
+            f"⚠️ Invalid track number. Please choose between 1 and {upcoming}."
         )
         return None
 
     removed_track = chat_cache.remove_track(chat_id, track_num)
+    if removed_track is None:
+        await msg.reply_text("⚠️ That track is no longer in the queue.")
+        return None
     reply = await msg.reply_text(
         f"✅ Track <b>{removed_track.name[:45]}</b> removed by {await msg.mention()}"
     )
@@ -7,6 +7,7 @@ from pytdbot import Client, types
 from TgMusic import __version__
 from TgMusic.core import (
     config,
+    file_ids,
     Filter,
     SupportButton,
 )
@@ -52,10 +53,13 @@ async def start_cmd(c: Client, message: types.Message):
 
     else:  # Private chat
         bot_username = c.me.usernames.editable_username
-        reply = await message.reply_photo(
-            photo=config.START_IMG,
-            caption=startText.format(mention, bot_name),
-            reply_markup=add_me_markup(bot_username),
+        reply = await file_ids.send(
+            config.START_IMG,
+            lambda photo: message.reply_photo(
+                photo=photo,
+                caption=startText.format(mention, bot_name),
+                reply_markup=add_me_markup(bot_username),
+            ),
         )
 
     if isinstance(reply, types.Error):
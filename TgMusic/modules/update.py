@@ -11,7 +11,7 @@ from os import execvp
 
 from pytdbot import Client, types
 
-from TgMusic.core import chat_cache, call, Filter, config
+from TgMusic.core import chat_cache, call, Filter, config, queue_store
 from TgMusic.logger import LOGGER
 from TgMusic.modules.utils.play_helpers import del_msg
 
@@ -100,6 +100,13 @@ async def update(c: Client, message: types.Message) -> None:
             await msg.edit_text(f"⚠️ Update error: {e}")
             return
 
+    # Save queues before ending calls so playback resumes after the restart
+    await queue_store.close()
+    resume_note = (
+        "Your queue has been saved and playback will resume automatically in a minute."
+        if queue_store.enabled
+        else "Your music playback has been stopped temporarily. Please start again after a minute."
+    )
     if active_vc := chat_cache.get_active_chats():
         for chat_id in active_vc:
             await call.end(chat_id)
@@ -107,7 +114,7 @@ async def update(c: Client, message: types.Message) -> None:
                 chat_id,
                 "🔧 <b>Bot Maintenance</b>\n\n"
                 "The bot is being updated/restarted to bring you new features and improvements.\n"
-                "Your music playback has been stopped temporarily. Please start again after a minute.\n\n"
+                f"{resume_note}\n\n"
                 "Thank you for your patience!",
                 parse_mode="html",
             )
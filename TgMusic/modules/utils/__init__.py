@@ -7,10 +7,8 @@ __all__ = [
     "get_audio_duration",
 ]
 
-import asyncio
-import json
-
 from ...logger import LOGGER
+from ...core._probe import media_probe
 
 
 def sec_to_min(seconds):
@@ -27,23 +25,10 @@ def sec_to_min(seconds):
 
 
 async def get_audio_duration(file_path):
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_format",
-            "-show_streams",
-            file_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, _ = await proc.communicate()
-        data = json.loads(stdout)
-        duration = float(data["format"]["duration"])
-        return int(duration)
-    except Exception as e:
-        LOGGER.warning("Failed to get audio duration using ffprobe: %s", e)
-        return 0
+    """
+    Return the duration of a media file in seconds, or 0 if it is unknown.
+
+    Uses info captured at download time when available and probes each file
+    version at most once otherwise.
+    """
+    return await media_probe.duration(file_path)
@@ -15,6 +15,7 @@ from TgMusic.core import (
     db,
     SupportButton,
     config,
+    file_ids,
 )
 from TgMusic.logger import LOGGER
 from TgMusic.core.admins import load_admin_cache
@@ -225,11 +226,11 @@ async def new_message(client: Client, update: types.UpdateNewMessage) -> None:
     chat_id = message.chat_id
     content = message.content
 
-    # Run DB operation in the background
+    # Only queues new IDs; they are written in batches
     if chat_id < 0:
-        client.loop.create_task(db.add_chat(chat_id))
+        await db.add_chat(chat_id)
     else:
-        client.loop.create_task(db.add_user(chat_id))
+        await db.add_user(chat_id)
 
     # Handle video chat events
     if isinstance(content, types.MessageVideoChatEnded):
@@ -247,3 +248,17 @@ async def new_message(client: Client, update: types.UpdateNewMessage) -> None:
         return
 
     LOGGER.debug("New message in %s: %s", chat_id, message)
+
+
+@Client.on_updateMessageSendSucceeded()
+async def message_send_succeeded(
+    _: Client, update: types.UpdateMessageSendSucceeded
+) -> None:
+    """Record file IDs of photos whose upload has just finished."""
+    file_ids.on_send_succeeded(update)
+
+
+@Client.on_updateMessageSendFailed()
+async def message_send_failed(_: Client, update: types.UpdateMessageSendFailed) -> None:
+    """Drop cached file IDs that Telegram refused to send."""
+    file_ids.on_send_failed(update)
@@ -0,0 +1,115 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+"""Compare construction time and memory of queue entry types.
+
+Usage: python benchmarks/queue_entries.py [count]
+
+Each variant is built in a fresh subprocess so the RSS growth reported
+for it is not skewed by memory freed from earlier variants.
+"""
+
+import importlib.util
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+DATACLASS_FILE = Path(__file__).parents[1] / "TgMusic" / "core" / "_dataclass.py"
+VARIANTS = ("dataclass", "from_track", "pydantic", "model_construct")
+
+
+def _load():
+    # Load the module by path: importing the TgMusic package starts the bot config
+    spec = importlib.util.spec_from_file_location("_dataclass", DATACLASS_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _fields(i: int) -> dict:
+    return {
+        "url": f"https://youtu.be/{i:011d}",
+        "name": f"Track {i}",
+        "loop": 0,
+        "user": "<a href='tg://user?id=1'>user</a>",
+        "file_path": "",
+        "thumbnail": f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg",
+        "track_id": f"{i:011d}",
+        "duration": 180,
+        "is_video": False,
+        "platform": "youtube",
+    }
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_variant(variant: str, count: int) -> None:
+    module = _load()
+    rows = [_fields(i) for i in range(count)]
+    tracks = [
+        module.MusicTrack(
+            url=row["url"],
+            name=row["name"],
+            id=row["track_id"],
+            cover=row["thumbnail"],
+            duration=row["duration"],
+            platform=row["platform"],
+        )
+        for row in rows
+    ]
+    build = {
+        "dataclass": lambda: [module.CachedTrack(**row) for row in rows],
+        "from_track": lambda: [
+            module.CachedTrack.from_track(track, "user") for track in tracks
+        ],
+        "pydantic": lambda: [module.CachedTrackModel(**row) for row in rows],
+        "model_construct": lambda: [
+            module.CachedTrackModel.model_construct(**row) for row in rows
+        ],
+    }[variant]
+
+    rss_before = _rss_kb()
+    started = time.perf_counter()
+    entries = build()
+    elapsed = time.perf_counter() - started
+    rss_after = _rss_kb()
+
+    # Allocation tracing slows construction down, so it gets its own pass
+    del entries
+    tracemalloc.start()
+    entries = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{variant:<16} {elapsed * 1000:>9.1f} ms "
+        f"{allocated / len(entries):>9.0f} B/entry "
+        f"{(rss_after - rss_before) / 1024:>8.1f} MiB RSS"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 2 and sys.argv[1] == "--variant":
+        run_variant(sys.argv[2], int(sys.argv[3]))
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{count:,} entries")
+    for variant in VARIANTS:
+        subprocess.run(
+            [sys.executable, __file__, "--variant", variant, str(count)], check=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+"""Shared setup for unit tests of ``TgMusic.core`` modules.
+
+Importing the ``TgMusic`` package builds the bot and validates its config,
+which needs a full environment and wipes the ``database`` directory. The
+packages are therefore registered here without running their ``__init__``,
+and the config gets just enough settings to load inside a temp directory.
+"""
+
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TEMP_DIR = Path(tempfile.mkdtemp(prefix="tgmusic-tests-"))
+
+for name, value in {
+    "API_ID": "1",
+    "API_HASH": "test",
+    "BOT_TOKEN": "test",
+    "SESSION_STRING": "test",
+    "DATABASE_URI": "mongodb://localhost:27017",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ.update(
+    IGNORE_BACKGROUND_UPDATES="False",
+    DOWNLOADS_DIR=str(TEMP_DIR / "downloads"),
+    THUMB_CACHE_DIR=str(TEMP_DIR / "thumbs"),
+)
+
+for name, path in (
+    ("TgMusic", ROOT / "TgMusic"),
+    ("TgMusic.core", ROOT / "TgMusic" / "core"),
+):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        sys.modules[name] = package
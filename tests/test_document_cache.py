@@ -0,0 +1,136 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("cachetools")
+pytest.importorskip("dotenv")
+pytest.importorskip("pydantic")
+pytest.importorskip("pymongo")
+
+from TgMusic.core._database import DocumentCache  # noqa: E402
+
+
+class Store:
+    """Fake collection: returns the current document or raises ``error``."""
+
+    def __init__(self) -> None:
+        self.docs: dict[int, dict] = {}
+        self.reads = 0
+        self.error: Exception | None = None
+
+    async def load(self, key: int):
+        self.reads += 1
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        doc = self.docs.get(key)
+        return dict(doc) if doc is not None else None
+
+
+def _cache(store: Store) -> DocumentCache:
+    return DocumentCache(store.load, maxsize=16, ttl=60, negative_ttl=5, max_stale=30)
+
+
+def _age(cache: DocumentCache, key: int, seconds: float) -> None:
+    """Make the cached entry for ``key`` look ``seconds`` old."""
+    cache._entries[key].fetched_at = time.monotonic() - seconds
+
+
+def test_missing_documents_are_cached_for_negative_ttl():
+    async def main():
+        store = Store()
+        cache = _cache(store)
+
+        assert await cache.get(1) is None
+        assert await cache.get(1) is None
+        assert store.reads == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Past the negative TTL a new document shows up after one refresh
+        store.docs[1] = {"_id": 1, "play_mode": "admins"}
+        _age(cache, 1, 6)
+        assert await cache.get(1) is None
+        await asyncio.gather(*cache._refreshes)
+        assert await cache.get(1) == {"_id": 1, "play_mode": "admins"}
+        assert store.reads == 2
+
+    asyncio.run(main())
+
+
+def test_stale_value_is_served_while_refreshing():
+    async def main():
+        store = Store()
+        store.docs[1] = {"_id": 1, "version": 1}
+        cache = _cache(store)
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+
+        store.docs[1] = {"_id": 1, "version": 2}
+        _age(cache, 1, 61)
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+        await asyncio.gather(*cache._refreshes)
+
+        assert await cache.get(1) == {"_id": 1, "version": 2}
+        # Both stale reads shared one background refresh
+        assert store.reads == 2
+        assert cache.stale == 2
+
+    asyncio.run(main())
+
+
+def test_entries_past_max_stale_are_reloaded_inline():
+    async def main():
+        store = Store()
+        store.docs[1] = {"_id": 1, "version": 1}
+        cache = _cache(store)
+        await cache.get(1)
+
+        store.docs[1] = {"_id": 1, "version": 2}
+        _age(cache, 1, 91)
+        assert await cache.get(1) == {"_id": 1, "version": 2}
+        assert cache.stale == 0
+
+    asyncio.run(main())
+
+
+def test_read_errors_fall_back_to_the_last_known_value():
+    async def main():
+        store = Store()
+        store.docs[1] = {"_id": 1, "version": 1}
+        cache = _cache(store)
+        await cache.get(1)
+
+        store.error = RuntimeError("database unavailable")
+        _age(cache, 1, 91)
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+        assert await cache.get(2) is None
+        assert cache.errors == 2
+
+        # A failed background refresh keeps serving the stale value
+        _age(cache, 1, 61)
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+        await asyncio.gather(*cache._refreshes, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cache.errors == 3
+        assert await cache.get(1) == {"_id": 1, "version": 1}
+
+    asyncio.run(main())
+
+
+def test_update_applies_writes_to_cached_documents():
+    async def main():
+        store = Store()
+        cache = _cache(store)
+        await cache.get(1)
+
+        cache.update(1, {"play_mode": "everyone"})
+        assert await cache.get(1) == {"_id": 1, "play_mode": "everyone"}
+        cache.update(2, {"play_mode": "everyone"})
+        assert 2 not in cache._entries
+
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+import re
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("aiofiles")
+pytest.importorskip("dotenv")
+pytest.importorskip("pytdbot")
+
+from TgMusic.core._config import config  # noqa: E402
+from TgMusic.core._httpx import HttpxClient, _PartState  # noqa: E402
+
+URL = "https://cdn.example.com/track.mp3"
+OLD_BODY = bytes(range(256)) * 64
+NEW_BODY = bytes(reversed(range(256))) * 80
+
+
+def test_contiguous_stops_at_first_gap():
+    state = _PartState(url=URL, written=42)
+    assert state.contiguous() == 42
+
+    state.segments = [[0, 99, 100], [100, 199, 50], [200, 299, 100]]
+    assert state.contiguous() == 150
+
+    state.segments = [[0, 99, 100], [100, 199, 100], [200, 299, 100]]
+    assert state.contiguous() == 300
+
+
+def test_if_range_prefers_strong_etag():
+    modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert _PartState(url=URL, etag='"v1"').if_range() == '"v1"'
+    assert (
+        _PartState(url=URL, etag='W/"v1"', last_modified=modified).if_range()
+        == modified
+    )
+    assert _PartState(url=URL).if_range() is None
+
+
+def _server(etag: str, body: bytes, requests: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        headers = {"ETag": etag, "Content-Type": "audio/mpeg"}
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+
+        match = re.match(r"bytes=(\d+)-", request.headers.get("Range", ""))
+        if match and request.headers.get("If-Range") == etag:
+            start = int(match[1])
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return httpx.Response(206, headers=headers, content=body[start:])
+        return httpx.Response(200, headers=headers, content=body)
+
+    return handler
+
+
+def _download(tmp_path, monkeypatch, etag: str, body: bytes):
+    target = tmp_path / "track.mp3"
+    part = target.with_name("track.mp3.part")
+    part.write_bytes(OLD_BODY[:5000])
+    state = _PartState(url=URL, etag='"v1"', size=len(OLD_BODY), written=5000)
+    asyncio.run(state.save(part))
+
+    requests: list[httpx.Request] = []
+    transport = httpx.MockTransport(_server(etag, body, requests))
+    monkeypatch.setattr(config, "DOWNLOAD_SEGMENTS", 1)
+    monkeypatch.setattr(
+        HttpxClient,
+        "_session",
+        lambda self, url: httpx.AsyncClient(transport=transport),
+    )
+
+    result = asyncio.run(HttpxClient().download_file(URL, target))
+    assert result.success, result.error
+    assert not part.exists()
+    assert not _PartState.sidecar(part).exists()
+    return target, [r for r in requests if r.method == "GET"]
+
+
+def test_resume_continues_from_saved_offset(tmp_path, monkeypatch):
+    target, requests = _download(tmp_path, monkeypatch, '"v1"', OLD_BODY)
+
+    assert target.read_bytes() == OLD_BODY
+    assert requests[0].headers["Range"] == "bytes=5000-"
+    assert requests[0].headers["If-Range"] == '"v1"'
+
+
+def test_resume_restarts_when_etag_changed(tmp_path, monkeypatch):
+    target, requests = _download(tmp_path, monkeypatch, '"v2"', NEW_BODY)
+
+    # The server ignored the range because If-Range no longer matched
+    assert requests[0].headers["If-Range"] == '"v1"'
+    assert target.read_bytes() == NEW_BODY
@@ -0,0 +1,99 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("cachetools")
+pytest.importorskip("dotenv")
+pytest.importorskip("pydantic")
+pytest.importorskip("pytdbot")
+
+from TgMusic.core._cacher import chat_cache  # noqa: E402
+from TgMusic.core._dataclass import CachedTrack  # noqa: E402
+from TgMusic.core._media_cache import MediaCache  # noqa: E402
+
+CHAT_ID = -1001
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=0)
+    # Load the empty index first, as song_download's lookup does in the bot
+    assert len(cache) == 0
+    for age, name in enumerate("abc"):
+        key = cache.make_key("youtube", name)
+        source = tmp_path / f"{name}.m4a"
+        source.write_bytes(b"x" * 100)
+        asyncio.run(cache.put(key, source))
+        # "a" is the least recently used, "c" the most
+        cache._entries[key].last_access = 1000 + age
+    yield cache
+    chat_cache.clear_chat(CHAT_ID)
+
+
+def _queue(path) -> None:
+    chat_cache.add_song(
+        CHAT_ID,
+        CachedTrack(
+            url="https://youtu.be/a",
+            name="a",
+            loop=0,
+            user="user",
+            file_path=str(path),
+            thumbnail="",
+            track_id="a",
+            is_video=False,
+            platform="youtube",
+        ),
+    )
+
+
+def _cached(cache: MediaCache) -> set[str]:
+    return {
+        name
+        for name in "abc"
+        if cache.get(cache.make_key("youtube", name)) is not None
+    }
+
+
+def test_least_recently_used_entries_are_evicted_first(cache):
+    cache.max_bytes = 250
+    assert asyncio.run(cache.enforce_budget()) == 100
+    assert _cached(cache) == {"b", "c"}
+
+
+def test_queued_files_are_never_evicted(cache):
+    _queue(cache.get(cache.make_key("youtube", "a")))
+    cache._entries[cache.make_key("youtube", "a")].last_access = 0
+
+    cache.max_bytes = 250
+    assert asyncio.run(cache.enforce_budget()) == 100
+    assert _cached(cache) == {"a", "c"}
+
+    # Nothing else can go, so the pinned file stays even over budget
+    cache.max_bytes = 50
+    asyncio.run(cache.enforce_budget())
+    assert _cached(cache) == {"a"}
+
+
+def test_lfu_evicts_least_hit_entries(cache):
+    cache.policy = "lfu"
+    for _ in range(3):
+        cache.get(cache.make_key("youtube", "a"))
+    cache.get(cache.make_key("youtube", "c"))
+
+    cache.max_bytes = 250
+    asyncio.run(cache.enforce_budget())
+    assert _cached(cache) == {"a", "c"}
+
+
+def test_partial_downloads_count_towards_the_budget(cache, tmp_path):
+    (tmp_path / "d.m4a.part").write_bytes(b"x" * 100)
+    asyncio.run(cache.sweep_temp())
+
+    cache.max_bytes = 300
+    assert asyncio.run(cache.enforce_budget()) == 100
+    assert len(cache) == 2
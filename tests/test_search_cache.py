@@ -0,0 +1,42 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import pytest
+
+pytest.importorskip("cachetools")
+pytest.importorskip("dotenv")
+pytest.importorskip("pydantic")
+pytest.importorskip("pytdbot")
+
+from TgMusic.core._search_cache import SearchCache  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Believer",
+        "  believer ",
+        "BELIEVER!",
+        "believer...",
+    ],
+)
+def test_variants_share_a_key(query):
+    assert SearchCache.normalize(query) == "believer"
+
+
+def test_punctuation_and_spacing_collapse():
+    assert SearchCache.normalize("Imagine  Dragons - Believer") == (
+        "imagine dragons believer"
+    )
+    assert SearchCache.normalize("AC/DC\tThunderstruck") == "ac dc thunderstruck"
+
+
+def test_non_latin_letters_are_kept():
+    assert SearchCache.normalize("Tum Hi Ho — अरिजीत") == "tum hi ho अरिजीत"
+    assert SearchCache.normalize("Straße") == "strasse"
+
+
+def test_punctuation_only_query_normalizes_to_empty():
+    # fetch() falls back to the raw query for these
+    assert SearchCache.normalize("?!") == ""
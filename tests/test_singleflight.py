@@ -0,0 +1,98 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import asyncio
+
+import pytest
+
+from TgMusic.core._singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_result():
+    async def main():
+        flight: SingleFlight[str] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "done"
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == ["done"] * 3
+        assert calls == 1
+        assert flight.stats() == {"started": 1, "coalesced": 2, "in_flight": 0}
+
+    asyncio.run(main())
+
+
+def test_exception_reaches_every_waiter():
+    async def main():
+        flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("boom")
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.in_flight() == 0
+
+    asyncio.run(main())
+
+
+def test_work_is_cancelled_only_when_the_last_waiter_leaves():
+    async def main():
+        flight: SingleFlight[str] = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+        assert flight.in_flight() == 1
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled.is_set()
+        assert flight.in_flight() == 0
+        for task in (first, second):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(main())
+
+
+def test_new_call_after_completion_runs_again():
+    async def main():
+        flight: SingleFlight[int] = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do("key", work) == 1
+        assert await flight.do("key", work) == 2
+
+    asyncio.run(main())
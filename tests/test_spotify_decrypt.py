@@ -0,0 +1,49 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import os
+
+import pytest
+
+pytest.importorskip("Crypto")
+pytest.importorskip("aiofiles")
+pytest.importorskip("cachetools")
+pytest.importorskip("dotenv")
+pytest.importorskip("httpx")
+pytest.importorskip("pydantic")
+pytest.importorskip("pytdbot")
+
+from Crypto.Cipher import AES  # noqa: E402
+from Crypto.Util import Counter  # noqa: E402
+
+from TgMusic.core._spotify_dl_helper import SPOTIFY_IV, decrypt_ctr  # noqa: E402
+
+KEY = bytes(range(16))
+PLAIN = os.urandom(4096 + 7)
+
+
+def _encrypt(data: bytes) -> bytes:
+    counter = Counter.new(128, initial_value=SPOTIFY_IV)
+    return AES.new(KEY, AES.MODE_CTR, counter=counter).encrypt(data)
+
+
+ENCRYPTED = _encrypt(PLAIN)
+
+
+def test_whole_file_round_trips():
+    assert decrypt_ctr(KEY, 0, ENCRYPTED) == PLAIN
+
+
+@pytest.mark.parametrize("offset", [1, 15, 16, 17, 1000, 4095, len(PLAIN) - 1])
+def test_decrypts_from_any_offset(offset):
+    assert decrypt_ctr(KEY, offset, ENCRYPTED[offset:]) == PLAIN[offset:]
+
+
+@pytest.mark.parametrize("chunk", [1, 13, 16, 100, 1000])
+def test_chunked_decryption_matches_whole_file(chunk):
+    decrypted = b"".join(
+        decrypt_ctr(KEY, offset, ENCRYPTED[offset : offset + chunk])
+        for offset in range(0, len(ENCRYPTED), chunk)
+    )
+    assert decrypted == PLAIN
@@ -0,0 +1,131 @@
+#  Copyright (c) 2025 AshokShau
+#  Licensed under the GNU AGPL v3.0: https://www.gnu.org/licenses/agpl-3.0.html
+#  Part of the TgMusicBot project. All rights reserved where applicable.
+
+import random
+from dataclasses import replace
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from TgMusic.core._dataclass import CachedTrack  # noqa: E402
+from TgMusic.core._queue import TrackQueue  # noqa: E402
+
+
+def _track(name: str) -> CachedTrack:
+    return CachedTrack(
+        url=f"https://youtu.be/{name}",
+        name=name,
+        loop=0,
+        user="user",
+        file_path="",
+        thumbnail="",
+        track_id=name,
+        is_video=False,
+        platform="youtube",
+    )
+
+
+def _names(queue: TrackQueue) -> list[str]:
+    return [track.name for track in queue]
+
+
+@pytest.fixture(params=[2, TrackQueue.BLOCK], ids=["tiny-blocks", "default"])
+def queue(request, monkeypatch):
+    # Tiny blocks make every operation cross block boundaries
+    monkeypatch.setattr(TrackQueue, "BLOCK", request.param)
+    return TrackQueue(_track(name) for name in "abcdefghij")
+
+
+def test_insert_renumbers_following_entries(queue):
+    queue.insert(1, _track("x"))
+    queue.insert(-5, _track("first"))
+    queue.insert(99, _track("last"))
+
+    assert _names(queue) == ["first", "a", "x", *"bcdefghij", "last"]
+    assert queue.peek(2).name == "x"
+    assert queue.position(queue[3].entry_id) == 3
+
+
+def test_move_keeps_entry_ids(queue):
+    moved = queue[8]
+    assert queue.move(8, 1)
+    assert _names(queue) == list("aibcdefghj")
+    assert queue.position(moved.entry_id) == 1
+
+    assert queue.move(1, 9)
+    assert _names(queue) == list("abcdefghji")
+    assert queue.get(moved.entry_id) is moved
+
+    assert not queue.move(0, 10)
+    assert not queue.move(-1, 2)
+
+
+def test_remove_by_position_and_entry_id(queue):
+    removed = queue.remove_at(3)
+    assert removed.name == "d"
+    assert queue.position(removed.entry_id) == -1
+    assert queue.get(removed.entry_id) is None
+
+    target = queue[5]
+    assert queue.remove(target.entry_id) is target
+    assert _names(queue) == list("abcefhij")
+    assert [queue.position(track.entry_id) for track in queue] == list(range(8))
+
+    assert queue.remove_at(8) is None
+    assert queue.remove(target.entry_id) is None
+
+
+def test_popleft_and_peek_ahead(queue):
+    assert queue.popleft().name == "a"
+    assert [track.name for track in queue.peek_ahead(3)] == list("cde")
+    assert [track.name for track in queue.peek_ahead(5, start=7)] == list("ij")
+    assert queue[1:4] == queue.peek_ahead(3)
+    assert queue[-1].name == "j"
+    assert len(queue) == 9
+
+
+def test_shuffle_keeps_the_playing_track(queue):
+    playing = queue[0]
+    queue.shuffle(start=1)
+    assert queue[0] is playing
+    assert sorted(_names(queue)) == list("abcdefghij")
+    assert [queue.position(track.entry_id) for track in queue] == list(range(10))
+
+
+def test_copies_get_distinct_entry_ids(queue):
+    copy = queue.append(replace(queue[0]))
+    assert len({entry.entry_id for entry in queue}) == len(queue)
+    assert queue.position(copy.entry_id) == len(queue) - 1
+
+
+def test_matches_a_list_under_random_operations(monkeypatch):
+    monkeypatch.setattr(TrackQueue, "BLOCK", 4)
+    rng = random.Random(7)
+    queue, expected = TrackQueue(), []
+    for step in range(2000):
+        size = len(expected)
+        action = rng.random()
+        if action < 0.4 or not size:
+            track = _track(str(step))
+            position = rng.randint(0, size)
+            queue.insert(position, track)
+            expected.insert(position, track)
+        elif action < 0.6:
+            position = rng.randrange(size)
+            assert queue.remove_at(position) is expected.pop(position)
+        elif action < 0.8:
+            source, target = rng.randrange(size), rng.randrange(size)
+            queue.move(source, target)
+            expected.insert(target, expected.pop(source))
+        else:
+            assert queue.popleft() is expected.pop(0)
+
+        assert list(queue) == expected
+        if expected:
+            track = rng.choice(expected)
+            assert queue.position(track.entry_id) == expected.index(track)
+
+    assert queue.clear() == expected
+    assert not queue